@@ -5,12 +5,35 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Ishga tushirish (docker-compose dagi `web_async` xizmati):
+    uvicorn Road_test.asgi:application --host 0.0.0.0 --port 8000 --workers 4 --proxy-headers
+Async endpointlar `test/async/...` ostida; statik fayllarni WSGI xizmati beradi.
+Lifespan shutdown-da write-behind buferlari yoziladi (Django o‘zi lifespan-ni qo‘llab-quvvatlamaydi).
 """
 
 import os
 
+from asgiref.sync import sync_to_async
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Road_test.settings')
+os.environ.setdefault('SERVE_STATIC', '0')  # Sinxron WhiteNoise middleware-ni o‘chirish
+
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    if scope['type'] != 'lifespan':
+        return await django_application(scope, receive, send)
+
+    from test_app.writebehind import flush_all
 
-application = get_asgi_application()
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await sync_to_async(flush_all, thread_sensitive=False)()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
@@ -0,0 +1,392 @@
+"""
+Ikki bosqichli cache.
+
+`TwoTierCache` - har bir worker ichidagi cheklangan LRU (TTL bilan) va uning orqasidagi umumiy
+(shared) backend. Qaysi kalitlar lokal saqlanishi va qancha vaqt, kalit prefiksi bo‘yicha
+`POLICIES` orqali belgilanadi; qolgan kalitlar to‘g‘ridan-to‘g‘ri umumiy backendga boradi.
+
+`SQLiteCache` - tashqi servissiz ishlaydigan umumiy backend: bitta hostdagi barcha workerlar
+bitta SQLite faylini (WAL rejimida) ishlatadi. Bir nechta konteyner uchun Redis ishlatiladi.
+
+`get_version` / `bump_version` - workerlar o‘z nusxalarini tekshiradigan umumiy versiya hisoblagichlari
+(savollar bazasi, token blacklist, adaptive jadvallar, singleton javoblar).
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+
+# Pickle qilinmasdan lokal saqlanadigan o‘zgarmas turlar
+_IMMUTABLE_TYPES = (int, float, str, bytes, bool, type(None))
+
+# Lokal LRU-lar process darajasida (Django cache obyektlarini har bir thread uchun alohida yaratadi),
+# LocMemCache kabi LOCATION bo‘yicha saqlanadi
+_local_stores = {}
+_local_stores_lock = threading.Lock()
+
+
+class SQLiteCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+    cull_every = 100  # Har nechta yozuvdan keyin eskirganlarini tozalash
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self):
+        # Har bir thread va process (fork-dan keyin) o‘z ulanishiga ega bo‘ladi
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _read(self, conn, key):
+        row = conn.execute('SELECT value, expires FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= time.time():
+            conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+            return None
+        return row
+
+    def _write(self, conn, key, value, timeout):
+        conn.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+            (key, pickle.dumps(value, self.pickle_protocol), self.get_backend_timeout(timeout)),
+        )
+        self._writes += 1
+        if self._writes % self.cull_every == 0:
+            self._cull(conn)
+
+    def _cull(self, conn):
+        conn.execute('DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?', (time.time(),))
+        count = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count > self._max_entries:
+            # Eng tez eskiradiganlaridan CULL_FREQUENCY ulushini o‘chirish
+            conn.execute(
+                'DELETE FROM cache WHERE key IN '
+                '(SELECT key FROM cache ORDER BY expires IS NULL, expires LIMIT ?)',
+                (count // self._cull_frequency if self._cull_frequency else count,),
+            )
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._read(self._connection(), key)
+        return default if row is None else pickle.loads(row[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._write(self._connection(), key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._transaction() as conn:
+            if self._read(conn, key) is not None:
+                return False
+            self._write(conn, key, value, timeout)
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        # Muddatini o‘zgartirmasdan atomar oshirish
+        key = self.make_and_validate_key(key, version=version)
+        with self._transaction() as conn:
+            row = self._read(conn, key)
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(row[0]) + delta
+            conn.execute(
+                'UPDATE cache SET value = ? WHERE key = ?', (pickle.dumps(value, self.pickle_protocol), key)
+            )
+            return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection().execute(
+            'UPDATE cache SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), key, time.time()),
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._connection().execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount > 0
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._read(self._connection(), key) is not None
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Ulanishlar thread davomida qayta ishlatiladi
+        pass
+
+
+class LocalPolicy:
+    __slots__ = ('prefix', 'timeout', 'local_hits', 'shared_hits', 'misses')
+
+    def __init__(self, prefix, timeout):
+        self.prefix = prefix
+        self.timeout = timeout  # Lokal saqlash muddati (soniya), 0 - lokal saqlanmaydi
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def as_dict(self):
+        return {
+            'timeout': self.timeout,
+            'local_hits': self.local_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+        }
+
+
+class LocalStore:
+    """Bitta process ichidagi LRU va prefikslar bo‘yicha siyosatlar"""
+
+    def __init__(self, options):
+        self.max_entries = int(options.get('LOCAL_MAX_ENTRIES', 10000))
+        self.default_policy = LocalPolicy('', options.get('LOCAL_TIMEOUT', 0))
+        # Eng uzun prefiks birinchi tekshiriladi
+        self.policies = sorted(
+            (LocalPolicy(prefix, timeout) for prefix, timeout in options.get('POLICIES', {}).items()),
+            key=lambda policy: len(policy.prefix),
+            reverse=True,
+        )
+        self.entries = OrderedDict()  # {kalit: (muddat tugash vaqti, qiymat, pickle qilinganmi)}
+        self.lock = threading.Lock()
+
+
+class TwoTierCache(BaseCache):
+    """
+    OPTIONS:
+        SHARED_ALIAS - umumiy backend nomi (CACHES ichida)
+        LOCAL_MAX_ENTRIES - lokal LRU hajmi
+        LOCAL_TIMEOUT - prefiksi mos kelmagan kalitlar uchun lokal muddat (standart 0 - lokal saqlanmaydi)
+        POLICIES - {kalit prefiksi: lokal muddat soniyada}
+    """
+    _missing = object()
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = options.get('SHARED_ALIAS', 'shared')
+        with _local_stores_lock:
+            store = _local_stores.get(location)
+            if store is None:
+                store = _local_stores[location] = LocalStore(options)
+        self._store = store
+        self._local = store.entries
+        self._lock = store.lock
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _policy(self, key):
+        for policy in self._store.policies:
+            if key.startswith(policy.prefix):
+                return policy
+        return self._store.default_policy
+
+    def _local_get(self, local_key):
+        with self._lock:
+            entry = self._local.get(local_key)
+            if entry is None:
+                return self._missing
+            if entry[0] <= time.monotonic():
+                del self._local[local_key]
+                return self._missing
+            self._local.move_to_end(local_key)
+        expires, value, pickled = entry
+        return pickle.loads(value) if pickled else value
+
+    def _local_set(self, local_key, value, policy, timeout):
+        local_timeout = policy.timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            local_timeout = min(local_timeout, timeout)
+        if local_timeout <= 0:
+            self._local_delete(local_key)
+            return
+
+        # O‘zgaruvchan obyektlar chaqiruvchilar o‘rtasida bo‘lishmasligi uchun pickle qilinadi
+        pickled = not isinstance(value, _IMMUTABLE_TYPES)
+        stored = pickle.dumps(value, pickle.HIGHEST_PROTOCOL) if pickled else value
+        with self._lock:
+            self._local[local_key] = (time.monotonic() + local_timeout, stored, pickled)
+            self._local.move_to_end(local_key)
+            while len(self._local) > self._store.max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, local_key):
+        with self._lock:
+            self._local.pop(local_key, None)
+
+    def get(self, key, default=None, version=None):
+        policy = self._policy(key)
+        local_key = self.make_and_validate_key(key, version=version)
+        if policy.timeout > 0:
+            value = self._local_get(local_key)
+            if value is not self._missing:
+                policy.local_hits += 1
+                return value
+
+        value = self.shared.get(key, self._missing, version=version)
+        if value is self._missing:
+            policy.misses += 1
+            return default
+
+        policy.shared_hits += 1
+        self._local_set(local_key, value, policy, DEFAULT_TIMEOUT)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout=timeout, version=version)
+        self._local_set(self.make_and_validate_key(key, version=version), value, self._policy(key), timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._local_set(self.make_and_validate_key(key, version=version), value, self._policy(key), timeout)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        return self.shared.incr(key, delta, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        return self.shared.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, self._missing, version=version) is not self._missing
+
+    # Async variantlar: lokal qatlam xotirada bo‘lgani uchun to‘g‘ridan-to‘g‘ri o‘qiladi,
+    # faqat umumiy backendga murojaat await qilinadi
+
+    async def aget(self, key, default=None, version=None):
+        policy = self._policy(key)
+        local_key = self.make_and_validate_key(key, version=version)
+        if policy.timeout > 0:
+            value = self._local_get(local_key)
+            if value is not self._missing:
+                policy.local_hits += 1
+                return value
+
+        value = await self.shared.aget(key, self._missing, version=version)
+        if value is self._missing:
+            policy.misses += 1
+            return default
+
+        policy.shared_hits += 1
+        self._local_set(local_key, value, policy, DEFAULT_TIMEOUT)
+        return value
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        await self.shared.aset(key, value, timeout=timeout, version=version)
+        self._local_set(self.make_and_validate_key(key, version=version), value, self._policy(key), timeout)
+
+    async def aadd(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = await self.shared.aadd(key, value, timeout=timeout, version=version)
+        if added:
+            self._local_set(self.make_and_validate_key(key, version=version), value, self._policy(key), timeout)
+        return added
+
+    async def aincr(self, key, delta=1, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        return await self.shared.aincr(key, delta, version=version)
+
+    async def atouch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        return await self.shared.atouch(key, timeout=timeout, version=version)
+
+    async def adelete(self, key, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        return await self.shared.adelete(key, version=version)
+
+    async def ahas_key(self, key, version=None):
+        return await self.aget(key, self._missing, version=version) is not self._missing
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def stats(self):
+        """Prefikslar bo‘yicha lokal/umumiy hit va miss hisoblagichlari (shu worker uchun)"""
+        with self._lock:
+            local_entries = len(self._local)
+        return {
+            'local_entries': local_entries,
+            'policies': {
+                policy.prefix: policy.as_dict() for policy in [*self._store.policies, self._store.default_policy]
+            },
+        }
+
+
+def _initial_version():
+    # Vaqtga asoslangan boshlang‘ich qiymat: cache tozalansa ham eski versiyalar bilan to‘qnashmaydi
+    return time.time_ns() // 1000
+
+
+def get_version(key, timeout=None):
+    """Umumiy cache-dagi versiyani olish; kalit yo‘q bo‘lsa yaratiladi (`timeout=None` - muddatsiz)"""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=timeout)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(key, timeout=None):
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _initial_version(), timeout=timeout)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(key, timeout=None):
+    """Versiyani oshirish: barcha workerlar o‘z nusxasini keyingi so‘rovda yangilaydi"""
+    try:
+        version = cache.incr(key)
+        cache.touch(key, timeout)  # Ba’zi backendlar incr-da standart TIMEOUT qo‘yadi
+        return version
+    except ValueError:
+        return get_version(key, timeout)
@@ -0,0 +1,16 @@
+"""ETag bilan ishlaydigan javoblar uchun umumiy yordamchi (rendering, bundle-lar, singleton-lar)"""
+from django.utils.http import parse_etags
+
+
+def _weak(etag):
+    """If-None-Match zaif taqqoslanadi: `W/"x"` va `"x"` bir xil"""
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def if_none_match(request, etags):
+    """So‘rovdagi If-None-Match ro‘yxatida (`W/` teglar ham) `etags` dan biri yoki `*` bo‘lsa True"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    tags = {_weak(tag) for tag in parse_etags(header)}
+    return '*' in tags or not tags.isdisjoint(_weak(etag) for etag in etags)
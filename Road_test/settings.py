@@ -49,12 +49,36 @@ INSTALLED_APPS = [
     'test_app',
 ]
 
+# Ikki bosqichli cache (Road_test/cache.py): worker ichidagi LRU + umumiy backend.
+# REDIS_URL berilsa umumiy backend Redis, aks holda bitta hostdagi workerlar uchun SQLite fayli.
+REDIS_URL = os.environ.get('REDIS_URL')
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
-        'LOCATION': '/tmp/django_cache',  # Cache saqlanadigan joy
+        'BACKEND': 'Road_test.cache.TwoTierCache',
+        'LOCATION': 'road_test',
         'TIMEOUT': 1800,  # 30 daqiqa saqlanadi
-    }
+        'OPTIONS': {
+            'SHARED_ALIAS': 'shared',
+            'LOCAL_MAX_ENTRIES': 10000,
+            # Kalit prefiksi: lokal saqlash muddati (soniya). Ro‘yxatda yo‘q kalitlar faqat umumiy backendda
+            'POLICIES': {
+                'question_bank_version': 1,  # Baza o‘zgarsa boshqa workerlar 1 soniyada bilib oladi
+                'exam_session_': 60,  # Imtihon sessiyasi yozuvlari o‘zgarmaydi
+                'auth_user_': 5,  # Admin foydalanuvchini bloklasa boshqa workerlar 5 soniyada biladi
+                'singleton_': 5,  # Kontaktlar va kategoriyalar (Road_test/singletons.py)
+            },
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'TIMEOUT': 1800,
+    } if REDIS_URL else {
+        'BACKEND': 'Road_test.cache.SQLiteCache',
+        'LOCATION': '/tmp/django_cache.sqlite3',  # Cache saqlanadigan joy
+        'TIMEOUT': 1800,
+    },
 }
 
 
@@ -72,6 +96,12 @@ MIDDLEWARE = [
 
 ]
 
+# ASGI process-da (Road_test/asgi.py) statik fayllarni WSGI xizmati beradi: WhiteNoise faqat sinxron,
+# u zanjirda bo‘lsa har bir async so‘rov thread orqali o‘tib ketadi
+SERVE_STATIC = os.environ.get('SERVE_STATIC', '1') == '1'
+if not SERVE_STATIC:
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
+
 ROOT_URLCONF = 'Road_test.urls'
 
 TEMPLATES = [
@@ -91,6 +121,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'Road_test.wsgi.application'
+ASGI_APPLICATION = 'Road_test.asgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -161,6 +192,8 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")  # Static fayllarni saqlash
 # MEDIA FILES SETTINGS
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "mediafiles")  # Media fayllarni saqlash joyi
+# Oldindan render qilingan javoblardagi to‘liq rasm URL-lari uchun (so‘rov hostiga bog‘lanmaydi)
+SITE_URL = os.environ.get('SITE_URL', 'https://subdomain.vodnikavtotest.uz')
 
 # STATICFILES_DIRS => Agar `static` papkangiz loyihangiz ichida bo‘lsa, uni qo‘shing:
 STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]
@@ -177,8 +210,20 @@ AUTH_USER_MODEL = 'user.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',  # JWT Authentication
+        'user.authentication.CachedJWTAuthentication',  # JWT Authentication (foydalanuvchi cache-dan)
     ),
+    # Ilova oldidagi proksi-lar soni: IP X-Forwarded-For-ning proksi qo‘shgan qismidan olinadi.
+    # Standart 0 - X-Forwarded-For umuman hisobga olinmaydi (compose-da web portlari to‘g‘ridan-to‘g‘ri ochiq,
+    # mijoz sarlavhani o‘zi yozishi mumkin). Faqat nginx ortida ishlaganda NUM_PROXIES=1 qilinadi.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+    # `user/throttling.py` dagi token-bucket throttle-lar uchun chegaralar
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/min',
+        'login_phone': '5/min',
+        'register_ip': '10/hour',
+        'register_phone': '3/hour',
+        'submit': '60/min',
+    },
 }
 
 SIMPLE_JWT = {
@@ -186,10 +231,16 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=90),  # Refresh token muddati 3 oy (kerakli qiymatga o'zgartiring)
     "BLACKLIST_AFTER_ROTATION": True,  # Eski refresh tokenni bekor qilish
     "ROTATE_REFRESH_TOKENS": True,
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.TokenRefreshSerializer",  # Blacklist oldida Bloom filtr
 }
 
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
 
 CSRF_COOKIE_DOMAIN = 'subdomain.vodnikavtotest.uz'
-CSRF_TRUSTED_ORIGINS = ['https://subdomain.vodnikavtotest.uz',]
\ No newline at end of file
+CSRF_TRUSTED_ORIGINS = ['https://subdomain.vodnikavtotest.uz',]
+
+# Brauzer mijozlari imtihon sessiyasi sarlavhalarini o‘qiy olishi uchun
+CORS_EXPOSE_HEADERS = [
+    'ETag', 'X-Exam-Session', 'X-Exam-Seed', 'X-Sync-Version', 'X-Bundle-Version', 'Content-Range', 'Accept-Ranges',
+]
@@ -0,0 +1,76 @@
+"""
+Kichik, kam o‘zgaradigan resurslar (kontaktlar, kategoriyalar) uchun cache-dagi tayyor JSON javob.
+
+Javob baytlari cache-da versiya bo‘yicha saqlanadi (`singleton_<nom>_<versiya>[_<til>]`), ETag ham
+versiyadan olinadi. Bog‘liq modellar saqlansa yoki o‘chsa signal tranzaksiya tugagach versiyani oshiradi:
+eski yozuvlar o‘qilmay qoladi va o‘z muddati bilan o‘chadi.
+"""
+import json
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.translation import get_language
+
+from .cache import bump_version, get_version
+from .http import if_none_match
+
+SINGLETON_TTL = 24 * 60 * 60
+CACHE_CONTROL = "public, max-age=60"
+_MISSING = b''  # `build` None qaytarsa (masalan, kontakt kiritilmagan)
+
+
+class CachedSingleton:
+    def __init__(self, name, build, per_language=False):
+        """`build()` JSON-ga aylantiriladigan qiymat yoki None qaytaradi; `per_language` - har bir til uchun alohida"""
+        self.name = name
+        self.build = build
+        self.per_language = per_language
+        self.version_key = f"singleton_{name}_version"
+
+    def version(self):
+        return get_version(self.version_key)
+
+    def bump(self):
+        bump_version(self.version_key)
+
+    def invalidate(self, *args, **kwargs):
+        """Signal handler sifatida ham ishlatiladi"""
+        transaction.on_commit(self.bump)
+
+    def connect(self, *models):
+        for model in models:
+            uid = f"singleton_{self.name}_{model._meta.label_lower}"
+            post_save.connect(self.invalidate, sender=model, weak=False, dispatch_uid=f"{uid}_save")
+            post_delete.connect(self.invalidate, sender=model, weak=False, dispatch_uid=f"{uid}_delete")
+
+    def get(self):
+        """(ETag, JSON baytlar) yoki resurs bo‘lmasa None"""
+        version = self.version()
+        suffix = f"{version}_{get_language()}" if self.per_language else str(version)
+        key = f"singleton_{self.name}_{suffix}"
+
+        # Versiya bazadan o‘qishdan oldin olingan: shu orada o‘zgarish bo‘lsa u yangi versiyada quriladi
+        body = cache.get(key)
+        if body is None:
+            data = self.build()
+            body = _MISSING if data is None else json.dumps(data, ensure_ascii=False).encode('utf-8')
+            cache.set(key, body, timeout=SINGLETON_TTL)
+
+        if body == _MISSING:
+            return None
+        return f'"{self.name}-{suffix}"', body
+
+    def response(self, request, payload):
+        etag, body = payload
+        if if_none_match(request, (etag,)):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = CACHE_CONTROL
+        if self.per_language:
+            patch_vary_headers(response, ('Accept-Language',))
+        return response
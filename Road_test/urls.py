@@ -5,6 +5,7 @@ from django.conf.urls.static import static
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from test_app.images import VARIANTS_DIR, serve_variant
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -31,6 +32,12 @@ urlpatterns = [
 ]+ static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
 if settings.DEBUG:
+    # Production-da media fayllarni (rasm nusxalari ham) nginx beradi: nginx/road_test.conf
+    urlpatterns += [
+        # Rasm nusxalari nomida mazmun xeshi bor: o‘zgarmas Cache-Control bilan beriladi
+        re_path(rf'^{settings.MEDIA_URL.lstrip("/")}{VARIANTS_DIR}(?P<path>[\w.-]+)$', serve_variant,
+                name='image-variant'),
+    ]
     urlpatterns += static(settings.MEDIA_URL,
                           document_root=settings.MEDIA_ROOT)
 
@@ -0,0 +1,10 @@
+"""
+Gunicorn sozlamalari (Dockerfile dagi `gunicorn Road_test.wsgi:application` shu faylni o‘zi o‘qiydi).
+Worker to‘xtashidan oldin write-behind buferlaridagi yozuvlar (topshiriqlar, statistika) bazaga yoziladi.
+"""
+
+
+def worker_exit(server, worker):
+    from test_app.writebehind import flush_all
+
+    flush_all()
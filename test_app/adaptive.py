@@ -0,0 +1,257 @@
+"""
+Moslashuvchan (adaptive) imtihon: foydalanuvchi ko‘p xato qiladigan savollar ko‘proq chiqadi.
+
+Har bir savol og‘irligi - foydalanuvchining shu savoldagi xatolik darajasi, (noto‘g‘ri + 1) / (urinishlar + 2);
+hali javob berilmagan savol 0.5. Og‘irliklardan Walker/Vose alias jadvali quriladi: bitta tanlash O(1),
+20 ta savol esa bir necha mikrosoniyada tanlanadi.
+
+Jadval va uning asosidagi (urinishlar, to‘g‘rilar) hisoblari worker ichida (LRU) foydalanuvchi bo‘yicha
+saqlanadi. Yangi javoblar bazaga yozilganda (`attempts.py`) foydalanuvchining umumiy cache-dagi versiyasi
+oshiriladi va shu partiyaning o‘sishlari (delta) yangi versiya kaliti ostida qo‘yiladi. Eskirgan worker
+yetishmagan deltalarni bitta `get_many` bilan olib hisoblariga qo‘shadi va jadvalda faqat o‘zgargan
+savollar og‘irligini almashtiradi (`AdaptiveTable.updated`); bazadagi agregat so‘rov faqat birinchi marta,
+bank o‘zgarganda yoki deltalar yo‘qolganda bajariladi.
+"""
+import random
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from Road_test.cache import aget_version, get_version
+from .models import AttemptAnswer
+from .sampling import EXAM_SIZE
+
+ADAPTIVE_VERSION_KEY = "adaptive_version_{}"
+ADAPTIVE_DELTA_KEY = "adaptive_delta_{}_{}"  # Foydalanuvchi ID, versiya
+ADAPTIVE_VERSION_TTL = 24 * 60 * 60
+MAX_DELTA_STEPS = 20  # Shundan ko‘p versiya orqada qolgan jadval bazadan qayta quriladi
+UNSEEN_WEIGHT = 0.5
+LOCAL_MAX_TABLES = 256
+MAX_DRAWS_PER_QUESTION = 50  # Takroriy tanlashlar shundan oshsa qolgan savollar oddiy tasodifiy olinadi
+MIN_REBUILD_OVERRIDES = 64  # O‘zgargan savollar shundan (va savollar sonining 1/8 idan) oshsa jadval qayta quriladi
+
+# {user_id: (bank versiyasi, foydalanuvchi versiyasi, {savol ID: (urinishlar, to‘g‘rilar)}, AdaptiveTable)}
+_tables = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+class AliasTable:
+    """Vose alias usuli: `ids[i]` elementi `weights[i]` ga proporsional ehtimol bilan tanlanadi"""
+    __slots__ = ('ids', 'weights', 'total', 'index', 'probability', 'alias')
+
+    def __init__(self, ids, weights):
+        count = len(ids)
+        total = sum(weights)
+        scaled = [weight * count / total for weight in weights]
+        probability = [1.0] * count
+        alias = list(range(count))
+        small = [index for index, value in enumerate(scaled) if value < 1]
+        large = [index for index, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probability[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+
+        self.ids = ids
+        self.weights = weights
+        self.total = total
+        self.index = {question_id: index for index, question_id in enumerate(ids)}
+        self.probability = probability
+        self.alias = alias
+
+    def draw(self, rng):
+        index = rng.randrange(len(self.ids))
+        return self.ids[index] if rng.random() < self.probability[index] else self.ids[self.alias[index]]
+
+
+class AdaptiveTable:
+    """
+    Alias jadvali va undan keyin o‘zgargan savollar og‘irliklari (`overrides`).
+    Yangi javoblar jadvalni qayta qurmaydi: `updated()` faqat o‘zgargan savollarni almashtiradi (O(o‘zgarganlar)).
+    Tanlash: `overrides` ulushi ehtimoli bilan ulardan (bisect), aks holda alias jadvalidan (o‘zgargan savol
+    chiqsa qayta tanlanadi). O‘zgarganlar ko‘payib ketsa jadval yangi og‘irliklar bilan to‘liq quriladi.
+    Obyekt o‘zgarmaydi: boshqa thread-lar eski nusxadan bemalol tanlayveradi.
+    """
+    __slots__ = ('base', 'overrides', 'override_ids', 'cumulative', 'override_total', 'replaced_total')
+
+    def __init__(self, base, overrides=None):
+        self.base = base
+        self.overrides = overrides or {}
+        self.override_ids = list(self.overrides)
+        self.cumulative = list(accumulate(self.overrides.values()))
+        self.override_total = self.cumulative[-1] if self.cumulative else 0.0
+        self.replaced_total = sum(base.weights[base.index[question_id]] for question_id in self.overrides)
+
+    @property
+    def ids(self):
+        return self.base.ids
+
+    def updated(self, weights):
+        """{savol ID: yangi og‘irlik} qo‘llangan yangi jadval"""
+        base = self.base
+        overrides = {**self.overrides, **{
+            question_id: weight for question_id, weight in weights.items() if question_id in base.index
+        }}
+        table = AdaptiveTable(base, overrides)
+        # Alias jadvalidan qayta tanlashlar ko‘payib ketmasligi uchun (o‘rtacha 2 tadan kam)
+        if len(overrides) > max(MIN_REBUILD_OVERRIDES, len(base.ids) // 8) or table.replaced_total * 2 > base.total:
+            merged = list(base.weights)
+            for question_id, weight in overrides.items():
+                merged[base.index[question_id]] = weight
+            table = AdaptiveTable(AliasTable(base.ids, merged))
+        return table
+
+    def draw(self, rng):
+        total = self.base.total - self.replaced_total + self.override_total
+        point = rng.random() * total
+        if point < self.override_total:
+            return self.override_ids[min(bisect_right(self.cumulative, point), len(self.override_ids) - 1)]
+        while True:
+            question_id = self.base.draw(rng)
+            if question_id not in self.overrides:
+                return question_id
+
+    def sample(self, k, seed=None):
+        """k ta takrorlanmas ID; takrorlar qayta tanlanadi"""
+        rng = random.Random(seed)
+        k = min(k, len(self.ids))
+        selected = {}
+        for _ in range(k * MAX_DRAWS_PER_QUESTION):
+            if len(selected) == k:
+                break
+            selected.setdefault(self.draw(rng), None)
+        if len(selected) < k:
+            rest = [question_id for question_id in self.ids if question_id not in selected]
+            selected.update(dict.fromkeys(rng.sample(rest, k - len(selected))))
+        return list(selected)
+
+
+def _error_counts(user_id):
+    """Foydalanuvchi javoblari bo‘yicha {savol ID: (urinishlar, to‘g‘rilar)} so‘rovi (javobsizlari hisobga olinmaydi)"""
+    return (
+        AttemptAnswer.objects.filter(attempt__user_id=user_id, choice__isnull=False).order_by().values('question_id')
+        .annotate(attempts=Count('id'), correct=Count('id', filter=Q(is_correct=True)))
+        .values_list('question_id', 'attempts', 'correct')
+    )
+
+
+def _weight(attempts, correct):
+    return (attempts - correct + 1) / (attempts + 2)
+
+
+def build_table(bank, counts):
+    ids = bank.question_ids
+    weights = [_weight(*counts[question_id]) if question_id in counts else UNSEEN_WEIGHT for question_id in ids]
+    return AdaptiveTable(AliasTable(ids, weights))
+
+
+def _local_entry(user_id):
+    with _tables_lock:
+        entry = _tables.get(user_id)
+        if entry is not None:
+            _tables.move_to_end(user_id)
+        return entry
+
+
+def _store_table(user_id, bank_version, version, counts, table):
+    with _tables_lock:
+        _tables[user_id] = (bank_version, version, counts, table)
+        _tables.move_to_end(user_id)
+        if len(_tables) > LOCAL_MAX_TABLES:
+            _tables.popitem(last=False)
+
+
+def _delta_keys(user_id, entry, version):
+    """Lokal hisoblarni `version` gacha yetkazish uchun kerakli delta kalitlari; yetkazib bo‘lmasa None"""
+    if entry is None or not 0 <= version - entry[1] <= MAX_DELTA_STEPS:
+        return None
+    return [ADAPTIVE_DELTA_KEY.format(user_id, step) for step in range(entry[1] + 1, version + 1)]
+
+
+def _apply_deltas(bank, entry, keys, deltas):
+    """
+    Lokal hisoblar nusxasiga deltalarni versiya tartibida qo‘shish; birortasi yo‘q bo‘lsa None.
+    Bank o‘zgarmagan bo‘lsa jadvalda faqat o‘zgargan savollar almashtiriladi, aks holda u qayta quriladi.
+    """
+    if len(deltas) != len(keys):
+        return None
+    counts = dict(entry[2])
+    changed = set()
+    for key in keys:
+        for question_id, (attempts, correct) in deltas[key].items():
+            old_attempts, old_correct = counts.get(question_id, (0, 0))
+            counts[question_id] = (old_attempts + attempts, old_correct + correct)
+            changed.add(question_id)
+    if entry[0] != bank.version:
+        return counts, build_table(bank, counts)
+    return counts, entry[3].updated({question_id: _weight(*counts[question_id]) for question_id in changed})
+
+
+def get_user_table(bank, user_id):
+    version_key = ADAPTIVE_VERSION_KEY.format(user_id)
+    version = get_version(version_key, ADAPTIVE_VERSION_TTL)
+    entry = _local_entry(user_id)
+    if entry is not None and entry[:2] == (bank.version, version):
+        return entry[3]
+
+    updated = None
+    keys = _delta_keys(user_id, entry, version)
+    if keys is not None:
+        updated = _apply_deltas(bank, entry, keys, cache.get_many(keys))
+    if updated is None:
+        counts = {question_id: (attempts, correct) for question_id, attempts, correct in _error_counts(user_id)}
+        # Versiya so‘rovdan keyin o‘qiladi: oraliqda yozilgan partiya deltasi hisoblarga ikki marta qo‘shilmaydi
+        version = get_version(version_key, ADAPTIVE_VERSION_TTL)
+        updated = counts, build_table(bank, counts)
+    _store_table(user_id, bank.version, version, *updated)
+    return updated[1]
+
+
+async def aget_user_table(bank, user_id):
+    version_key = ADAPTIVE_VERSION_KEY.format(user_id)
+    version = await aget_version(version_key, ADAPTIVE_VERSION_TTL)
+    entry = _local_entry(user_id)
+    if entry is not None and entry[:2] == (bank.version, version):
+        return entry[3]
+
+    updated = None
+    keys = _delta_keys(user_id, entry, version)
+    if keys is not None:
+        updated = _apply_deltas(bank, entry, keys, await cache.aget_many(keys))
+    if updated is None:
+        counts = {question_id: (attempts, correct) async for question_id, attempts, correct in _error_counts(user_id)}
+        version = await aget_version(version_key, ADAPTIVE_VERSION_TTL)
+        updated = counts, build_table(bank, counts)
+    _store_table(user_id, bank.version, version, *updated)
+    return updated[1]
+
+
+def sample_adaptive(table, seed, k=EXAM_SIZE):
+    return table.sample(k, seed)
+
+
+def publish_user_deltas(answers):
+    """
+    Bazaga yozilgan javoblar o‘sishini foydalanuvchilar versiyasi ostida e’lon qilish (flush tranzaksiyasidan keyin).
+    Versiya kaliti bo‘lmasa hech qaysi worker-da bu foydalanuvchi jadvali joriy emas: delta kerak emas.
+    """
+    deltas = {}
+    for answer in answers:
+        if answer.choice_id is None:
+            continue
+        user_deltas = deltas.setdefault(answer.attempt.user_id, {})
+        attempts, correct = user_deltas.get(answer.question_id, (0, 0))
+        user_deltas[answer.question_id] = (attempts + 1, correct + answer.is_correct)
+
+    for user_id, user_deltas in deltas.items():
+        try:
+            version = cache.incr(ADAPTIVE_VERSION_KEY.format(user_id))
+        except ValueError:
+            continue
+        cache.set(ADAPTIVE_DELTA_KEY.format(user_id, version), user_deltas, timeout=ADAPTIVE_VERSION_TTL)
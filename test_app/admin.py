@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Category, Question, AnswerChoice
+from .models import Category, Question, AnswerChoice, Attempt, AttemptAnswer, ExamBlueprint, BlueprintSection, \
+    ImageBlob
 
 
 class AnswerChoiceInline(admin.TabularInline):
@@ -56,3 +57,39 @@ class AnswerChoiceAdmin(admin.ModelAdmin):
     list_filter = ('is_correct',)
     search_fields = ('text_uz', 'text_ru', 'text_en')
     exclude = ('text',)  # Asl `text` maydonini yashiramiz
+
+
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'ref_count', 'created_at')
+    readonly_fields = ('name', 'size', 'ref_count', 'created_at')
+    search_fields = ('name',)
+
+
+class BlueprintSectionInline(admin.TabularInline):
+    model = BlueprintSection
+    extra = 1
+
+
+@admin.register(ExamBlueprint)
+class ExamBlueprintAdmin(admin.ModelAdmin):
+    list_display = ('title_uz', 'total_time', 'is_active', 'created_at')
+    list_filter = ('is_active',)
+    exclude = ('title',)  # Asl `title` maydonini yashiramiz
+    inlines = [BlueprintSectionInline]
+
+
+class AttemptAnswerInline(admin.TabularInline):
+    model = AttemptAnswer
+    extra = 0
+    can_delete = False
+    readonly_fields = ('question', 'choice', 'is_correct')
+
+
+@admin.register(Attempt)
+class AttemptAdmin(admin.ModelAdmin):
+    list_display = ('user', 'mode', 'correct_answers', 'total_questions', 'created_at')
+    list_filter = ('mode',)
+    search_fields = ('user__phone_number',)
+    readonly_fields = ('user', 'mode', 'session_id', 'page_number', 'total_questions', 'correct_answers', 'created_at')
+    inlines = [AttemptAnswerInline]
@@ -8,3 +8,4 @@ class TestAppConfig(AppConfig):
 
     def ready(self):
         import test_app.translation
+        import test_app.signals
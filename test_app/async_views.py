@@ -0,0 +1,181 @@
+"""
+Savollarni o‘qish va javoblarni topshirish endpointlarining async (ASGI) variantlari.
+
+DRF function view-lari sinxron, shuning uchun bu yerda oddiy Django async view-lari ishlatiladi:
+autentifikatsiya async ORM bilan, cache esa `aget/aset` bilan. Javoblar sinxron view-lar bilan bir xil.
+"""
+import json
+import math
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse
+from django.utils.translation import get_language
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed, Throttled
+
+from user.authentication import AsyncJWTAuthentication
+from user.throttling import SubmitThrottle
+from .adaptive import aget_user_table, sample_adaptive
+from .bank import aget_bank, language_index
+from .exam_sessions import SESSION_TTL, acreate_session, aget_session
+from .rendering import cached_payload, get_rendered_questions, rendered_response
+from .sampling import new_seed, sample_exam
+from .serializers import parse_flag, serialize_bank_questions
+from .submissions import SESSION_NOT_FOUND, submit_page, submit_random
+
+_authentication = AsyncJWTAuthentication()
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={'ensure_ascii': False})
+
+
+def async_api_view(methods, authenticated=True, throttles=()):
+    """
+    `@api_view` + `@permission_classes([IsAuthenticated])` + `@throttle_classes` ning async o‘rinbosari:
+    metodni tekshiradi, JWT bilan autentifikatsiya qiladi, JSON body-ni `request.data` ga qo‘yadi
+    va throttle-larni tekshiradi.
+    """
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return _json({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+
+            try:
+                auth = await _authentication.aauthenticate(request)
+            except AuthenticationFailed as exc:
+                detail = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+                response = _json(detail, status=401)
+                response['WWW-Authenticate'] = _authentication.authenticate_header(request)
+                return response
+
+            if auth is None and authenticated:
+                response = _json({"detail": "Authentication credentials were not provided."}, status=401)
+                response['WWW-Authenticate'] = _authentication.authenticate_header(request)
+                return response
+            request.user, request.auth = auth if auth is not None else (None, None)
+
+            try:
+                request.data = json.loads(request.body) if request.body else {}
+            except ValueError as exc:
+                return _json({"detail": f"JSON parse error - {exc}"}, status=400)
+            # View-lar `request.data.get` ishlatadi: ro‘yxat yoki oddiy qiymat 500 bermasligi kerak
+            if not isinstance(request.data, dict):
+                return _json({"detail": f'Expected a dictionary of items but got type "{type(request.data).__name__}".'},
+                             status=400)
+
+            # DRF kabi: barcha throttle-lar tekshiriladi, eng uzun kutish vaqti qaytariladi
+            waits = []
+            for throttle in (throttle_class() for throttle_class in throttles):
+                if not await throttle.aallow_request(request, view):
+                    waits.append(throttle.wait())
+            if waits:
+                wait = max(waits)
+                response = _json({"detail": Throttled(wait).detail}, status=429)
+                response['Retry-After'] = str(math.ceil(wait))
+                return response
+
+            try:
+                return await view(request, *args, **kwargs)
+            except Http404:
+                return _json({"detail": "Not found."}, status=404)
+        return wrapper
+    return decorator
+
+
+@async_api_view(['POST'])
+async def get_random_questions(request):
+    """Tasodifiy yoki shablon bo‘yicha savollar (sinxron `views.get_random_questions` bilan bir xil)"""
+    force_new = request.data.get("force_new", False)
+    seed = request.data.get("seed")
+    session_id = request.data.get("session_id")
+    blueprint_id = request.data.get("blueprint_id")
+    adaptive = parse_flag(request.data.get("adaptive", False))
+    if adaptive is None:
+        return _json({"error": "adaptive true yoki false bo‘lishi kerak!"}, status=400)
+
+    try:
+        seed = int(seed) if seed is not None else None
+        blueprint_id = int(blueprint_id) if blueprint_id is not None else None
+    except (TypeError, ValueError):
+        return _json({"error": "seed va blueprint_id butun son bo‘lishi kerak!"}, status=400)
+
+    bank = await aget_bank()
+    blueprint = None
+    if blueprint_id is not None:
+        blueprint = bank.blueprints.get(blueprint_id)
+        if blueprint is None:
+            return _json({"error": "Imtihon shabloni topilmadi!"}, status=404)
+        if adaptive:
+            return _json({"error": "adaptive va blueprint_id birga ishlatilmaydi!"}, status=400)
+
+    new_exam = force_new or seed is not None or blueprint is not None or adaptive
+    session = None if new_exam else await aget_session(request.user.id, session_id)
+
+    if session is None:
+        if session_id is not None and not new_exam:
+            return _json(SESSION_NOT_FOUND, status=400)
+
+        if seed is None:
+            seed = new_seed()
+        ttl = blueprint.session_ttl if blueprint is not None else SESSION_TTL
+        if adaptive:
+            question_ids = sample_adaptive(await aget_user_table(bank, request.user.id), seed)
+        else:
+            question_ids = sample_exam(bank, seed, blueprint)
+        session = await acreate_session(request.user.id, question_ids, seed, ttl)
+
+    response = _json(serialize_bank_questions(bank.get_questions(session.question_ids), request))
+    response['X-Exam-Session'] = session.session_id
+    response['X-Exam-Seed'] = str(session.seed)
+    return response
+
+
+@async_api_view(['GET'])
+async def get_questions_by_page(request, page_number):
+    bank = await aget_bank()
+    return _json({
+        "current_page": page_number,
+        "questions": serialize_bank_questions(bank.page(page_number), request)
+    })
+
+
+@async_api_view(['GET'], authenticated=False)
+async def get_questions(request):
+    bank = await aget_bank()
+    payload = cached_payload(bank)
+    if payload is None:
+        # Serializatsiya va siqish (gzip/brotli) CPU ishi: event loop-ni bloklamasligi uchun thread-da
+        payload = await sync_to_async(get_rendered_questions)(request, bank)
+    response = rendered_response(request, payload)
+    response['X-Sync-Version'] = str(bank.sync_version)
+    return response
+
+
+@async_api_view(['GET'])
+async def get_questions_by_category(request, category_id):
+    bank = await aget_bank()
+    category = bank.categories.get(category_id)
+    if category is None:
+        raise Http404
+
+    return _json({
+        "category": category.title(language_index(get_language())),
+        "questions": serialize_bank_questions(bank.category_questions[category_id], request)
+    })
+
+
+@async_api_view(['POST'], throttles=[SubmitThrottle])
+async def submit_random_answers(request):
+    session = await aget_session(request.user.id, request.data.get("session_id"))
+    data, status_code = submit_random(request.user.id, request.data, session, await aget_bank())
+    return _json(data, status=status_code)
+
+
+@async_api_view(['POST'], throttles=[SubmitThrottle])
+async def submit_paged_answers(request, page_number):
+    data, status_code = submit_page(request.user.id, request.data, page_number, await aget_bank())
+    return _json(data, status=status_code)
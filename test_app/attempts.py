@@ -0,0 +1,57 @@
+"""
+Topshiriqlar tarixini saqlash. Natija so‘rov ichida faqat bufferga qo‘shiladi,
+bazaga `WriteBehindBuffer` orqali partiyalab `bulk_create` bilan yoziladi.
+"""
+from django.db import transaction
+
+from .adaptive import publish_user_deltas
+from .bank import get_bank
+from .models import Attempt, AttemptAnswer
+from .writebehind import WriteBehindBuffer
+
+
+def flush_attempts(items):
+    """(Attempt, [AttemptAnswer]) juftliklarini bitta tranzaksiyada yozish"""
+    # Bufferda turgan paytda o‘chirilgan savol va variantlar tashlab ketiladi
+    bank = get_bank()
+    attempts = []
+    answers = []
+    for attempt, attempt_answers in items:
+        attempts.append(attempt)
+        for answer in attempt_answers:
+            if answer.question_id not in bank.by_id:
+                continue
+            if answer.choice_id is not None and answer.choice_id not in bank.choice_question:
+                answer.choice_id = None
+            answers.append(answer)
+
+    with transaction.atomic():
+        Attempt.objects.bulk_create(attempts)
+        AttemptAnswer.objects.bulk_create(answers)
+    publish_user_deltas(answers)  # Adaptive jadvallar o‘sishlar bilan yangilanadi
+
+
+attempt_buffer = WriteBehindBuffer('attempts', flush_attempts, max_size=200, max_delay=2.0)
+
+
+def record_attempt(user_id, mode, grading, session_id=None, page_number=None):
+    """Tekshiruv natijasini tarixga qo‘shish (bazaga keyinroq yoziladi)"""
+    attempt = Attempt(
+        user_id=user_id,
+        mode=mode,
+        session_id=session_id,
+        page_number=page_number,
+        total_questions=grading.total_questions,
+        correct_answers=grading.correct_count,
+    )
+    answers = [
+        AttemptAnswer(
+            attempt=attempt,
+            question_id=answer.question_id,
+            choice_id=answer.answer_id or None,  # Javob berilmagan (None/False) bo‘lsa None
+            is_correct=answer.is_correct,
+        )
+        for answer in grading.answers
+    ]
+    attempt_buffer.add((attempt, answers))
+    return attempt
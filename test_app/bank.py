@@ -0,0 +1,335 @@
+"""
+Savollar bazasining har bir worker ichida saqlanadigan o‘zgarmas nusxasi (snapshot).
+
+Savollar, variantlar, kategoriyalar va imtihon shablonlari kam o‘zgaradi, shuning uchun ularni har so‘rovda
+PostgreSQL-dan olish o‘rniga bitta nusxa quriladi va baza versiyasi o‘zgarguncha ishlatiladi.
+Versiya cache-da saqlanadi va `signals.py` dagi signallar orqali oshiriladi.
+"""
+import asyncio
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+from Road_test.cache import aget_version, bump_version, get_version
+from .images import variant_urls
+from .models import Question, AnswerChoice, Category, ExamBlueprint, BlueprintSection, ChangeLog
+
+BANK_VERSION_KEY = "question_bank_version"
+PAGE_SIZE = 10  # Har bir sahifada 10 savol
+IMAGE_META_FIELDS = ('image_width', 'image_height', 'image_size', 'image_color', 'image_placeholder')
+
+# Tillar tartibi: matnlar tuple ichida shu tartibda saqlanadi
+LANGUAGE_CODES = tuple(code for code, _ in settings.LANGUAGES)
+DEFAULT_LANGUAGE_INDEX = LANGUAGE_CODES.index(settings.MODELTRANSLATION_DEFAULT_LANGUAGE)
+
+
+def language_index(lang):
+    """Til kodini matnlar tuple-idagi indeksga aylantirish (noma’lum til -> standart `uz`)"""
+    try:
+        return LANGUAGE_CODES.index(lang)
+    except ValueError:
+        return DEFAULT_LANGUAGE_INDEX
+
+
+def _translations(row, start):
+    """values_list qatoridan barcha tillardagi matnlarni tuple qilib olish"""
+    return tuple(row[start:start + len(LANGUAGE_CODES)])
+
+
+class CategoryRecord:
+    __slots__ = ('id', 'titles')
+
+    def __init__(self, id, titles):
+        self.id = id
+        self.titles = titles
+
+    def title(self, lang_index):
+        """modeltranslation kabi: tarjima bo‘sh bo‘lsa standart tilga qaytish"""
+        return self.titles[lang_index] or self.titles[DEFAULT_LANGUAGE_INDEX]
+
+
+class BlueprintRecord:
+    __slots__ = ('id', 'titles', 'total_time', 'sections')
+
+    def __init__(self, id, titles, total_time, sections):
+        self.id = id
+        self.titles = titles
+        self.total_time = total_time  # Daqiqa
+        self.sections = sections  # ((category_id, count), ...)
+
+    def title(self, lang_index):
+        return self.titles[lang_index] or self.titles[DEFAULT_LANGUAGE_INDEX]
+
+    @property
+    def question_count(self):
+        return sum(count for _, count in self.sections)
+
+    @property
+    def session_ttl(self):
+        """Sessiya muddati (soniya); validatordan oldin kiritilgan 0 daqiqa sessiyani darhol o‘chirmasin"""
+        return max(self.total_time, 1) * 60
+
+
+class ChoiceRecord:
+    __slots__ = ('id', 'question_id', 'texts', 'is_correct')
+
+    def __init__(self, id, question_id, texts, is_correct):
+        self.id = id
+        self.question_id = question_id
+        self.texts = texts
+        self.is_correct = is_correct
+
+
+class QuestionRecord:
+    __slots__ = (
+        'id', 'category_id', 'order', 'image', 'image_variants', 'image_meta', 'texts', 'correct_answers', 'choices',
+    )
+
+    def __init__(self, id, category_id, order, image, image_variants, image_meta, texts, correct_answers, choices):
+        self.id = id
+        self.category_id = category_id
+        self.order = order
+        self.image = image  # Rasmning nisbiy URL manzili yoki None
+        self.image_variants = image_variants  # {"webp": {"320": nisbiy URL, ...}, "jpeg": {...}} yoki None
+        self.image_meta = image_meta  # {"width", "height", "size", "color", "placeholder"} yoki None
+        self.texts = texts
+        self.correct_answers = correct_answers
+        self.choices = choices
+
+
+class QuestionBank:
+    """Butun savollar bazasining o‘zgarmas nusxasi"""
+    __slots__ = (
+        'version', 'questions', 'question_ids', 'by_id', 'categories', 'category_questions',
+        'category_question_ids', 'blueprints', 'answer_key', 'choice_question', 'pages', 'order_keys',
+        'sync_version',
+    )
+
+    def __init__(self, version, questions, categories, blueprints=None, sync_version=0):
+        self.version = version
+        self.sync_version = sync_version  # Nusxaga kirgan oxirgi `ChangeLog` ID (delta sync uchun)
+        self.questions = questions  # (order, id) bo‘yicha tartiblangan tuple
+        self.question_ids = tuple(question.id for question in questions)
+
+        # Sahifalar indeksi (sahifa raqami - 1 -> savollar) va kursor uchun (order, id) kalitlari
+        self.pages = tuple(questions[start:start + PAGE_SIZE] for start in range(0, len(questions), PAGE_SIZE))
+        self.order_keys = [(question.order, question.id) for question in questions]
+        self.by_id = {question.id: question for question in questions}
+        self.categories = categories  # {category_id: CategoryRecord}
+
+        # Javoblar kaliti: {question_id: to‘g‘ri variant ID-lari} (admin bir nechtasini belgilashi mumkin)
+        # va variantlar xaritasi: {choice_id: question_id}
+        answer_key = {}
+        choice_question = {}
+        for question in questions:
+            correct = []
+            for choice in question.choices:
+                choice_question[choice.id] = question.id
+                if choice.is_correct:
+                    correct.append(choice.id)
+            if correct:
+                answer_key[question.id] = frozenset(correct)
+        self.answer_key = answer_key
+        self.choice_question = choice_question
+
+        category_questions = {category_id: [] for category_id in categories}
+        for question in questions:
+            if question.category_id in category_questions:
+                category_questions[question.category_id].append(question)
+        self.category_questions = {key: tuple(value) for key, value in category_questions.items()}
+        # Shablon bo‘yicha tanlash uchun har bir kategoriyaning ID-lar to‘plami
+        self.category_question_ids = {
+            key: tuple(question.id for question in value) for key, value in self.category_questions.items()
+        }
+        self.blueprints = blueprints or {}  # {blueprint_id: BlueprintRecord} (faqat faollari)
+
+    def page(self, page_number):
+        """Sahifadagi savollar (1 dan boshlanadi), mavjud bo‘lmasa bo‘sh tuple"""
+        if 1 <= page_number <= len(self.pages):
+            return self.pages[page_number - 1]
+        return ()
+
+    def questions_after(self, after_order, after_id=None, limit=PAGE_SIZE):
+        """
+        Kursor bo‘yicha sahifalash: (after_order, after_id) dan keyingi `limit` ta savol.
+        `after_id` berilmasa shu `order` qiymatidagi barcha savollar o‘tkazib yuboriladi.
+        """
+        key = (after_order, float('inf') if after_id is None else after_id)
+        start = bisect_right(self.order_keys, key)
+        return self.questions[start:start + limit]
+
+    def get_questions(self, question_ids):
+        """ID-lar ro‘yxati bo‘yicha savollarni shu tartibda qaytarish (o‘chirilganlari tashlab ketiladi)"""
+        by_id = self.by_id
+        return [by_id[question_id] for question_id in question_ids if question_id in by_id]
+
+
+def build_image_meta(values):
+    """`IMAGE_META_FIELDS` qiymatlaridan javobdagi `image_meta` (o‘lchamlar hisoblanmagan bo‘lsa None)"""
+    width, height, size, color, placeholder = values
+    if width is None:
+        return None
+    return {'width': width, 'height': height, 'size': size, 'color': color, 'placeholder': placeholder}
+
+
+def _bank_querysets():
+    """
+    Nusxa uchun kerakli 6 ta so‘rov: oxirgi jurnal ID-si, kategoriyalar, variantlar, savollar va imtihon shablonlari.
+    Jurnal ID-si birinchi o‘qiladi: undan keyingi o‘zgarishlar nusxaga kirsa ham, undan oldingilari albatta kiradi.
+    """
+    text_fields = [f"text_{code}" for code in LANGUAGE_CODES]
+    answer_fields = [f"correct_answer_{code}" for code in LANGUAGE_CODES]
+    title_fields = [f"title_{code}" for code in LANGUAGE_CODES]
+    return (
+        ChangeLog.objects.order_by('-id').values_list('id', flat=True)[:1],
+        Category.objects.order_by('id').values_list('id', *title_fields),
+        AnswerChoice.objects.order_by('id').values_list('id', 'question_id', 'is_correct', *text_fields),
+        Question.objects.order_by('order', 'id').values_list(
+            'id', 'category_id', 'order', 'image', 'image_variants', *IMAGE_META_FIELDS, *text_fields, *answer_fields
+        ),
+        ExamBlueprint.objects.filter(is_active=True).order_by('id').values_list('id', 'total_time', *title_fields),
+        BlueprintSection.objects.filter(blueprint__is_active=True).order_by('id').values_list(
+            'blueprint_id', 'category_id', 'count'
+        ),
+    )
+
+
+def _assemble_bank(version, sync_rows, category_rows, choice_rows, question_rows, blueprint_rows, section_rows):
+    sync_version = next(iter(sync_rows), 0)
+    categories = {row[0]: CategoryRecord(row[0], _translations(row, 1)) for row in category_rows}
+
+    choices = {}
+    for row in choice_rows:
+        choice = ChoiceRecord(row[0], row[1], _translations(row, 3), row[2])
+        choices.setdefault(choice.question_id, []).append(choice)
+
+    storage = Question._meta.get_field('image').storage
+    text_start = 5 + len(IMAGE_META_FIELDS)
+    questions = []
+    for row in question_rows:
+        questions.append(QuestionRecord(
+            id=row[0],
+            category_id=row[1],
+            order=row[2],
+            image=storage.url(row[3]) if row[3] else None,
+            image_variants=variant_urls(row[4]),
+            image_meta=build_image_meta(row[5:text_start]),
+            texts=_translations(row, text_start),
+            correct_answers=_translations(row, text_start + len(LANGUAGE_CODES)),
+            choices=tuple(choices.get(row[0], ())),
+        ))
+
+    sections = {}
+    for blueprint_id, category_id, count in section_rows:
+        sections.setdefault(blueprint_id, []).append((category_id, count))
+    blueprints = {
+        row[0]: BlueprintRecord(row[0], _translations(row, 2), row[1], tuple(sections.get(row[0], ())))
+        for row in blueprint_rows
+    }
+
+    return QuestionBank(version, tuple(questions), categories, blueprints, sync_version)
+
+
+def build_bank(version):
+    """Bazadan 6 ta so‘rov bilan yangi nusxa qurish"""
+    return _assemble_bank(version, *_bank_querysets())
+
+
+async def abuild_bank(version):
+    """`build_bank` ning async ORM bilan ishlaydigan varianti"""
+    rows = []
+    for queryset in _bank_querysets():
+        rows.append([row async for row in queryset])
+    return _assemble_bank(version, *rows)
+
+
+def get_bank_version():
+    """Joriy baza versiyasini cache-dan olish"""
+    return get_version(BANK_VERSION_KEY)
+
+
+async def aget_bank_version():
+    return await aget_version(BANK_VERSION_KEY)
+
+
+def bump_bank_version():
+    """Baza versiyasini oshirish: barcha workerlar nusxani keyingi so‘rovda qayta quradi"""
+    bump_version(BANK_VERSION_KEY)
+
+
+def invalidate_bank():
+    """Tranzaksiya muvaffaqiyatli tugagach versiyani oshirish"""
+    transaction.on_commit(bump_bank_version)
+
+
+_muted = threading.local()
+
+
+@contextmanager
+def mute_bank_signals():
+    """
+    Ommaviy yozuvlar (import) davomida bank va o‘zgarishlar jurnali signallarini o‘chirish:
+    versiya va jurnal yozuvlarini chaqiruvchi o‘zi bir marta yozadi.
+    """
+    previous = getattr(_muted, 'value', False)
+    _muted.value = True
+    try:
+        yield
+    finally:
+        _muted.value = previous
+
+
+def bank_signals_muted():
+    return getattr(_muted, 'value', False)
+
+
+_bank = None
+_bank_lock = threading.Lock()
+_bank_builds = {}  # {versiya: asyncio.Task} - async so‘rovlar uchun bitta qurilish (single-flight)
+
+
+def get_bank():
+    """Joriy versiyaga mos nusxani qaytarish, kerak bo‘lsa qayta qurish"""
+    global _bank
+    version = get_bank_version()
+    bank = _bank
+    if bank is not None and bank.version == version:
+        return bank
+
+    with _bank_lock:
+        if _bank is None or _bank.version != version:
+            _bank = build_bank(version)
+        return _bank
+
+
+def _forget_build(version, task):
+    if _bank_builds.get(version) is task:
+        del _bank_builds[version]
+
+
+async def _abuild_and_store(version):
+    global _bank
+    bank = await abuild_bank(version)
+    _bank = bank
+    return bank
+
+
+async def aget_bank():
+    """
+    `get_bank` ning async varianti: event loop bloklanmaydi, nusxa async ORM bilan quriladi.
+    Versiya o‘zgarganda bir vaqtda kelgan so‘rovlar bitta qurilishni kutadi (har biri alohida qurmaydi).
+    """
+    version = await aget_bank_version()
+    bank = _bank
+    if bank is not None and bank.version == version:
+        return bank
+
+    task = _bank_builds.get(version)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = _bank_builds[version] = asyncio.ensure_future(_abuild_and_store(version))
+        task.add_done_callback(lambda done: _forget_build(version, done))
+    # shield: kutayotgan so‘rov bekor qilinsa ham qurilish boshqalar uchun davom etadi
+    return await asyncio.shield(task)
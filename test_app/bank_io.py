@@ -0,0 +1,400 @@
+"""
+Savollar bazasini CSV/JSONL ko‘rinishida import va eksport qilish.
+
+Fayl qatorma-qator o‘qiladi va `batch_size` talik bo‘laklarga bo‘linadi: har bir bo‘lak alohida
+tranzaksiyada `bulk_create`/`bulk_update` bilan yoziladi, shuning uchun xotira fayl hajmiga bog‘liq emas.
+
+JSONL qatori (bitta savol):
+    {"id": 12, "order": 5, "category": {"uz": "...", "ru": "...", "en": "..."},
+     "text": {"uz": "...", ...}, "correct_answer": {"uz": "...", ...}, "image": "havas.jpeg",
+     "choices": [{"id": 40, "text": {"uz": "...", ...}, "is_correct": true}, ...]}
+
+CSV ustunlari: id, order, category_uz.., text_uz.., correct_answer_uz.., image,
+choice1_id, choice1_uz.., choice1_is_correct, choice2_...
+
+`id` berilgan va bazada bor savol yangilanadi, aks holda yangisi (yangi ID bilan) yaratiladi. Kategoriya `uz` nomi bo‘yicha
+topiladi yoki yaratiladi. `choices` berilsa savol variantlari shu ro‘yxatga tenglashtiriladi
+(ro‘yxatda yo‘q eski variantlar o‘chiriladi), berilmasa variantlarga tegilmaydi.
+
+Eksport xuddi shu formatda (`image` - storage-dagi nom) server-side kursor bilan qatorma-qator chiqariladi,
+shuning uchun uni qaytadan import qilish mumkin va xotira baza hajmiga bog‘liq emas.
+"""
+import csv
+import io
+import json
+import os
+import posixpath
+
+from django.core.files import File
+from django.db import transaction
+
+from .bank import DEFAULT_LANGUAGE_INDEX, LANGUAGE_CODES, bump_bank_version, mute_bank_signals
+from .blobs import recount_blobs
+from .categories import recount_category_questions
+from .changelog import record_changes
+from .images import update_image_data
+from .models import AnswerChoice, Category, ChangeLog, Question
+
+DEFAULT_LANGUAGE = LANGUAGE_CODES[DEFAULT_LANGUAGE_INDEX]
+MAX_CHOICES = 6  # `AnswerChoiceInline.max_num` bilan bir xil
+
+QUESTION_FIELDS = (
+    'category', 'order', 'text', 'correct_answer',
+    *(f"{name}_{code}" for name in ('text', 'correct_answer') for code in LANGUAGE_CODES),
+)
+CHOICE_FIELDS = ('text', 'is_correct', *(f"text_{code}" for code in LANGUAGE_CODES))
+CATEGORY_FIELDS = ('title', *(f"title_{code}" for code in LANGUAGE_CODES))
+
+
+class RecordError(ValueError):
+    """Fayldagi noto‘g‘ri qator (qator raqami bilan)"""
+
+    def __init__(self, line, message):
+        super().__init__(f"{line}-qator: {message}")
+        self.line = line
+
+
+def _texts(value, line, field, required=True):
+    """{"uz": ..., "ru": ...} yoki oddiy satr (faqat `uz`) -> barcha tillar bo‘yicha dict"""
+    if isinstance(value, str):
+        value = {DEFAULT_LANGUAGE: value}
+    if not isinstance(value, dict):
+        value = {}
+    texts = {code: str(value.get(code) or '').strip() for code in LANGUAGE_CODES}
+    if required and not texts[DEFAULT_LANGUAGE]:
+        raise RecordError(line, f"`{field}` ning `{DEFAULT_LANGUAGE}` matni bo‘sh")
+    return texts
+
+
+def _int_or_none(value, line, field):
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RecordError(line, f"`{field}` butun son bo‘lishi kerak")
+
+
+def _bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'ha', '+')
+    return bool(value)
+
+
+def normalize_record(data, line):
+    """JSONL/CSV dan o‘qilgan qatorni yagona ko‘rinishga keltirish va tekshirish"""
+    if not isinstance(data, dict):
+        raise RecordError(line, "qator obyekt bo‘lishi kerak")
+
+    category = data.get('category')
+    choices = data.get('choices')
+    if choices is not None:
+        if not isinstance(choices, list) or len(choices) > MAX_CHOICES:
+            raise RecordError(line, f"`choices` {MAX_CHOICES} tagacha variantdan iborat ro‘yxat bo‘lishi kerak")
+        choices = [
+            {
+                'id': _int_or_none(choice.get('id'), line, 'choices.id'),
+                'text': _texts(choice.get('text'), line, 'choices.text'),
+                'is_correct': _bool(choice.get('is_correct')),
+            }
+            for choice in choices if isinstance(choice, dict)
+        ]
+
+    return {
+        'line': line,
+        'id': _int_or_none(data.get('id'), line, 'id'),
+        'order': _int_or_none(data.get('order'), line, 'order') or 0,
+        'category': _texts(category, line, 'category') if category else None,
+        'text': _texts(data.get('text'), line, 'text'),
+        'correct_answer': _texts(data.get('correct_answer'), line, 'correct_answer', required=False),
+        'image': (data.get('image') or '').strip() or None,
+        'choices': choices,
+    }
+
+
+def _csv_to_dict(row):
+    """Yassi CSV qatorini JSONL bilan bir xil tuzilishga o‘tkazish"""
+    def texts(prefix):
+        return {code: row.get(f"{prefix}_{code}") for code in LANGUAGE_CODES}
+
+    choices = []
+    for number in range(1, MAX_CHOICES + 1):
+        prefix = f"choice{number}"
+        if not (row.get(f"{prefix}_{DEFAULT_LANGUAGE}") or '').strip():
+            continue
+        choices.append({
+            'id': row.get(f"{prefix}_id"),
+            'text': texts(prefix),
+            'is_correct': row.get(f"{prefix}_is_correct"),
+        })
+
+    category = texts('category')
+    return {
+        'id': row.get('id'),
+        'order': row.get('order'),
+        'category': category if category.get(DEFAULT_LANGUAGE) else None,
+        'text': texts('text'),
+        'correct_answer': texts('correct_answer'),
+        'image': row.get('image'),
+        'choices': choices or None,
+    }
+
+
+def read_records(stream, fmt):
+    """Matnli oqimdan normallashtirilgan yozuvlarni bittalab qaytaruvchi generator"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield normalize_record(_csv_to_dict(row), reader.line_num)
+        return
+
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            data = json.loads(text)
+        except ValueError as exc:
+            raise RecordError(line, f"JSON xato: {exc}")
+        yield normalize_record(data, line)
+
+
+def open_records(path, fmt=None):
+    """Fayl kengaytmasidan formatni aniqlab, (format, oqim) qaytarish"""
+    if fmt is None:
+        fmt = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+    return fmt, io.open(path, encoding='utf-8-sig', newline='' if fmt == 'csv' else None)
+
+
+EXPORT_CHUNK_SIZE = 500
+CSV_COLUMNS = (
+    'id', 'order',
+    *(f"{name}_{code}" for name in ('category', 'text', 'correct_answer') for code in LANGUAGE_CODES),
+    'image',
+    *(
+        column
+        for number in range(1, MAX_CHOICES + 1)
+        for column in (
+            f"choice{number}_id", *(f"choice{number}_{code}" for code in LANGUAGE_CODES), f"choice{number}_is_correct"
+        )
+    ),
+)
+
+
+def _get_texts(obj, field):
+    return {code: getattr(obj, f"{field}_{code}") or '' for code in LANGUAGE_CODES}
+
+
+def export_records(chunk_size=EXPORT_CHUNK_SIZE):
+    """Savollarni import formatidagi dict-lar sifatida bittalab qaytarish (variantlar har bo‘lak uchun prefetch)"""
+    questions = (
+        Question.objects.select_related('category').prefetch_related('choices')
+        .order_by('order', 'id').iterator(chunk_size=chunk_size)
+    )
+    for question in questions:
+        yield {
+            'id': question.pk,
+            'order': question.order,
+            'category': _get_texts(question.category, 'title') if question.category else None,
+            'text': _get_texts(question, 'text'),
+            'correct_answer': _get_texts(question, 'correct_answer'),
+            'image': question.image.name or None,
+            'choices': [
+                {'id': choice.pk, 'text': _get_texts(choice, 'text'), 'is_correct': choice.is_correct}
+                for choice in sorted(question.choices.all(), key=lambda choice: choice.pk)
+            ],
+        }
+
+
+def ndjson_lines(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """csv.writer uchun: yozilgan qatorni saqlamasdan qaytaradi"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_row(record):
+    row = {'id': record['id'], 'order': record['order'], 'image': record['image'] or ''}
+    for field in ('category', 'text', 'correct_answer'):
+        for code in LANGUAGE_CODES:
+            row[f"{field}_{code}"] = record[field][code] if record[field] else ''
+    for number, choice in enumerate(record['choices'][:MAX_CHOICES], start=1):
+        row[f"choice{number}_id"] = choice['id']
+        row[f"choice{number}_is_correct"] = int(choice['is_correct'])
+        for code in LANGUAGE_CODES:
+            row[f"choice{number}_{code}"] = choice['text'][code]
+    return row
+
+
+def csv_lines(records):
+    writer = csv.DictWriter(_Echo(), fieldnames=CSV_COLUMNS, restval='')
+    yield writer.writeheader()
+    for record in records:
+        yield writer.writerow(_csv_row(record))
+
+
+EXPORT_FORMATS = {
+    # format: (qatorlar generatori, content type, fayl kengaytmasi)
+    'ndjson': (ndjson_lines, 'application/x-ndjson; charset=utf-8', 'jsonl'),
+    'csv': (csv_lines, 'text/csv; charset=utf-8', 'csv'),
+}
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _set_texts(obj, field, texts):
+    for code in LANGUAGE_CODES:
+        setattr(obj, f"{field}_{code}", texts[code])
+
+
+class QuestionImporter:
+    """
+    Yozuvlarni bo‘laklab bazaga yozadi. Signallar ishlamaydi (bulk yoki o‘chirilgan), shuning uchun bank versiyasi,
+    rasm hisoblagichlari va nusxalari oxirida `finish()` da bir marta yangilanadi.
+    """
+
+    def __init__(self, images_dir=None):
+        self.images_dir = images_dir
+        self.storage = Question._meta.get_field('image').storage
+        self.upload_to = Question._meta.get_field('image').upload_to
+        self.categories = {category.title_uz: category for category in Category.objects.all()}
+        self.stats = {'created': 0, 'updated': 0, 'choices': 0, 'categories': 0, 'images': 0}
+        self.warnings = []
+        self.changed_images = []  # Rasmi o‘zgargan savollar ID-lari
+        self._stored_images = {}  # Fayl yo‘li -> storage nomi (bir xil rasm bir marta o‘qiladi)
+
+    def import_batch(self, records):
+        with transaction.atomic():
+            categories, changed_categories = self._save_categories(records)
+            questions = self._save_questions(records, categories)
+            self._save_choices(records, questions)
+            # Bulk yozuvlar signal yubormaydi: delta sync jurnali shu yerda to‘ldiriladi
+            record_changes(ChangeLog.MODEL_CATEGORY, [category.pk for category in changed_categories])
+            record_changes(ChangeLog.MODEL_QUESTION, [question.pk for question in questions])
+
+    def _save_categories(self, records):
+        created, changed = [], []
+        for record in records:
+            texts = record['category']
+            if texts is None:
+                continue
+            category = self.categories.get(texts[DEFAULT_LANGUAGE])
+            if category is None:
+                category = Category()
+                _set_texts(category, 'title', texts)
+                self.categories[texts[DEFAULT_LANGUAGE]] = category
+                created.append(category)
+            elif category.pk is not None and any(
+                texts[code] and texts[code] != getattr(category, f"title_{code}") for code in LANGUAGE_CODES
+            ):
+                for code in LANGUAGE_CODES:
+                    setattr(category, f"title_{code}", texts[code] or getattr(category, f"title_{code}"))
+                changed.append(category)
+
+        Category.objects.bulk_create(created)
+        Category.objects.bulk_update(changed, CATEGORY_FIELDS)
+        self.stats['categories'] += len(created)
+        return self.categories, created + changed
+
+    def _save_questions(self, records, categories):
+        existing = Question.objects.in_bulk([record['id'] for record in records if record['id'] is not None])
+        created, updated, questions = [], [], []
+        for record in records:
+            question = existing.get(record['id'])
+            if question is None:
+                question = Question()  # Fayldagi ID boshqa bazaniki bo‘lishi mumkin: faqat mavjudini yangilaymiz
+                created.append(question)
+            else:
+                updated.append(question)
+
+            texts = record['category']
+            question.category = categories[texts[DEFAULT_LANGUAGE]] if texts else None
+            question.order = record['order']
+            _set_texts(question, 'text', record['text'])
+            _set_texts(question, 'correct_answer', record['correct_answer'])
+            if record['image']:
+                self._attach_image(question, record)
+            questions.append(question)
+
+        Question.objects.bulk_create(created)
+        Question.objects.bulk_update(updated, (*QUESTION_FIELDS, 'image'))
+        self.stats['created'] += len(created)
+        self.stats['updated'] += len(updated)
+        self.changed_images.extend(
+            question.pk for question in questions
+            if question.image and question.image.name != question.image_variants.get('source')
+        )
+        return questions
+
+    def _attach_image(self, question, record):
+        path = record['image']
+        if path not in self._stored_images:
+            source = os.path.join(self.images_dir, path) if self.images_dir else None
+            if source and os.path.isfile(source):
+                with open(source, 'rb') as content:
+                    name = posixpath.join(self.upload_to, os.path.basename(path))
+                    self._stored_images[path] = self.storage.save(name, File(content, name))
+                self.stats['images'] += 1
+            elif self.storage.exists(path):
+                self._stored_images[path] = path  # Storage-dagi mavjud nom (masalan eksportdan)
+            else:
+                self._stored_images[path] = None
+                self.warnings.append(f"{record['line']}-qator: rasm topilmadi - {path}")
+
+        if self._stored_images[path]:
+            question.image.name = self._stored_images[path]
+
+    def _save_choices(self, records, questions):
+        touched = [question.pk for record, question in zip(records, questions) if record['choices'] is not None]
+        existing = {}
+        for choice in AnswerChoice.objects.filter(question_id__in=touched):
+            existing.setdefault(choice.question_id, {})[choice.pk] = choice
+
+        created, updated, delete_ids = [], [], []
+        for record, question in zip(records, questions):
+            if record['choices'] is None:
+                continue
+            current = existing.get(question.pk, {})
+            for data in record['choices']:
+                choice = current.pop(data['id'], None) if data['id'] is not None else None
+                if choice is None:
+                    choice = AnswerChoice(question=question)
+                    created.append(choice)
+                else:
+                    updated.append(choice)
+                _set_texts(choice, 'text', data['text'])
+                choice.is_correct = data['is_correct']
+            delete_ids.extend(current)  # Faylda ko‘rsatilmagan eski variantlar
+
+        # delete() har bir variant uchun post_delete yuboradi: versiya va jurnal finish() da bir marta yoziladi
+        with mute_bank_signals():
+            AnswerChoice.objects.filter(pk__in=delete_ids).delete()
+        AnswerChoice.objects.bulk_create(created)
+        AnswerChoice.objects.bulk_update(updated, CHOICE_FIELDS)
+        self.stats['choices'] += len(created) + len(updated)
+
+    def finish(self):
+        """Barcha bo‘laklardan keyin: kategoriya va rasm hisoblagichlari, rasm nusxalari, bank versiyasi"""
+        recount_category_questions()  # bulk_create signal yubormaydi
+        if self.changed_images or self.stats['images']:
+            recount_blobs()  # `storage.save` olgan hisoblagichlar ham shu yerda tuzatiladi
+            for question in Question.objects.filter(pk__in=self.changed_images).only('id', 'image', 'image_variants'):
+                try:
+                    update_image_data(question)
+                except (OSError, ValueError) as exc:
+                    self.warnings.append(f"Savol #{question.pk}: {question.image.name} - {exc}")
+
+        bump_bank_version()
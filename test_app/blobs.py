@@ -0,0 +1,81 @@
+"""
+`ImageBlob` hisoblagichlari: savol rasmi o‘zgarganda yangi faylga +1, eskisiga -1.
+Hech bir savol ishlatmay qolgan fayl (va uning nusxalari) tranzaksiya tugagach o‘chiriladi.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+
+from .images import delete_variants
+from .models import ImageBlob, Question
+
+
+def _storage():
+    return Question._meta.get_field('image').storage
+
+
+def acquire_blob(name):
+    """Fayl uchun yozuvni yaratish (kerak bo‘lsa) va hisoblagichni oshirish"""
+    if not name:
+        return
+    blob, _ = ImageBlob.objects.get_or_create(name=name, defaults={'size': _file_size(name)})
+    ImageBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+
+
+def release_blob(name):
+    """Hisoblagichni kamaytirish; nolga tushsa fayl commit-dan keyin o‘chiriladi"""
+    if not name:
+        return
+    ImageBlob.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+    transaction.on_commit(lambda: delete_unused_blobs([name]))
+
+
+def delete_unused_blobs(names=None):
+    """Hisoblagichi 0 bo‘lgan fayllarni, ularning nusxalarini va yozuvlarini o‘chirish"""
+    unused = ImageBlob.objects.filter(ref_count=0)
+    if names is not None:
+        unused = unused.filter(name__in=names)
+
+    storage = _storage()
+    deleted = 0
+    for pk in unused.values_list('pk', flat=True):
+        # Yozuv qulflanadi: shu orada `storage.save` xuddi shu faylga hisoblagich olgan bo‘lsa (yoki qulf
+        # bo‘shashini kutayotgan bo‘lsa) fayl o‘chirilmaydi
+        with transaction.atomic():
+            blob = ImageBlob.objects.select_for_update().filter(pk=pk, ref_count=0).first()
+            if blob is None:
+                continue
+            try:
+                with storage.open(blob.name) as image_file:
+                    # Eski (xeshsiz) nomli fayl nusxalari xeshli nusxasi bilan umumiy: u hali bo‘lsa qoldiriladi
+                    content_name = storage.content_name(blob.name, image_file)
+                    if content_name == blob.name or not ImageBlob.objects.filter(name=content_name).exists():
+                        delete_variants(image_file)
+            except (OSError, ValueError):
+                pass  # Fayl yo‘q yoki rasm emas: nusxalari ham yo‘q
+            storage.delete(blob.name)
+            blob.delete()
+        deleted += 1
+    return deleted
+
+
+def recount_blobs():
+    """Hisoblagichlarni savollardan qaytadan hisoblash (dedup buyrug‘idan keyin)"""
+    counts = dict(
+        Question.objects.exclude(image='').exclude(image__isnull=True)
+        .values_list('image').annotate(total=Count('id')).values_list('image', 'total')
+    )
+    existing = set(ImageBlob.objects.values_list('name', flat=True))
+    ImageBlob.objects.bulk_create([
+        ImageBlob(name=name, size=_file_size(name)) for name in counts if name not in existing
+    ])
+    for blob in ImageBlob.objects.only('id', 'name', 'ref_count'):
+        total = counts.get(blob.name, 0)
+        if blob.ref_count != total:
+            ImageBlob.objects.filter(pk=blob.pk).update(ref_count=total)
+
+
+def _file_size(name):
+    try:
+        return _storage().size(name)
+    except OSError:
+        return 0
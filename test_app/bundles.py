@@ -0,0 +1,255 @@
+"""
+Oflayn to‘plam: bitta til uchun butun baza (kategoriyalar, savollar, variantlar va kichraytirilgan rasmlar)
+bitta zip arxivda. Arxiv bank versiyasi bo‘yicha nomlanadi (`bundles/<til>-<versiya>.zip`) va
+ichida `manifest.json` - har bir faylning hajmi va sha256 xeshi.
+
+To‘plam `build_bundles` buyrug‘i bilan quriladi. Joriy versiya hali qurilmagan bo‘lsa so‘rov uni kutmaydi:
+qurish fon thread-ida boshlanadi (til bo‘yicha bittadan), shu orada oldingi tayyor versiya beriladi, keyin
+eski versiyalar o‘chiriladi. `/test/bundle/<til>/` to‘plamni Range so‘rovlarini qo‘llab-quvvatlagan holda
+beradi (uzilgan yuklashni davom ettirish uchun).
+"""
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import re
+import tempfile
+import threading
+import zipfile
+
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+
+from Road_test.http import if_none_match
+from .bank import get_bank, language_index
+from .models import Question
+
+BUNDLES_DIR = 'bundles/'
+BUNDLE_IMAGE_WIDTH = 640  # To‘plamga shu kenglikdan oshmagan eng katta WebP nusxa olinadi
+KEEP_VERSIONS = 2  # Eski versiyalardan nechtasi diskda qoladi (yuklab olinayotganlari uzilmasligi uchun)
+ZIP_DATE_TIME = (2020, 1, 1, 0, 0, 0)  # Bir xil mazmun -> bir xil arxiv baytlari
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_build_lock = threading.Lock()
+_scheduled = set()  # Fon thread-ida qurilayotgan tillar
+_scheduled_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def bundle_name(lang, version):
+    return f"{BUNDLES_DIR}{lang}-{version}.zip"
+
+
+def _bundle_image(image_name, variants):
+    """To‘plamga qo‘shiladigan rasm: BUNDLE_IMAGE_WIDTH gacha eng katta WebP, bo‘lmasa asl rasm"""
+    webp = (variants or {}).get('webp') or {}
+    widths = [int(width) for width in webp if int(width) <= BUNDLE_IMAGE_WIDTH]
+    if widths:
+        return default_storage, webp[str(max(widths))]
+    return Question._meta.get_field('image').storage, image_name
+
+
+def _write(archive, manifest, name, data):
+    info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    archive.writestr(info, data)
+    manifest[name] = {'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+
+
+def build_bundle(lang, bank=None):
+    """Til uchun joriy bank versiyasidagi to‘plamni qurish (mavjud bo‘lsa qayta qurilmaydi); nomini qaytaradi"""
+    bank = bank or get_bank()
+    name = bundle_name(lang, bank.version)
+    if default_storage.exists(name):
+        return name
+
+    with _build_lock:
+        if default_storage.exists(name):
+            return name
+        lang_index = language_index(lang)
+        images = {
+            question_id: _bundle_image(image, variants)
+            for question_id, image, variants in Question.objects.exclude(image='').exclude(image__isnull=True)
+            .values_list('id', 'image', 'image_variants')
+        }
+
+        manifest = {}
+        path = default_storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Vaqtinchalik faylga yozib, keyin atomar almashtiriladi: yarim yozilgan arxiv berilmaydi
+        temp = tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix='.tmp', delete=False)
+        try:
+            with temp, zipfile.ZipFile(temp, 'w') as archive:
+                questions = []
+                for question in bank.questions:
+                    image_path = None
+                    if question.id in images:
+                        storage, image_name = images[question.id]
+                        image_path = f"images/{posixpath.basename(image_name)}"
+                        if image_path not in manifest:
+                            try:
+                                with storage.open(image_name, 'rb') as image_file:
+                                    _write(archive, manifest, image_path, image_file.read())
+                            except OSError:
+                                image_path = None  # Fayl yo‘q: savol rasmsiz qo‘shiladi
+                    questions.append({
+                        'id': question.id,
+                        'category_id': question.category_id,
+                        'order': question.order,
+                        'text': question.texts[lang_index],
+                        'image': image_path,
+                        'image_meta': question.image_meta,
+                        'correct_answer': question.correct_answers[lang_index],
+                        'choices': [
+                            {'id': choice.id, 'text': choice.texts[lang_index], 'is_correct': choice.is_correct}
+                            for choice in question.choices
+                        ],
+                    })
+
+                categories = [
+                    {'id': category.id, 'title': category.title(lang_index)} for category in bank.categories.values()
+                ]
+                for file_name, data in (('questions.json', questions), ('categories.json', categories)):
+                    _write(archive, manifest, file_name, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+                _write(archive, {}, 'manifest.json', json.dumps({
+                    'version': bank.version,
+                    'sync_version': bank.sync_version,  # `/test/changes/?since=` uchun
+                    'language': lang,
+                    'question_count': len(questions),
+                    'files': manifest,
+                }, ensure_ascii=False, indent=1).encode('utf-8'))
+            os.replace(temp.name, path)
+        except BaseException:
+            os.unlink(temp.name)
+            raise
+        return name
+
+
+def _bundle_versions(lang):
+    """Diskdagi arxivlar: [(versiya, nom), ...] versiya bo‘yicha o‘sish tartibida"""
+    if not default_storage.exists(BUNDLES_DIR):
+        return []
+    pattern = re.compile(rf'^{re.escape(lang)}-(\d+)\.zip$')
+    return sorted(
+        (int(match.group(1)), f"{BUNDLES_DIR}{match.group(0)}")
+        for match in map(pattern.match, default_storage.listdir(BUNDLES_DIR)[1]) if match
+    )
+
+
+def delete_old_bundles(lang, keep=KEEP_VERSIONS):
+    """Til uchun eng yangi `keep` ta versiyadan boshqa arxivlarni o‘chirish"""
+    versions = _bundle_versions(lang)
+    old = versions[:-keep] if keep else versions
+    for _, name in old:
+        default_storage.delete(name)
+    return len(old)
+
+
+def _build_in_background(lang):
+    try:
+        close_old_connections()
+        build_bundle(lang)
+        delete_old_bundles(lang)
+    except Exception:
+        logger.exception("%s tilidagi oflayn to‘plamni qurib bo‘lmadi", lang)
+    finally:
+        with _scheduled_lock:
+            _scheduled.discard(lang)
+        close_old_connections()
+
+
+def schedule_build(lang):
+    """To‘plamni fon thread-ida qurish; shu til allaqachon qurilayotgan bo‘lsa hech narsa qilinmaydi"""
+    with _scheduled_lock:
+        if lang in _scheduled:
+            return
+        _scheduled.add(lang)
+    threading.Thread(target=_build_in_background, args=(lang,), name=f"bundle-{lang}", daemon=True).start()
+
+
+def ready_bundle(lang, bank):
+    """
+    (versiya, nom): joriy versiya tayyor bo‘lsa o‘sha, aks holda qurish fonda boshlanadi va oldingi
+    tayyor versiya qaytariladi. Diskda hech qanday to‘plam bo‘lmasa None.
+    """
+    name = bundle_name(lang, bank.version)
+    if default_storage.exists(name):
+        return bank.version, name
+    schedule_build(lang)
+    versions = _bundle_versions(lang)
+    return versions[-1] if versions else None
+
+
+def _parse_range(header, size):
+    """`bytes=start-end` (bitta oraliq) -> (start, end) yoki None; qanoatlantirib bo‘lmasa ValueError"""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':  # Oxirgi N bayt
+        length = int(end)
+        if length == 0:
+            raise ValueError
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as bundle:
+        bundle.seek(start)
+        while length > 0:
+            chunk = bundle.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def bundle_response(request, lang, version, name):
+    """Arxivni ETag, If-None-Match/If-Range va bitta Range oraliq (206/416) bilan berish"""
+    path = default_storage.path(name)
+    size = os.path.getsize(path)
+    etag = f'"bundle-{lang}-{version}"'
+    file_name = f"road-test-{lang}-{version}.zip"
+
+    if if_none_match(request, (etag,)):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), as_attachment=True, filename=file_name,
+                                content_type='application/zip')
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(path, start, end - start + 1), status=206,
+                                         content_type='application/zip')
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['X-Bundle-Version'] = str(version)
+    response['Cache-Control'] = "public, max-age=300"
+    return response
@@ -0,0 +1,31 @@
+"""
+Kategoriyalar: savollar soni hisoblagichi (`Category.question_count`) va `/test/categories/` javobi.
+
+Hisoblagich savol qo‘shilganda, boshqa kategoriyaga o‘tkazilganda yoki o‘chirilganda signallar bilan
+F() orqali yangilanadi; signalsiz ommaviy yozuvlardan keyin `recount_category_questions()` chaqiriladi.
+"""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from Road_test.singletons import CachedSingleton
+from .models import Category, Question
+from .serializers import CategorySerializer
+
+
+def change_question_count(category_id, delta):
+    if category_id is not None:
+        Category.objects.filter(pk=category_id).update(question_count=F('question_count') + delta)
+
+
+def recount_category_questions():
+    """Barcha hisoblagichlarni bitta UPDATE bilan qayta hisoblash"""
+    counts = Question.objects.filter(category=OuterRef('pk')).order_by().values('category').annotate(n=Count('id'))
+    Category.objects.update(question_count=Coalesce(Subquery(counts.values('n')), 0))
+    categories.invalidate()
+
+
+def _build_categories():
+    return CategorySerializer(Category.objects.only('id', 'title', 'question_count'), many=True).data
+
+
+categories = CachedSingleton('categories', _build_categories, per_language=True)
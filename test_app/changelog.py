@@ -0,0 +1,69 @@
+"""
+O‘zgarishlar jurnali (`ChangeLog`) va delta sync.
+
+Yozuvlar tranzaksiya commit bo‘lgach qo‘shiladi. Baza nusxasi qurilayotganda oxirgi jurnal ID-si
+(`bank.sync_version`) birinchi bo‘lib o‘qiladi: `/test/changes/` faqat shu ID gacha qaytaradi.
+
+ID-lar commit tartibida emas, ajratilish tartibida: parallel yozuvlarda kichik ID-li qator kattasidan
+keyin commit bo‘lishi mumkin va mijoz kursori uning ustidan o‘tib ketadi. Shuning uchun har so‘rovda
+kursor ortidagi oxirgi `SYNC_OVERLAP` ta ID ham qayta o‘qiladi; takror kelgan o‘zgarishlar zararsiz
+(obyektning joriy holati qaytadi).
+"""
+from django.db import transaction
+
+from .models import ChangeLog
+
+MAX_CHANGES = 1000
+SYNC_OVERLAP = 1000  # Kursor ortidan qayta o‘qiladigan ID-lar (kechikib commit bo‘lgan yozuvlar uchun)
+
+
+def record_changes(model, object_ids, action=ChangeLog.ACTION_UPSERT):
+    """Commit-dan keyin jurnalga yozish (bir nechta obyekt bitta bulk_create bilan)"""
+    object_ids = list(dict.fromkeys(object_id for object_id in object_ids if object_id is not None))
+    if not object_ids:
+        return
+    transaction.on_commit(lambda: ChangeLog.objects.bulk_create(
+        [ChangeLog(model=model, object_id=object_id, action=action) for object_id in object_ids]
+    ))
+
+
+def compacted_through():
+    """Jurnalning qaysi ID gacha qismi o‘chirilgan (undan eski `since` uchun to‘liq qayta yuklash kerak)"""
+    first_id = ChangeLog.objects.order_by('id').values_list('id', flat=True).first()
+    return first_id - 1 if first_id is not None else 0
+
+
+def get_changes(bank, since, limit=MAX_CHANGES):
+    """
+    `since` dan keyingi (nusxadagi `sync_version` gacha) o‘zgarishlar: har bir obyekt uchun oxirgi holat.
+    Kursor ortidagi `SYNC_OVERLAP` ta ID ham qo‘shiladi, lekin ular `limit` ga kirmaydi va kursorni surmaydi.
+    Natija: (o‘zgarganlar {model: [ID]}, o‘chirilganlar {model: [ID]}, yangi versiya, has_more).
+    """
+    fields = ('id', 'model', 'object_id', 'action')
+    overlap = list(
+        ChangeLog.objects.filter(id__gt=since - SYNC_OVERLAP, id__lte=min(since, bank.sync_version))
+        .order_by('id').values_list(*fields)
+    )
+    rows = list(
+        ChangeLog.objects.filter(id__gt=since, id__lte=bank.sync_version)
+        .order_by('id').values_list(*fields)[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    latest = {}
+    for _, model, object_id, action in overlap + rows:
+        latest[(model, object_id)] = action
+
+    sources = {ChangeLog.MODEL_CATEGORY: bank.categories, ChangeLog.MODEL_QUESTION: bank.by_id}
+    upserted = {ChangeLog.MODEL_CATEGORY: [], ChangeLog.MODEL_QUESTION: []}
+    deleted = {ChangeLog.MODEL_CATEGORY: [], ChangeLog.MODEL_QUESTION: []}
+    for (model, object_id), action in latest.items():
+        # Keyinroq o‘chirilgan (nusxada yo‘q) obyekt ham o‘chirilgan deb beriladi
+        if action == ChangeLog.ACTION_UPSERT and object_id in sources[model]:
+            upserted[model].append(object_id)
+        else:
+            deleted[model].append(object_id)
+
+    version = rows[-1][0] if has_more else max(since, bank.sync_version)
+    return upserted, deleted, version, has_more
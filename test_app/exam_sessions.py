@@ -0,0 +1,102 @@
+"""
+Tasodifiy imtihon sessiyalari.
+
+Har bir sessiya cache-da bitta kichik yozuv (tuple) sifatida saqlanadi: sessiya ID, foydalanuvchi,
+savollar ID-lari, seed, yaratilgan va tugash vaqti. Yozuv bitta `cache.set` bilan yoziladi (atomar),
+o‘qish esa kalit bo‘yicha O(1). Foydalanuvchining bir nechta sessiyasi bo‘lishi mumkin;
+`exam_current_session_{user_id}` faqat oxirgi sessiyaga ko‘rsatkich.
+"""
+import re
+import secrets
+import time
+
+from django.core.cache import cache
+
+SESSION_TTL = 1800  # 30 daqiqa
+SESSION_KEY = "exam_session_{}"
+CURRENT_SESSION_KEY = "exam_current_session_{}"
+SESSION_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class ExamSession:
+    __slots__ = ('session_id', 'user_id', 'question_ids', 'seed', 'created_at', 'deadline')
+
+    def __init__(self, session_id, user_id, question_ids, seed, created_at, deadline):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.question_ids = question_ids
+        self.seed = seed
+        self.created_at = created_at
+        self.deadline = deadline
+
+    def to_record(self):
+        return (self.session_id, self.user_id, self.question_ids, self.seed, self.created_at, self.deadline)
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(*record)
+
+    @property
+    def is_expired(self):
+        return self.deadline <= time.time()
+
+
+def _new_session(user_id, question_ids, seed, ttl):
+    now = time.time()
+    return ExamSession(secrets.token_urlsafe(12), user_id, tuple(question_ids), seed, now, now + ttl)
+
+
+def _valid_session_id(session_id):
+    return isinstance(session_id, str) and SESSION_ID_RE.match(session_id) is not None
+
+
+def _check_session(record, user_id):
+    if record is None:
+        return None
+    session = ExamSession.from_record(record)
+    if session.user_id != user_id or session.is_expired:
+        return None
+    return session
+
+
+def create_session(user_id, question_ids, seed, ttl=SESSION_TTL):
+    """Yangi sessiya yaratish va uni foydalanuvchining joriy sessiyasi qilish"""
+    session = _new_session(user_id, question_ids, seed, ttl)
+
+    # Yozuv to‘liq holda bitta set bilan yoziladi; ko‘rsatkich yozilmay qolsa ham eski sessiya buzilmaydi
+    cache.set(SESSION_KEY.format(session.session_id), session.to_record(), timeout=ttl)
+    cache.set(CURRENT_SESSION_KEY.format(user_id), session.session_id, timeout=ttl)
+    return session
+
+
+def get_session(user_id, session_id=None):
+    """
+    Foydalanuvchi sessiyasini olish: `session_id` berilmasa joriy sessiya.
+    Topilmasa, muddati o‘tgan yoki boshqa foydalanuvchiniki bo‘lsa None.
+    """
+    if session_id is None:
+        session_id = cache.get(CURRENT_SESSION_KEY.format(user_id))
+        if session_id is None:
+            return None
+    elif not _valid_session_id(session_id):
+        return None
+
+    return _check_session(cache.get(SESSION_KEY.format(session_id)), user_id)
+
+
+async def acreate_session(user_id, question_ids, seed, ttl=SESSION_TTL):
+    session = _new_session(user_id, question_ids, seed, ttl)
+    await cache.aset(SESSION_KEY.format(session.session_id), session.to_record(), timeout=ttl)
+    await cache.aset(CURRENT_SESSION_KEY.format(user_id), session.session_id, timeout=ttl)
+    return session
+
+
+async def aget_session(user_id, session_id=None):
+    if session_id is None:
+        session_id = await cache.aget(CURRENT_SESSION_KEY.format(user_id))
+        if session_id is None:
+            return None
+    elif not _valid_session_id(session_id):
+        return None
+
+    return _check_session(await cache.aget(SESSION_KEY.format(session_id)), user_id)
@@ -0,0 +1,61 @@
+"""
+Javoblarni baza nusxasidagi javoblar kaliti (`QuestionBank.answer_key`) bo‘yicha bir o‘tishda tekshirish.
+Hech qanday so‘rov yuborilmaydi.
+"""
+
+
+class GradedAnswer:
+    __slots__ = ('question_id', 'answer_id', 'is_correct')
+
+    def __init__(self, question_id, answer_id, is_correct):
+        self.question_id = question_id
+        self.answer_id = answer_id
+        self.is_correct = is_correct
+
+
+class Grading:
+    """Tekshiruv natijasi: har bir savol bo‘yicha javob va umumiy hisob"""
+    __slots__ = ('answers', 'correct_count')
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.correct_count = sum(1 for answer in answers if answer.is_correct)
+
+    @property
+    def total_questions(self):
+        return len(self.answers)
+
+    @property
+    def incorrect_count(self):
+        return self.total_questions - self.correct_count
+
+    @property
+    def percentage(self):
+        total = self.total_questions
+        return round((self.correct_count / total) * 100, 2) if total > 0 else 0
+
+    def as_response(self):
+        return {
+            "total_questions": self.total_questions,
+            "correct_answers": self.correct_count,
+            "incorrect_answers": self.incorrect_count,
+            "percentage": self.percentage,
+        }
+
+
+def grade_answers(question_ids, answers, answer_key):
+    """
+    `question_ids` dagi har bir savolni tekshirish.
+    `answer_key` - {savol ID: to‘g‘ri variant ID-lari}; ulardan istalgani to‘g‘ri hisoblanadi.
+    Javob berilmagan savol noto‘g‘ri hisoblanadi; bir savolga bir necha javob kelsa birinchisi olinadi.
+    """
+    submitted = {}
+    for answer in answers:
+        submitted.setdefault(answer["question_id"], answer["answer_id"])
+
+    graded = []
+    for question_id in question_ids:
+        answer_id = submitted.get(question_id)
+        is_correct = answer_id is not None and answer_id in answer_key.get(question_id, ())
+        graded.append(GradedAnswer(question_id, answer_id, is_correct))
+    return Grading(graded)
@@ -0,0 +1,191 @@
+"""
+Savol rasmlarining kichraytirilgan nusxalari (WebP va JPEG, bir nechta kenglikda).
+
+Nusxa nomlari asl rasm mazmunining xeshidan olinadi (`questions/variants/<xesh>-<kenglik>.<format>`),
+ya’ni nom o‘zgarmas: mazmun o‘zgarsa nom ham o‘zgaradi, shuning uchun ularni abadiy keshlash mumkin.
+Nusxalar rasm yuklanganda (`signals.py`) yoki `build_image_variants` buyrug‘i bilan yaratiladi.
+Shu bilan birga rasm o‘lchamlari, hajmi, asosiy rangi va placeholder ham hisoblanadi: mijoz rasm
+yuklanmasidan oldin joy ajratib, xira nusxani ko‘rsata oladi.
+
+Production-da nusxalarni nginx to‘g‘ridan-to‘g‘ri diskdan beradi (`nginx/road_test.conf`);
+`serve_variant` faqat DEBUG rejimida ulanadi.
+"""
+import base64
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.views.static import serve
+from PIL import Image, ImageOps
+
+from .storage import digest_chunks
+
+VARIANTS_DIR = 'questions/variants/'
+VARIANT_WIDTHS = (320, 640, 1024)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PLACEHOLDER_WIDTH = 16  # LQIP: shu o‘lchamdagi xira WebP (data URI)
+EMPTY_METADATA = {
+    'image_width': None, 'image_height': None, 'image_size': None, 'image_color': '', 'image_placeholder': '',
+}
+
+# {kalit: (Pillow formati, fayl kengaytmasi, saqlash parametrlari)}; tartib - mijoz uchun afzallik tartibi
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 80, 'optimize': True, 'progressive': True}),
+}
+
+
+def _target_widths(width):
+    """Asl rasmdan kichik kengliklar va asl kenglik (eng kattasidan oshmagan holda)"""
+    widths = [target for target in VARIANT_WIDTHS if target < width]
+    widths.append(min(width, VARIANT_WIDTHS[-1]))
+    return sorted(set(widths))
+
+
+def _encode(image, fmt, options):
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        # JPEG shaffoflikni saqlamaydi: shaffof joylar oq fon bilan to‘ldiriladi
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        rgba = image.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        image = background
+    elif fmt == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def _load(image_file):
+    """Fayl baytlari va EXIF bo‘yicha to‘g‘rilangan rasm"""
+    image_file.open('rb')
+    try:
+        content = image_file.read()
+    finally:
+        image_file.close()
+
+    with Image.open(io.BytesIO(content)) as source:
+        source = ImageOps.exif_transpose(source)
+        source.load()
+    return content, source
+
+
+def _variant_names(content, source):
+    """Nusxa nomlari faqat asl rasm mazmuni va kengligidan olinadi: {kalit: {kenglik: nom}}"""
+    digest = digest_chunks((content,))
+    return {
+        key: {width: f"{VARIANTS_DIR}{digest}-{width}.{extension}" for width in _target_widths(source.width)}
+        for key, (_, extension, _) in VARIANT_FORMATS.items()
+    }
+
+
+def _build_variants(name, content, source):
+    storage = default_storage
+    variants = {'source': name}
+    for key, names in _variant_names(content, source).items():
+        fmt, _, options = VARIANT_FORMATS[key]
+        variants[key] = {}
+        for width, variant_name in names.items():
+            if not storage.exists(variant_name):
+                height = max(1, round(source.height * width / source.width))
+                resized = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+                variant_name = storage.save(variant_name, ContentFile(_encode(resized, fmt, options)))
+            variants[key][str(width)] = variant_name
+    return variants
+
+
+def build_variants(image_file):
+    """
+    Rasm faylidan barcha nusxalarni yaratish va saqlash.
+    Natija `Question.image_variants` uchun: {"source": asl nom, "webp": {"320": nom, ...}, "jpeg": {...}}.
+    Xuddi shu mazmundagi nusxa allaqachon bo‘lsa qayta yozilmaydi. Nusxalar nomi o‘zi xeshli bo‘lgani uchun
+    ular asl rasm storage-ida emas, oddiy `default_storage` da aynan shu nom bilan saqlanadi.
+    """
+    content, source = _load(image_file)
+    return _build_variants(image_file.name, content, source)
+
+
+def _metadata(content, source):
+    """O‘lchamlar, fayl hajmi, asosiy rang va kichik xira placeholder (data URI)"""
+    rgb = source.convert('RGB')
+
+    # Asosiy rang: kichik nusxani 5 rangga keltirib, eng ko‘p uchraganini olish
+    small = rgb.copy()
+    small.thumbnail((64, 64))
+    quantized = small.quantize(colors=5)
+    _, index = max(quantized.getcolors())
+    red, green, blue = quantized.getpalette()[index * 3:index * 3 + 3]
+
+    preview = rgb.copy()
+    preview.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+    buffer = io.BytesIO()
+    preview.save(buffer, 'WEBP', quality=30)
+
+    return {
+        'image_width': source.width,
+        'image_height': source.height,
+        'image_size': len(content),
+        'image_color': f"#{red:02x}{green:02x}{blue:02x}",
+        'image_placeholder': "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode('ascii'),
+    }
+
+
+def image_metadata(image_file):
+    """`Question` dagi rasm metama’lumotlari maydonlari uchun qiymatlar"""
+    return _metadata(*_load(image_file))
+
+
+def image_data_outdated(question):
+    """Rasm o‘zgargan (yoki o‘chirilgan) yoki metama’lumotlar hisoblanmagan bo‘lsa qayta hisoblash kerak"""
+    source = question.image_variants.get('source') if question.image_variants else None
+    if source != (question.image.name or None):
+        return True
+    return bool(question.image) and question.image_width is None
+
+
+def update_image_data(question):
+    """
+    Savol rasmini bir marta o‘qib, nusxalar va metama’lumotlarni hisoblash va faqat shu maydonlarni yangilash
+    (`save()` chaqirilmaydi, signallar qayta ishlamaydi).
+    """
+    if question.image:
+        content, source = _load(question.image)
+        fields = _metadata(content, source)
+        fields['image_variants'] = _build_variants(question.image.name, content, source)
+    else:
+        fields = {'image_variants': {}, **EMPTY_METADATA}
+
+    for field, value in fields.items():
+        setattr(question, field, value)
+    type(question).objects.filter(pk=question.pk).update(**fields)
+    return fields
+
+
+def delete_variants(image_file, storage=default_storage):
+    """
+    Asl rasmning barcha nusxalarini o‘chirish (asl fayl o‘chirilishidan oldin chaqiriladi).
+    Nomlar fayl nomidan emas, mazmunidan hisoblanadi: eski (xeshsiz) nomli rasmlar nusxalari ham o‘chadi.
+    """
+    for names in _variant_names(*_load(image_file)).values():
+        for name in names.values():
+            storage.delete(name)
+
+
+def variant_urls(variants, storage=default_storage):
+    """`image_variants` dan nisbiy URL-lar: {"webp": {"320": url, ...}, ...} yoki None"""
+    if not variants:
+        return None
+    return {
+        key: {width: storage.url(name) for width, name in variants[key].items()}
+        for key in VARIANT_FORMATS if key in variants
+    }
+
+
+def serve_variant(request, path):
+    """Nusxalarni o‘zgarmas (immutable) Cache-Control bilan berish (faqat DEBUG; production-da nginx)"""
+    response = serve(request, path, document_root=os.path.join(settings.MEDIA_ROOT, VARIANTS_DIR))
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from test_app.bank import IMAGE_META_FIELDS, bump_bank_version
+from test_app.changelog import record_changes
+from test_app.images import image_metadata
+from test_app.models import ChangeLog, Question
+
+BATCH_SIZE = 200
+
+
+def _compute(question):
+    try:
+        return image_metadata(question.image)
+    except (OSError, ValueError) as exc:  # Fayl topilmadi yoki rasm buzilgan
+        return exc
+
+
+class Command(BaseCommand):
+    help = "Savol rasmlarining o‘lchamlari, hajmi, asosiy rangi va placeholder-ini hisoblash (backfill)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help="Rasmlarni parallel o‘qiydigan thread-lar soni")
+        parser.add_argument('--force', action='store_true', help="Hisoblanganlarni ham qayta hisoblash")
+
+    def handle(self, *args, workers=8, force=False, **options):
+        questions = Question.objects.exclude(image='').exclude(image__isnull=True).only('id', 'image')
+        if not force:
+            questions = questions.filter(image_width__isnull=True)
+
+        # Thread-lar faqat fayllarni o‘qib, Pillow bilan hisoblaydi; bazaga asosiy thread partiyalab yozadi
+        updated = failed = 0
+        batch = []
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            questions = list(questions)
+            for question, result in zip(questions, executor.map(_compute, questions)):
+                if isinstance(result, Exception):
+                    failed += 1
+                    self.stderr.write(f"Savol #{question.pk}: {question.image.name} - {result}")
+                    continue
+
+                for field, value in result.items():
+                    setattr(question, field, value)
+                batch.append(question)
+                if len(batch) >= BATCH_SIZE:
+                    updated += self._save(batch)
+                    batch = []
+        if batch:
+            updated += self._save(batch)
+
+        if updated:
+            bump_bank_version()  # bulk_update signal yubormaydi
+        self.stdout.write(self.style.SUCCESS(f"Tayyor: {updated} ta rasm, xatolar: {failed}"))
+
+    def _save(self, batch):
+        updated = Question.objects.bulk_update(batch, IMAGE_META_FIELDS)
+        record_changes(ChangeLog.MODEL_QUESTION, [question.pk for question in batch])
+        return updated
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from test_app.bank import LANGUAGE_CODES, get_bank
+from test_app.bundles import build_bundle, delete_old_bundles
+
+
+class Command(BaseCommand):
+    help = "Har bir til uchun joriy bank versiyasining oflayn to‘plamini (zip) qurish va eskilarini o‘chirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--language', choices=LANGUAGE_CODES, action='append', help="Standart: barcha tillar")
+
+    def handle(self, *args, language=None, **options):
+        bank = get_bank()
+        for lang in language or LANGUAGE_CODES:
+            name = build_bundle(lang, bank)
+            deleted = delete_old_bundles(lang)
+            self.stdout.write(self.style.SUCCESS(f"{name} tayyor (o‘chirilgan eski versiyalar: {deleted})"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from test_app.bank import bump_bank_version
+from test_app.changelog import record_changes
+from test_app.images import image_data_outdated, update_image_data
+from test_app.models import ChangeLog, Question
+
+
+class Command(BaseCommand):
+    help = "Savol rasmlarining WebP/JPEG nusxalari va metama’lumotlarini yaratish (mavjud rasmlar uchun backfill)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Nusxasi bor rasmlarni ham qayta qurish")
+
+    def handle(self, *args, force=False, **options):
+        questions = Question.objects.exclude(image='').exclude(image__isnull=True).only(
+            'id', 'image', 'image_variants', 'image_width'
+        )
+        built = failed = 0
+        built_ids = []
+        for question in questions.iterator(chunk_size=500):
+            if not force and not image_data_outdated(question):
+                continue
+            try:
+                update_image_data(question)
+                built += 1
+                built_ids.append(question.pk)
+            except (OSError, ValueError) as exc:  # Fayl topilmadi yoki rasm buzilgan
+                failed += 1
+                self.stderr.write(f"Savol #{question.pk}: {question.image.name} - {exc}")
+
+        if built:
+            # queryset.update signal yubormaydi
+            record_changes(ChangeLog.MODEL_QUESTION, built_ids)
+            bump_bank_version()
+        self.stdout.write(self.style.SUCCESS(f"Tayyor: {built} ta rasm, xatolar: {failed}"))
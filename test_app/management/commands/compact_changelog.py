@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from test_app.models import ChangeLog
+
+
+class Command(BaseCommand):
+    help = "O‘zgarishlar jurnalining eski yozuvlarini o‘chirish (undan eski versiyali mijozlar to‘liq qayta yuklaydi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Shuncha kundan eski yozuvlar o‘chiriladi")
+
+    def handle(self, *args, days=30, **options):
+        cutoff = timezone.now() - timedelta(days=days)
+        # Eng oxirgi yozuv har doim qoladi: siqilgan chegara birinchi qolgan ID bo‘yicha aniqlanadi
+        last_id = ChangeLog.objects.order_by('-id').values_list('id', flat=True).first()
+        if last_id is None:
+            self.stdout.write("Jurnal bo‘sh")
+            return
+
+        deleted, _ = ChangeLog.objects.filter(created_at__lt=cutoff, id__lt=last_id).delete()
+        self.stdout.write(self.style.SUCCESS(f"O‘chirildi: {deleted} ta yozuv"))
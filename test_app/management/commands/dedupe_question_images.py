@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from test_app.bank import bump_bank_version
+from test_app.blobs import delete_unused_blobs, recount_blobs
+from test_app.changelog import record_changes
+from test_app.models import ChangeLog, Question
+
+
+class Command(BaseCommand):
+    help = "Savol rasmlarini mazmun xeshi bo‘yicha birlashtirish: bir xil rasm diskda bir marta qoladi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-originals', action='store_true',
+                            help="Eski (xeshsiz) fayllarni o‘chirmasdan qoldirish")
+
+    def handle(self, *args, keep_originals=False, **options):
+        storage = Question._meta.get_field('image').storage
+        questions = Question.objects.exclude(image='').exclude(image__isnull=True).only('id', 'image', 'image_variants')
+
+        renamed = {}  # eski nom -> xeshli nom
+        changed = []
+        missing = 0
+        for question in questions.iterator(chunk_size=500):
+            old_name = question.image.name
+            if old_name not in renamed:
+                try:
+                    with storage.open(old_name, 'rb') as content:
+                        renamed[old_name] = storage.save(old_name, content)
+                except OSError as exc:
+                    missing += 1
+                    self.stderr.write(f"Savol #{question.pk}: {old_name} - {exc}")
+                    continue
+
+            new_name = renamed[old_name]
+            if new_name != old_name:
+                question.image.name = new_name
+                if question.image_variants:
+                    # Nusxalar mazmun xeshi bo‘yicha nomlangan, ularni qayta qurish shart emas
+                    question.image_variants = {**question.image_variants, 'source': new_name}
+                changed.append(question)
+
+        with transaction.atomic():
+            for start in range(0, len(changed), 500):
+                Question.objects.bulk_update(changed[start:start + 500], ['image', 'image_variants'])
+            recount_blobs()
+            record_changes(ChangeLog.MODEL_QUESTION, [question.pk for question in changed])
+        delete_unused_blobs()
+
+        freed = 0
+        if not keep_originals:
+            for old_name, new_name in renamed.items():
+                if old_name != new_name and storage.exists(old_name):
+                    freed += storage.size(old_name)
+                    storage.delete(old_name)
+
+        if changed:
+            bump_bank_version()  # bulk_update signal yubormaydi
+        unique = len(set(renamed.values()))
+        self.stdout.write(self.style.SUCCESS(
+            f"Fayllar: {len(renamed)} -> {unique}, yangilangan savollar: {len(changed)}, "
+            f"bo‘shagan joy: {freed // 1024} KB, topilmagan: {missing}"
+        ))
@@ -0,0 +1,24 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from test_app.bank_io import EXPORT_FORMATS, export_records
+
+
+class Command(BaseCommand):
+    help = "Savollar bazasini NDJSON yoki CSV faylga oqim bilan eksport qilish (import_questions formatida)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Chiqish fayli (standart: stdout)")
+        parser.add_argument('--format', choices=tuple(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, path='-', format='ndjson', chunk_size=500, **options):
+        lines = EXPORT_FORMATS[format][0](export_records(chunk_size=chunk_size))
+        if path == '-':
+            sys.stdout.writelines(lines)
+            return
+
+        with open(path, 'w', encoding='utf-8', newline='') as output:
+            output.writelines(lines)
+        self.stderr.write(self.style.SUCCESS(f"Eksport tayyor: {path}"))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from test_app.bank_io import QuestionImporter, RecordError, batched, open_records, read_records
+
+
+class Command(BaseCommand):
+    help = "Savollarni CSV yoki JSONL fayldan import qilish (bo‘laklab, bulk_create/bulk_update bilan)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV yoki JSONL fayl")
+        parser.add_argument('--format', choices=('csv', 'jsonl'), help="Standart: fayl kengaytmasidan")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--images-dir', help="`image` ustunidagi nisbiy yo‘llar uchun papka")
+
+    def handle(self, *args, path, format=None, batch_size=500, images_dir=None, **options):
+        importer = QuestionImporter(images_dir=images_dir)
+        fmt, stream = open_records(path, format)
+        started = time.monotonic()
+        total = 0
+        try:
+            with stream:
+                for batch in batched(read_records(stream, fmt), max(1, batch_size)):
+                    importer.import_batch(batch)
+                    total += len(batch)
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(f"{total} ta savol, {total / max(elapsed, 1e-6):.0f} savol/s")
+        except RecordError as exc:
+            # Oldingi bo‘laklar saqlangan: versiya baribir oshiriladi
+            importer.finish()
+            raise CommandError(f"{exc} ({total} ta savol saqlandi)")
+
+        importer.finish()
+        for warning in importer.warnings:
+            self.stderr.write(warning)
+
+        elapsed = time.monotonic() - started
+        stats = importer.stats
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: {total} ta savol {elapsed:.1f} s da ({total / max(elapsed, 1e-6):.0f} savol/s). "
+            f"Yangi: {stats['created']}, yangilangan: {stats['updated']}, variantlar: {stats['choices']}, "
+            f"yangi kategoriyalar: {stats['categories']}, rasmlar: {stats['images']}"
+        ))
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:38
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('test_app', '0005_attempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamBlueprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('title_uz', models.CharField(max_length=255, null=True)),
+                ('title_ru', models.CharField(max_length=255, null=True)),
+                ('title_en', models.CharField(max_length=255, null=True)),
+                ('total_time', models.PositiveIntegerField(default=25, validators=[django.core.validators.MinValueValidator(1)])),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BlueprintSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveSmallIntegerField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blueprint_sections', to='test_app.category')),
+                ('blueprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sections', to='test_app.examblueprint')),
+            ],
+            options={
+                'unique_together': {('blueprint', 'category')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_questions(apps, schema_editor):
+    Category = apps.get_model('test_app', 'Category')
+    Question = apps.get_model('test_app', 'Question')
+    counts = Question.objects.filter(category=OuterRef('pk')).order_by().values('category').annotate(n=Count('id'))
+    Category.objects.update(question_count=Coalesce(Subquery(counts.values('n')), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('test_app', '0010_changelog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_questions, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,18 @@
+import uuid
+
+from django.conf import settings
+from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
+
+from .storage import ContentAddressedStorage
 
 
 class Category(models.Model):
     title = models.CharField(max_length=255)  # Kategoriya nomi
     created_at = models.DateTimeField(auto_now_add=True)
+    # Savollar soni: Count bilan hisoblanmaydi, savol qo‘shilganda/o‘chganda signallar yangilaydi (categories.py)
+    question_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.title
@@ -12,7 +21,16 @@ class Category(models.Model):
 class Question(models.Model):
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, related_name='questions', null=True, blank=True)
     text = models.TextField()  # Savol matni
-    image = models.ImageField(upload_to='questions/', null=True, blank=True)  # Savolga tegishli rasm (ixtiyoriy)
+    # Savolga tegishli rasm (ixtiyoriy); bir xil rasm diskda bir marta saqlanadi (storage.py)
+    image = models.ImageField(upload_to='questions/', storage=ContentAddressedStorage(), null=True, blank=True)
+    # Rasmning kichraytirilgan nusxalari: {"source": ..., "webp": {"320": ...}, "jpeg": {...}} (images.py)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Rasm metama’lumotlari: rasm saqlanganda bir marta hisoblanadi (images.py)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_size = models.PositiveIntegerField(null=True, blank=True, editable=False)  # Bayt
+    image_color = models.CharField(max_length=7, blank=True, editable=False)  # Asosiy rang, masalan "#a0b1c2"
+    image_placeholder = models.TextField(blank=True, editable=False)  # Xira kichik nusxa (data URI)
     correct_answer = models.TextField()  # To‘g‘ri javob matni
     order = models.IntegerField(default=0)
 
@@ -20,6 +38,17 @@ class Question(models.Model):
         return self.text
 
 
+class ImageBlob(models.Model):
+    """Diskdagi bitta rasm fayli va unga bog‘langan savollar soni (0 bo‘lsa fayl o‘chiriladi)"""
+    name = models.CharField(max_length=255, unique=True)  # Storage-dagi nom: questions/<xesh>.<kengaytma>
+    size = models.PositiveIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+
+
 class AnswerChoice(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='choices')
     text = models.CharField(max_length=255)  # Variant matni
@@ -27,3 +56,130 @@ class AnswerChoice(models.Model):
 
     def __str__(self):
         return f"{self.text} ({'To‘g‘ri' if self.is_correct else 'Noto‘g‘ri'})"
+
+
+class ExamBlueprint(models.Model):
+    """Imtihon shabloni: har bir kategoriyadan nechta savol va umumiy vaqt"""
+    title = models.CharField(max_length=255)
+    total_time = models.PositiveIntegerField(default=25, validators=[MinValueValidator(1)])  # Imtihon vaqti (daqiqa)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.title
+
+
+class BlueprintSection(models.Model):
+    blueprint = models.ForeignKey(ExamBlueprint, on_delete=models.CASCADE, related_name='sections')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='blueprint_sections')
+    count = models.PositiveSmallIntegerField()  # Shu kategoriyadan olinadigan savollar soni
+
+    class Meta:
+        unique_together = ('blueprint', 'category')
+
+    def __str__(self):
+        return f"{self.category} - {self.count}"
+
+
+class Attempt(models.Model):
+    """Foydalanuvchining bitta topshirig‘i (tasodifiy test yoki sahifa) natijasi"""
+    MODE_RANDOM = 'random'
+    MODE_PAGE = 'page'
+    MODE_CHOICES = (
+        (MODE_RANDOM, 'Tasodifiy test'),
+        (MODE_PAGE, 'Sahifa'),
+    )
+
+    # ID bufer ichida yaratiladi, shuning uchun javoblarni bulk_create bilan birga yozish mumkin
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='attempts')
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES)
+    session_id = models.CharField(max_length=64, null=True, blank=True)  # Tasodifiy test sessiyasi
+    page_number = models.PositiveIntegerField(null=True, blank=True)
+    total_questions = models.PositiveIntegerField()
+    correct_answers = models.PositiveIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)  # Topshirilgan vaqt (bazaga yozilgan emas)
+
+    class Meta:
+        indexes = [models.Index(fields=['user', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.correct_answers}/{self.total_questions}"
+
+
+class AttemptAnswer(models.Model):
+    attempt = models.ForeignKey(Attempt, on_delete=models.CASCADE, related_name='answers')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='attempt_answers')
+    # Javob berilmagan bo‘lsa None
+    choice = models.ForeignKey(AnswerChoice, on_delete=models.SET_NULL, null=True, blank=True)
+    is_correct = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.question_id} ({'To‘g‘ri' if self.is_correct else 'Noto‘g‘ri'})"
+
+
+class QuestionStats(models.Model):
+    """Savol bo‘yicha javoblar hisoblagichlari: `stats.py` xotirada yig‘ib, guruhlangan F() UPDATE bilan yozadi"""
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    attempt_count = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+    # (noto‘g‘ri + 1) / (urinishlar + 2): kam urinishli savollar reyting boshiga chiqib qolmaydi
+    difficulty = models.FloatField(default=0.5, db_index=True)
+
+    def __str__(self):
+        return f"{self.question_id}: {self.correct_count}/{self.attempt_count}"
+
+
+class ChoiceStats(models.Model):
+    """Variant necha marta tanlangani"""
+    choice = models.OneToOneField(AnswerChoice, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    pick_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.choice_id}: {self.pick_count}"
+
+
+class ReviewItem(models.Model):
+    """Takrorlash jadvali (SM-2): foydalanuvchi savolni qachon qayta ko‘rishi kerak"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='review_items')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='review_items')
+    interval = models.PositiveIntegerField(default=0)  # Kun
+    ease = models.FloatField(default=2.5)
+    repetitions = models.PositiveIntegerField(default=0)  # Ketma-ket to‘g‘ri javoblar
+    due_at = models.DateTimeField()
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('user', 'question')
+        indexes = [models.Index(fields=['user', 'due_at'])]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.question_id} ({self.due_at:%Y-%m-%d})"
+
+
+class ChangeLog(models.Model):
+    """
+    Baza o‘zgarishlari jurnali (delta sync uchun): ID o‘sib boradi va mijoz uchun versiya vazifasini bajaradi.
+    Variant o‘zgarsa uning savoli o‘zgargan deb yoziladi.
+    """
+    MODEL_CATEGORY = 'category'
+    MODEL_QUESTION = 'question'
+    MODEL_CHOICES = (
+        (MODEL_CATEGORY, 'Kategoriya'),
+        (MODEL_QUESTION, 'Savol'),
+    )
+    ACTION_UPSERT = 'upsert'
+    ACTION_DELETE = 'delete'
+    ACTION_CHOICES = (
+        (ACTION_UPSERT, 'Qo‘shildi yoki o‘zgardi'),
+        (ACTION_DELETE, 'O‘chirildi'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=16, choices=MODEL_CHOICES)
+    object_id = models.IntegerField()
+    action = models.CharField(max_length=8, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"#{self.id} {self.model} {self.object_id} {self.action}"
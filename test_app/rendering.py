@@ -0,0 +1,116 @@
+"""
+Butun savollar bazasini har bir til va baza versiyasi uchun bir marta JSON baytlarga aylantirib,
+gzip va brotli variantlari bilan xotirada saqlash. `/test/all-questions/` shu baytlarni qaytaradi.
+"""
+import gzip
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.translation import get_language
+
+from Road_test.http import if_none_match
+from .bank import LANGUAGE_CODES, get_bank, language_index
+from .serializers import serialize_bank_questions
+
+try:
+    import brotli
+except ImportError:  # brotli o‘rnatilmagan bo‘lsa faqat gzip ishlatiladi
+    brotli = None
+
+CACHE_CONTROL = "public, max-age=300"
+MAX_PAYLOADS = len(LANGUAGE_CODES)  # Har bir til uchun bitta payload
+
+
+class RenderedPayload:
+    __slots__ = ('etag', 'identity', 'encoded')
+
+    def __init__(self, identity):
+        digest = hashlib.blake2b(identity, digest_size=16).hexdigest()
+        self.etag = f'"{digest}"'
+        self.identity = identity
+        # {content-coding: (siqilgan baytlar, ETag)}
+        self.encoded = {'gzip': (gzip.compress(identity, compresslevel=9), f'"{digest}-gzip"')}
+        if brotli is not None:
+            self.encoded['br'] = (brotli.compress(identity, mode=brotli.MODE_TEXT, quality=9), f'"{digest}-br"')
+
+    def etags(self):
+        return {self.etag, *(etag for _, etag in self.encoded.values())}
+
+
+_payloads = {}
+_payloads_version = None
+_payloads_lock = threading.Lock()
+
+
+def cached_payload(bank):
+    """Joriy til uchun tayyor payload yoki None (render qilinmaydi: async view-lar uchun tezkor yo‘l)"""
+    return _payloads.get(language_index(get_language())) if _payloads_version == bank.version else None
+
+
+def get_rendered_questions(request, bank=None):
+    """
+    Joriy til va baza versiyasi uchun tayyor payload-ni qaytarish.
+    Rasm URL-lari `SITE_URL` dan quriladi: kalit faqat til, so‘rovdagi Host sarlavhasi
+    (mijoz o‘zi beradi) yangi yozuv va qayta render keltirib chiqarmaydi.
+    Async view-lar baza nusxasini o‘zlari (`aget_bank`) olib beradi va render-ni thread-da chaqiradi.
+    """
+    global _payloads_version
+    if bank is None:
+        bank = get_bank()
+    key = language_index(get_language())
+
+    payload = cached_payload(bank)
+    if payload is not None:
+        return payload
+
+    with _payloads_lock:
+        if _payloads_version != bank.version:
+            _payloads.clear()
+            _payloads_version = bank.version
+        payload = _payloads.get(key)
+        if payload is None:
+            if len(_payloads) >= MAX_PAYLOADS:
+                _payloads.clear()
+            data = serialize_bank_questions(bank.questions, request, base_url=settings.SITE_URL)
+            body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            payload = _payloads[key] = RenderedPayload(body)
+    return payload
+
+
+def _accepted_encodings(header):
+    """Accept-Encoding sarlavhasidan q=0 bo‘lmagan kodlashlarni olish"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if coding and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.lower())
+    return accepted
+
+
+def rendered_response(request, payload):
+    """Payload-ni Accept-Encoding bo‘yicha siqilgan holda, ETag/304 bilan qaytarish"""
+    accepted = _accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    body, etag, coding = payload.identity, payload.etag, None
+    for candidate in ('br', 'gzip'):
+        if candidate in payload.encoded and candidate in accepted:
+            coding = candidate
+            body, etag = payload.encoded[candidate]
+            break
+
+    if if_none_match(request, payload.etags()):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+        if coding:
+            response['Content-Encoding'] = coding
+        response['Content-Length'] = str(len(body))
+
+    response['ETag'] = etag
+    response['Cache-Control'] = CACHE_CONTROL
+    patch_vary_headers(response, ('Accept-Language', 'Accept-Encoding'))
+    return response
@@ -0,0 +1,95 @@
+"""
+Takrorlash navbati (spaced repetition, SM-2).
+
+Har bir (foydalanuvchi, savol) uchun interval, ease va keyingi ko‘rish vaqti (`due_at`) saqlanadi.
+Tekshirilgan javoblar so‘rov ichida faqat bufferga qo‘shiladi; fon thread-i partiyadagi juftliklarning
+joriy holatini bitta so‘rov bilan o‘qiydi, SM-2 ni xotirada hisoblaydi va bitta upsert bilan yozadi.
+`/test/review/` (user, due_at) indeksi bo‘yicha bitta oraliq so‘rov bilan navbatdagi savollarni oladi.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .bank import get_bank
+from .models import ReviewItem
+from .writebehind import WriteBehindBuffer
+
+MIN_EASE = 1.3
+QUALITY_CORRECT = 4  # Ikkilik baholash: to‘g‘ri javob - 4, noto‘g‘ri - 1 (SM-2 shkalasi 0..5)
+QUALITY_WRONG = 1
+UPDATE_FIELDS = ('interval', 'ease', 'repetitions', 'due_at', 'updated_at')
+
+
+def schedule(item, is_correct, answered_at):
+    """SM-2: javob bo‘yicha interval, ease va keyingi ko‘rish vaqtini yangilash"""
+    quality = QUALITY_CORRECT if is_correct else QUALITY_WRONG
+    if quality >= 3:
+        if item.repetitions == 0:
+            item.interval = 1
+        elif item.repetitions == 1:
+            item.interval = 6
+        else:
+            item.interval = round(item.interval * item.ease)
+        item.repetitions += 1
+    else:
+        item.repetitions = 0
+        item.interval = 1
+    item.ease = max(MIN_EASE, item.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    item.due_at = answered_at + timedelta(days=item.interval)
+    item.updated_at = answered_at
+
+
+def flush_reviews(items):
+    """(foydalanuvchi ID, savol ID, to‘g‘rimi, javob vaqti) yozuvlarini javob berilgan tartibda qo‘llash"""
+    # Bufferda turgan paytda o‘chirilgan savollar tashlab ketiladi
+    bank = get_bank()
+    items = [item for item in items if item[1] in bank.by_id]
+    if not items:
+        return
+
+    questions_by_user = defaultdict(set)
+    for user_id, question_id, *_ in items:
+        questions_by_user[user_id].add(question_id)
+    pairs = Q()
+    for user_id, question_ids in questions_by_user.items():
+        pairs |= Q(user_id=user_id, question_id__in=question_ids)
+
+    with transaction.atomic():
+        reviews = {
+            (review.user_id, review.question_id): review
+            for review in ReviewItem.objects.select_for_update().filter(pairs)
+        }
+        for user_id, question_id, is_correct, answered_at in items:
+            review = reviews.get((user_id, question_id))
+            if review is None:
+                review = reviews[user_id, question_id] = ReviewItem(user_id=user_id, question_id=question_id)
+            schedule(review, is_correct, answered_at)
+
+        # Yangilari ham, mavjudlari ham bitta INSERT ... ON CONFLICT DO UPDATE bilan
+        ReviewItem.objects.bulk_create(
+            list(reviews.values()), update_conflicts=True,
+            unique_fields=('user', 'question'), update_fields=UPDATE_FIELDS,
+        )
+
+
+review_buffer = WriteBehindBuffer('reviews', flush_reviews, max_size=1000, max_delay=2.0, max_pending=50000)
+
+
+def record_reviews(user_id, grading):
+    """Javob berilgan savollarni takrorlash navbatiga qo‘shish (javobsizlari hisobga olinmaydi)"""
+    answered_at = timezone.now()
+    review_buffer.add(*(
+        (user_id, answer.question_id, answer.is_correct, answered_at)
+        for answer in grading.answers if answer.answer_id
+    ))
+
+
+def due_question_ids(user_id, limit, now=None):
+    """Vaqti kelgan savollar, eng eskisidan boshlab: (user, due_at) indeksi bo‘yicha bitta so‘rov"""
+    return list(
+        ReviewItem.objects.filter(user_id=user_id, due_at__lte=now or timezone.now())
+        .order_by('due_at').values_list('question_id', flat=True)[:limit]
+    )
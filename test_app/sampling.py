@@ -0,0 +1,40 @@
+"""
+Imtihon uchun tasodifiy savollarni tanlash.
+
+`order_by('?')` butun jadvalni saralaydi, bu yerda esa baza nusxasidagi ID-lar massividan
+`random.sample` bilan k ta savol olinadi: katta massivda bu O(k) ishlaydi va hech qanday so‘rov yo‘q.
+Seed berilsa bir xil baza versiyasida aynan shu imtihon qayta hosil bo‘ladi.
+Imtihon shabloni berilsa har bir kategoriyadan belgilangan sonda savol olinadi (nusxadagi kategoriya to‘plamlaridan).
+"""
+import random
+import secrets
+
+EXAM_SIZE = 20
+
+
+def new_seed():
+    """Yangi imtihon uchun tasodifiy seed"""
+    return secrets.randbits(32)
+
+
+def sample_question_ids(question_ids, k=EXAM_SIZE, seed=None):
+    """`question_ids` ketma-ketligidan k ta takrorlanmas ID tanlash"""
+    rng = random.Random(seed)
+    return rng.sample(question_ids, min(k, len(question_ids)))
+
+
+def sample_blueprint_ids(bank, blueprint, seed=None):
+    """Shablon bo‘yicha tanlash: har bir bo‘limdan (kategoriya, soni) o‘z to‘plamidan, bo‘limlar tartibida"""
+    rng = random.Random(seed)
+    question_ids = []
+    for category_id, count in blueprint.sections:
+        pool = bank.category_question_ids.get(category_id, ())
+        question_ids.extend(rng.sample(pool, min(count, len(pool))))
+    return question_ids
+
+
+def sample_exam(bank, seed, blueprint=None):
+    """Imtihon savollari ID-lari: shablon bo‘lsa shablon bo‘yicha, aks holda butun bazadan EXAM_SIZE ta"""
+    if blueprint is not None:
+        return sample_blueprint_ids(bank, blueprint, seed)
+    return sample_question_ids(bank.question_ids, EXAM_SIZE, seed)
@@ -1,7 +1,11 @@
+from functools import partial
+from urllib.parse import urljoin
+
 from rest_framework import serializers
 from django.utils.translation import get_language
+from .bank import IMAGE_META_FIELDS, build_image_meta, get_bank, language_index
+from .images import variant_urls
 from .models import AnswerChoice, Question, Category
-from django.core.cache import cache
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -9,7 +13,7 @@ class CategorySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Category
-        fields = ['id', 'title']  # Faqat dinamik title
+        fields = ['id', 'title', 'question_count']  # Dinamik title va savollar soni
 
     def get_title(self, obj):
         lang = get_language()  # Foydalanuvchining hozirgi tili
@@ -37,11 +41,13 @@ class AnswerChoiceSerializer(serializers.ModelSerializer):
 class QuestionSerializer(serializers.ModelSerializer):
     text = serializers.SerializerMethodField()  # Dinamik text
     correct_answer = serializers.SerializerMethodField()  # Dinamik javob
+    image_srcset = serializers.SerializerMethodField()  # Rasmning kichraytirilgan nusxalari
+    image_meta = serializers.SerializerMethodField()  # O‘lchamlar, rang va placeholder
     choices = AnswerChoiceSerializer(many=True, read_only=True)  # Tanlov variantlari
 
     class Meta:
         model = Question
-        fields = ['id', 'text', 'image', 'correct_answer', 'choices']
+        fields = ['id', 'text', 'image', 'image_srcset', 'image_meta', 'correct_answer', 'choices']
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -55,6 +61,53 @@ class QuestionSerializer(serializers.ModelSerializer):
         # lang = get_language()  # Joriy til
         return getattr(obj, f"correct_answer_{self.lang}", obj.correct_answer_uz)  # Agar mavjud bo‘lmasa, `uz`
 
+    def get_image_srcset(self, obj):
+        request = self.context.get('request')
+        return _absolute_srcset(variant_urls(obj.image_variants), request.build_absolute_uri if request else None)
+
+    def get_image_meta(self, obj):
+        return build_image_meta([getattr(obj, field) for field in IMAGE_META_FIELDS])
+
+
+def _absolute_srcset(srcset, build_uri):
+    """{"webp": {"320": nisbiy URL}} -> to‘liq URL-lar (`build_uri` bo‘lmasa nisbiy qoladi)"""
+    if not srcset or build_uri is None:
+        return srcset
+    return {key: {width: build_uri(url) for width, url in urls.items()} for key, urls in srcset.items()}
+
+
+def serialize_bank_questions(questions, request, base_url=None):
+    """
+    Baza nusxasidagi (`bank.QuestionRecord`) savollarni `QuestionSerializer` bilan bir xil ko‘rinishda chiqarish.
+    Matnlar oldindan tillar bo‘yicha tayyor, shuning uchun faqat kerakli indeks olinadi.
+    `base_url` berilsa rasm URL-lari so‘rov hostidan emas, shu manzildan quriladi.
+    """
+    lang = language_index(get_language())
+    build_uri = partial(urljoin, base_url) if base_url else request.build_absolute_uri
+    return [
+        {
+            'id': question.id,
+            'text': question.texts[lang],
+            'image': build_uri(question.image) if question.image else None,
+            'image_srcset': _absolute_srcset(question.image_variants, build_uri),
+            'image_meta': question.image_meta,
+            'correct_answer': question.correct_answers[lang],
+            'choices': [
+                {'id': choice.id, 'text': choice.texts[lang], 'is_correct': choice.is_correct}
+                for choice in question.choices
+            ],
+        }
+        for question in questions
+    ]
+
+
+def parse_flag(value):
+    """JSON yoki forma qiymatini (true, "false", 0, "1" ...) DRF BooleanField qoidalari bilan o‘qish; noto‘g‘ri bo‘lsa None"""
+    try:
+        return serializers.BooleanField().to_internal_value(value)
+    except serializers.ValidationError:
+        return None
+
 
 # userni javoblarini olish
 class AnswerSerializer(serializers.Serializer):
@@ -68,20 +121,41 @@ class AnswerSerializer(serializers.Serializer):
         question_id = data.get("question_id")
         answer_id = data.get("answer_id")
 
+        # Ro‘yxat ichida bo‘lsa, `AnswerListField` bir marta olgan baza nusxasidan foydalanamiz
+        bank = getattr(self.parent, 'bank', None) or get_bank()
+
         # Savol mavjudligini tekshirish
-        if not Question.objects.filter(id=question_id).exists():
+        if question_id not in bank.by_id:
             raise serializers.ValidationError({"question_id": "Bunday savol topilmadi."})
 
         # Variant mavjudligini tekshirish
-        if not AnswerChoice.objects.filter(id=answer_id, question_id=question_id).exists():
+        if bank.choice_question.get(answer_id) != question_id:
             raise serializers.ValidationError({"answer_id": "Tanlangan variant ushbu savolga tegishli emas."})
 
         return data
 
 
+class AnswerListField(serializers.ListField):
+    """
+    Javoblar ro‘yxati: barcha (question_id, answer_id) juftliklari bitta baza nusxasi bo‘yicha,
+    bazaga so‘rovsiz tekshiriladi. Xatolar tuzilishi oldingidek: {indeks: {maydon: [xabar]}}.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('child', AnswerSerializer())
+        super().__init__(**kwargs)
+        self.bank = None
+
+    def run_child_validation(self, data):
+        self.bank = self.context.get('bank') or get_bank()
+        try:
+            return super().run_child_validation(data)
+        finally:
+            self.bank = None
+
+
 class SubmitAnswersSerializer(serializers.Serializer):
-    answers = serializers.ListField(
-        child=AnswerSerializer(),
+    answers = AnswerListField(
         required=False,  # Majburiy emas
         allow_empty=True  # Bo‘sh bo‘lishiga ruxsat berish
     )
@@ -90,8 +164,8 @@ class SubmitAnswersSerializer(serializers.Serializer):
         """Foydalanuvchining jo‘natgan javoblarini tekshirish"""
         answers = data.get("answers", [])
 
-        # Barcha savollarni olish
-        all_question_ids = set(Question.objects.values_list("id", flat=True))
+        # Barcha savollarni baza nusxasidan olish
+        all_question_ids = set(get_bank().question_ids)
         answered_question_ids = {answer["question_id"] for answer in answers}
 
         # Agar foydalanuvchi ba’zi savollarga javob bermagan bo‘lsa, ularni noto‘g‘ri hisoblash uchun qo‘shamiz
@@ -104,8 +178,7 @@ class SubmitAnswersSerializer(serializers.Serializer):
 
 
 class SubmitRandomAnswersSerializer(serializers.Serializer):
-    answers = serializers.ListField(
-        child=AnswerSerializer(),
+    answers = AnswerListField(
         required=False,  # Majburiy emas
         allow_empty=True  # Bo‘sh bo‘lishiga ruxsat berish
     )
@@ -114,9 +187,9 @@ class SubmitRandomAnswersSerializer(serializers.Serializer):
         """Foydalanuvchining jo‘natgan javoblarini tekshirish"""
         answers = data.get("answers", [])
 
-        # Cache-dan tasodifiy savollarni olish
-        cache_key = f"random_question_ids_{self.context['request'].user.id}"
-        question_ids = cache.get(cache_key)  # Cache-dagi tasodifiy savollar IDlari
+        # Imtihon sessiyasidagi tasodifiy savollar IDlari
+        session = self.context.get('session')
+        question_ids = session.question_ids if session is not None else None
 
         if not question_ids:
             raise serializers.ValidationError("Test sessiyasi topilmadi. Iltimos, yangi test boshlang!")
@@ -137,8 +210,7 @@ class SubmitRandomAnswersSerializer(serializers.Serializer):
 
 
 class SubmitPageAnswersSerializer(serializers.Serializer):
-    answers = serializers.ListField(
-        child=AnswerSerializer(),
+    answers = AnswerListField(
         required=False,  # Majburiy emas
         allow_empty=True  # Bo‘sh bo‘lishiga ruxsat berish
     )
@@ -147,14 +219,10 @@ class SubmitPageAnswersSerializer(serializers.Serializer):
         """Foydalanuvchining jo‘natgan javoblarini tekshirish"""
         answers = data.get("answers", [])
 
-        # Sahifadagi savollarni olish
-        page_size = 10
+        # Sahifadagi savollar IDlarini sahifalar indeksidan olish
         page_number = self.context.get("page_number")  # Sahifa raqamini contextdan olish
-        questions = Question.objects.only('id', 'text', 'image', 'correct_answer').order_by('order')[
-                    page_size * (page_number - 1):page_size * page_number
-                    ]
-        # Sahifadagi savollar IDlarini olish
-        valid_question_ids = {question.id for question in questions}
+        bank = self.context.get('bank') or get_bank()
+        valid_question_ids = {question.id for question in bank.page(page_number)}
 
         # Yuborilgan savollarning IDlarini olish
         answered_question_ids = {answer["question_id"] for answer in answers}
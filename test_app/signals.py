@@ -0,0 +1,132 @@
+from functools import wraps
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+
+from .bank import bank_signals_muted, invalidate_bank
+from .blobs import acquire_blob, release_blob
+from .categories import categories, change_question_count
+from .changelog import record_changes
+from .images import image_data_outdated, update_image_data
+from .models import Question, AnswerChoice, Category, ExamBlueprint, BlueprintSection, ChangeLog
+
+
+def unless_muted(receiver):
+    """`mute_bank_signals()` ichida (import) receiver ishlamaydi"""
+    @wraps(receiver)
+    def wrapper(*args, **kwargs):
+        if not bank_signals_muted():
+            receiver(*args, **kwargs)
+    return wrapper
+
+
+@unless_muted
+def invalidate_question_bank(sender, **kwargs):
+    """Savol, variant, kategoriya yoki imtihon shabloni o‘zgarsa baza nusxasini eskirgan deb belgilash"""
+    invalidate_bank()
+
+
+@unless_muted
+def log_category_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_changes(ChangeLog.MODEL_CATEGORY, [instance.pk])
+
+
+@unless_muted
+def log_category_delete(sender, instance, **kwargs):
+    record_changes(ChangeLog.MODEL_CATEGORY, [instance.pk], ChangeLog.ACTION_DELETE)
+
+
+@unless_muted
+def log_category_questions(sender, instance, **kwargs):
+    """Kategoriya o‘chsa savollarning `category` si SET_NULL bilan (signalsiz) o‘zgaradi"""
+    record_changes(ChangeLog.MODEL_QUESTION, instance.questions.values_list('id', flat=True))
+
+
+@unless_muted
+def log_question_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_changes(ChangeLog.MODEL_QUESTION, [instance.pk])
+
+
+@unless_muted
+def log_question_delete(sender, instance, **kwargs):
+    record_changes(ChangeLog.MODEL_QUESTION, [instance.pk], ChangeLog.ACTION_DELETE)
+
+
+@unless_muted
+def log_choice_change(sender, instance, raw=False, **kwargs):
+    """Variant savol bilan birga beriladi: variant o‘zgarsa savol o‘zgargan hisoblanadi"""
+    if not raw:
+        record_changes(ChangeLog.MODEL_QUESTION, [instance.question_id])
+
+
+def build_question_image_variants(sender, instance, raw=False, **kwargs):
+    """Yangi yoki o‘zgargan rasm uchun WebP/JPEG nusxalari va metama’lumotlarni hisoblash"""
+    if not raw and image_data_outdated(instance):
+        update_image_data(instance)
+
+
+def remember_previous_question(sender, instance, raw=False, **kwargs):
+    """Saqlashdan oldingi rasm nomi va kategoriya: hisoblagichlarni yangilash uchun"""
+    previous = None
+    if instance.pk is not None and not raw:
+        previous = Question.objects.filter(pk=instance.pk).values_list('image', 'category_id').first()
+    instance._previous_image, instance._previous_category_id = previous or (None, None)
+
+
+def count_question_image_refs(sender, instance, created=False, raw=False, **kwargs):
+    """Rasm almashtirilsa yangi faylga +1 (yuklangan bo‘lsa `storage.save` da olingan), eskisiga -1"""
+    if raw:
+        return
+    previous = getattr(instance, '_previous_image', None) or None
+    current = instance.image.name or None
+    acquired = getattr(current, 'ref_acquired', False)
+    if acquired:
+        instance.image.name = str(current)  # Keyingi saqlashda qayta hisobga olinmasligi uchun
+    if previous != current:
+        if not acquired:
+            acquire_blob(current)
+        release_blob(previous)
+    elif acquired:
+        release_blob(current)  # Xuddi shu rasm qayta yuklandi: `storage.save` olgan hisoblagich ortiqcha
+
+
+def release_question_image(sender, instance, **kwargs):
+    release_blob(instance.image.name)
+
+
+def count_category_questions(sender, instance, created=False, raw=False, **kwargs):
+    """Yangi savol kategoriyasiga +1; boshqa kategoriyaga o‘tkazilsa eskisiga -1, yangisiga +1"""
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_previous_category_id', None)
+    if created or previous != instance.category_id:
+        change_question_count(previous, -1)
+        change_question_count(instance.category_id, 1)
+
+
+def uncount_category_question(sender, instance, **kwargs):
+    change_question_count(instance.category_id, -1)
+
+
+pre_save.connect(remember_previous_question, sender=Question, dispatch_uid="question_previous")
+post_save.connect(count_question_image_refs, sender=Question, dispatch_uid="question_image_refs")
+post_save.connect(build_question_image_variants, sender=Question, dispatch_uid="question_image_variants")
+post_delete.connect(release_question_image, sender=Question, dispatch_uid="question_image_release")
+post_save.connect(count_category_questions, sender=Question, dispatch_uid="category_question_count")
+post_delete.connect(uncount_category_question, sender=Question, dispatch_uid="category_question_uncount")
+categories.connect(Category, Question)
+
+# Jurnal yozuvlari versiya oshirilishidan oldin ulanadi: on_commit shu tartibda bajariladi va yangi nusxa
+# o‘z `sync_version` iga shu o‘zgarishni ham oladi
+post_save.connect(log_category_change, sender=Category, dispatch_uid="changelog_category_save")
+pre_delete.connect(log_category_questions, sender=Category, dispatch_uid="changelog_category_questions")
+post_delete.connect(log_category_delete, sender=Category, dispatch_uid="changelog_category_delete")
+post_save.connect(log_question_change, sender=Question, dispatch_uid="changelog_question_save")
+post_delete.connect(log_question_delete, sender=Question, dispatch_uid="changelog_question_delete")
+post_save.connect(log_choice_change, sender=AnswerChoice, dispatch_uid="changelog_choice_save")
+post_delete.connect(log_choice_change, sender=AnswerChoice, dispatch_uid="changelog_choice_delete")
+
+for model in (Category, Question, AnswerChoice, ExamBlueprint, BlueprintSection):
+    post_save.connect(invalidate_question_bank, sender=model, dispatch_uid=f"bank_save_{model.__name__}")
+    post_delete.connect(invalidate_question_bank, sender=model, dispatch_uid=f"bank_delete_{model.__name__}")
@@ -0,0 +1,116 @@
+"""
+Savollar qiyinligi statistikasi: har bir savolga urinishlar va to‘g‘ri javoblar soni, har bir variant
+necha marta tanlangani.
+
+Tekshirilgan javoblar so‘rov ichida faqat bufferga qo‘shiladi. Fon thread-i partiyani xotirada
+yig‘adi va bir xil o‘sishli savollarni bitta `UPDATE ... SET n = n + x WHERE id IN (...)` bilan yozadi
+(xato bo‘lsa partiya `WriteBehindBuffer` da qayta yoziladi).
+`difficulty` ham shu UPDATE ichida hisoblanadi va indekslangan: reyting to‘liq hisoblanmaydi, indeksdan
+birinchi N ta yozuv o‘qiladi.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from .bank import get_bank
+from .models import ChoiceStats, QuestionStats
+from .writebehind import WriteBehindBuffer
+
+
+def _difficulty(attempts, correct):
+    """Yangilanishdan keyingi (noto‘g‘ri + 1) / (urinishlar + 2); SET ichida eski qiymatlar o‘qiladi"""
+    wrong = F('attempt_count') + attempts - F('correct_count') - correct + 1
+    return Cast(wrong, FloatField()) / Cast(F('attempt_count') + attempts + 2, FloatField())
+
+
+def flush_answer_stats(items):
+    """(savol ID, variant ID, to‘g‘rimi) yozuvlarini guruhlab yozish"""
+    # Bufferda turgan paytda o‘chirilgan savol va variantlar tashlab ketiladi
+    bank = get_bank()
+    questions = defaultdict(lambda: [0, 0])
+    picks = Counter()
+    for question_id, choice_id, is_correct in items:
+        if question_id not in bank.by_id:
+            continue
+        counts = questions[question_id]
+        counts[0] += 1
+        counts[1] += is_correct
+        if choice_id in bank.choice_question:
+            picks[choice_id] += 1
+
+    # Boshqa workerlar bilan deadlock bo‘lmasligi uchun qatorlar har doim ID tartibida qulflanadi:
+    # yaratish va SELECT ... FOR UPDATE tartiblangan, UPDATE-lar esa qulflangan qatorlarga tegadi
+    question_ids = sorted(questions)
+    choice_ids = sorted(picks)
+    question_groups = defaultdict(list)
+    for question_id in question_ids:
+        question_groups[tuple(questions[question_id])].append(question_id)
+    pick_groups = defaultdict(list)
+    for choice_id in choice_ids:
+        pick_groups[picks[choice_id]].append(choice_id)
+
+    with transaction.atomic():
+        QuestionStats.objects.bulk_create(
+            [QuestionStats(question_id=question_id) for question_id in question_ids], ignore_conflicts=True
+        )
+        ChoiceStats.objects.bulk_create([ChoiceStats(choice_id=choice_id) for choice_id in choice_ids],
+                                        ignore_conflicts=True)
+        list(QuestionStats.objects.select_for_update().filter(question_id__in=question_ids)
+             .order_by('question_id').values_list('pk', flat=True))
+        list(ChoiceStats.objects.select_for_update().filter(choice_id__in=choice_ids)
+             .order_by('choice_id').values_list('pk', flat=True))
+        for (attempts, correct), group in sorted(question_groups.items()):
+            QuestionStats.objects.filter(question_id__in=group).update(
+                attempt_count=F('attempt_count') + attempts,
+                correct_count=F('correct_count') + correct,
+                difficulty=_difficulty(attempts, correct),
+            )
+        for count, group in sorted(pick_groups.items()):
+            ChoiceStats.objects.filter(choice_id__in=group).update(pick_count=F('pick_count') + count)
+
+
+stats_buffer = WriteBehindBuffer('answer-stats', flush_answer_stats, max_size=5000, max_delay=5.0, max_pending=100000)
+
+
+def record_answer_stats(grading):
+    """
+    Tekshiruv natijasini statistikaga qo‘shish (bazaga keyinroq yoziladi).
+    Javobsiz savollar hisobga olinmaydi: foydalanuvchi yetib bormagan savol xato sanalmasligi kerak.
+    """
+    stats_buffer.add(*(
+        (answer.question_id, answer.answer_id, answer.is_correct) for answer in grading.answers if answer.answer_id
+    ))
+
+
+def difficulty_ranking(bank, lang_index, limit, hardest=True, min_attempts=0):
+    """`difficulty` indeksi bo‘yicha birinchi `limit` ta savol, variantlar tanlanishi bilan (2 ta so‘rov)"""
+    ordering = ('-difficulty', 'question_id') if hardest else ('difficulty', 'question_id')
+    rows = list(
+        QuestionStats.objects.filter(attempt_count__gte=min_attempts).order_by(*ordering)
+        .values_list('question_id', 'attempt_count', 'correct_count', 'difficulty')[:limit]
+    )
+    choice_ids = [choice.id for question_id, *_ in rows if question_id in bank.by_id
+                  for choice in bank.by_id[question_id].choices]
+    picks = dict(ChoiceStats.objects.filter(choice_id__in=choice_ids).values_list('choice_id', 'pick_count'))
+
+    ranking = []
+    for question_id, attempts, correct, difficulty in rows:
+        question = bank.by_id.get(question_id)
+        if question is None:
+            continue
+        ranking.append({
+            'question_id': question_id,
+            'text': question.texts[lang_index],
+            'attempts': attempts,
+            'correct': correct,
+            'error_rate': round((attempts - correct) / attempts, 4) if attempts else None,
+            'difficulty': round(difficulty, 4),
+            'choices': [
+                {'id': choice.id, 'text': choice.texts[lang_index], 'is_correct': choice.is_correct,
+                 'picks': picks.get(choice.id, 0)}
+                for choice in question.choices
+            ],
+        })
+    return ranking
@@ -0,0 +1,64 @@
+"""
+Savol rasmlari uchun mazmunga asoslangan (content-addressed) fayl saqlash.
+
+Fayl nomi uning mazmuni xeshidan olinadi (`questions/<xesh>.jpeg`), shuning uchun bir xil rasm
+necha marta yuklansa ham diskda bitta nusxa bo‘ladi va mijoz/CDN uni bir marta yuklab oladi.
+Har bir faylga nechta savol bog‘langanini `ImageBlob` hisoblaydi (`blobs.py`); `save` hisoblagichni
+o‘zi oladi.
+"""
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+DIGEST_SIZE = 12  # 24 ta hex belgi
+
+
+def digest_chunks(chunks):
+    """Baytlar bo‘laklaridan mazmun xeshi"""
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for chunk in chunks:
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class StoredName(str):
+    """`ContentAddressedStorage.save` qaytargan nom: uning hisoblagichi allaqachon olingan"""
+    ref_acquired = True
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def content_name(self, name, content):
+        """`upload_to` papkasi + mazmun xeshi + kichik harfli kengaytma"""
+        content.seek(0)
+        digest = digest_chunks(content.chunks())
+        content.seek(0)
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(directory, f"{digest}{extension}")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        name = self.content_name(name, content)
+        # Fayl bilan birga hisoblagich ham olinadi (yozuv qulf ostida): aks holda mavjud faylni qaytargan
+        # paytda boshqa tranzaksiyaning `delete_unused_blobs` i uni o‘chirib yuborishi mumkin edi.
+        # Savolni saqlash signali `StoredName` dagi hisoblagichni o‘ziniki deb hisoblaydi (`signals.py`).
+        from .models import ImageBlob
+
+        with transaction.atomic():
+            blob, _ = ImageBlob.objects.select_for_update().get_or_create(name=name)
+            if not self.exists(name):  # Xuddi shu mazmun allaqachon saqlangan bo‘lmasa
+                name = super().save(name, content, max_length)
+            ImageBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1, size=self.size(name))
+        return StoredName(name)
@@ -0,0 +1,65 @@
+"""
+Javoblarni topshirish oqimi (validatsiya, tekshirish, tarixga yozish).
+Sinxron DRF view-lari va async view-lar bir xil natija berishi uchun shu yerda umumlashtirilgan;
+bazaga murojaat yo‘q, baza nusxasi va sessiya chaqiruvchi tomonidan beriladi.
+"""
+from .attempts import record_attempt
+from .grading import grade_answers
+from .models import Attempt
+from .serializers import SubmitPageAnswersSerializer, SubmitRandomAnswersSerializer
+from .reviews import record_reviews
+from .stats import record_answer_stats
+
+SESSION_NOT_FOUND = {"error": "Test sessiyasi topilmadi. Iltimos, yangi test boshlang!"}
+
+
+def submit_random(user_id, data, session, bank):
+    """Tasodifiy test javoblari: (javob, HTTP status) qaytaradi"""
+    if session is None:
+        return SESSION_NOT_FOUND, 400
+
+    question_ids = session.question_ids
+    serializer = SubmitRandomAnswersSerializer(data=data, context={'session': session, 'bank': bank})
+
+    if not serializer.is_valid():
+        return serializer.errors, 400
+
+    answers = serializer.validated_data.get("answers", [])
+
+    # Foydalanuvchi faqat test sessiyasidagi savollarga javob berganligini tekshiramiz
+    answered_question_ids = {answer["question_id"] for answer in answers}
+
+    if not answered_question_ids.issubset(set(question_ids)):
+        return {"error": "Noto‘g‘ri savol ID jo‘natildi!"}, 400
+
+    # Javoblar kaliti bo‘yicha bir o‘tishda tekshirish va natijani tarixga qo‘shish
+    grading = grade_answers(question_ids, answers, bank.answer_key)
+    record_attempt(user_id, Attempt.MODE_RANDOM, grading, session_id=session.session_id)
+    record_answer_stats(grading)
+    record_reviews(user_id, grading)
+    return grading.as_response(), 200
+
+
+def submit_page(user_id, data, page_number, bank):
+    """Sahifa javoblari: (javob, HTTP status) qaytaradi"""
+    serializer = SubmitPageAnswersSerializer(data=data, context={'page_number': page_number, 'bank': bank})
+
+    if not serializer.is_valid():
+        return serializer.errors, 400
+
+    answers = serializer.validated_data.get("answers", [])
+
+    # Sahifadagi savollar IDlarini sahifalar indeksidan olish
+    question_ids = [question.id for question in bank.page(page_number)]
+
+    # Yuborilgan savollar faqat ushbu sahifaga tegishli bo‘lishi kerak
+    answered_question_ids = {answer["question_id"] for answer in answers}
+    if not answered_question_ids.issubset(question_ids):
+        return {"error": "Berilgan savollar ushbu sahifada mavjud emas!"}, 400
+
+    # Har bir savolni javoblar kaliti bo‘yicha tekshirish, javob berilmagani noto‘g‘ri hisoblanadi
+    grading = grade_answers(question_ids, answers, bank.answer_key)
+    record_attempt(user_id, Attempt.MODE_PAGE, grading, page_number=page_number)
+    record_answer_stats(grading)
+    record_reviews(user_id, grading)
+    return grading.as_response(), 200
@@ -1,3 +1,1206 @@
-from django.test import TestCase
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import zipfile
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from Road_test.cache import SQLiteCache, bump_version, get_version
+from user.models import User
+from . import adaptive, writebehind
+from .adaptive import ADAPTIVE_DELTA_KEY, ADAPTIVE_VERSION_KEY, AdaptiveTable, AliasTable, get_user_table
+from .attempts import attempt_buffer
+from .bank import BANK_VERSION_KEY, PAGE_SIZE, get_bank, get_bank_version
+from .bank_io import QuestionImporter, csv_lines, export_records, ndjson_lines, normalize_record, read_records
+from .blobs import delete_unused_blobs, recount_blobs
+from .bundles import build_bundle, bundle_name, bundle_response, delete_old_bundles
+from .changelog import get_changes
+from .exam_sessions import SESSION_TTL, create_session, get_session
+from .grading import grade_answers
+from .images import EMPTY_METADATA, VARIANT_FORMATS, build_variants, image_metadata
+from .models import (
+    AnswerChoice,
+    Attempt,
+    AttemptAnswer,
+    BlueprintSection,
+    Category,
+    ChangeLog,
+    ChoiceStats,
+    ExamBlueprint,
+    ImageBlob,
+    Question,
+    QuestionStats,
+    ReviewItem,
+)
+from .rendering import RenderedPayload, rendered_response
+from .reviews import MIN_EASE, due_question_ids, flush_reviews, review_buffer, schedule
+from .sampling import sample_question_ids
+from .serializers import SubmitPageAnswersSerializer
+from .stats import flush_answer_stats, stats_buffer
+from .writebehind import MAX_REQUEUES, WriteBehindBuffer
+
+# Testlar umumiy cache faylini (yoki Redis-ni) tozalab yubormasligi uchun alohida SQLite fayl
+TEST_CACHE_PATH = os.path.join(tempfile.gettempdir(), 'road_test_tests_cache.sqlite3')
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'Road_test.cache.TwoTierCache',
+        'LOCATION': 'road_test_tests',
+        'OPTIONS': {'SHARED_ALIAS': 'shared', 'POLICIES': {'local_': 60, 'question_bank_version': 1}},
+    },
+    'shared': {'BACKEND': 'Road_test.cache.SQLiteCache', 'LOCATION': TEST_CACHE_PATH},
+}
+
+
+class BankFixtureMixin:
+    """Bitta kategoriya, bitta savol va uchta variant (birinchisi to‘g‘ri), API uchun foydalanuvchi"""
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(title_uz='Belgilar', title_ru='Знаки')
+        self.question = Question.objects.create(
+            category=self.category, text_uz='Savol', text_ru='Вопрос', correct_answer_uz='A', order=1,
+        )
+        self.choices = AnswerChoice.objects.bulk_create([
+            AnswerChoice(question=self.question, text_uz='A', is_correct=True),
+            AnswerChoice(question=self.question, text_uz='B'),
+            AnswerChoice(question=self.question, text_uz='C'),
+        ])
+        self.user = User.objects.create_user(phone_number='998901112233', password='parol123', is_active=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_questions(self, count, category=None, order=2):
+        """`count` ta savol, har birida ikki variant (birinchisi to‘g‘ri)"""
+        questions = Question.objects.bulk_create([
+            Question(category=category or self.category, text_uz=f'Savol {index}', correct_answer_uz='A',
+                     order=order + index)
+            for index in range(count)
+        ])
+        AnswerChoice.objects.bulk_create([
+            AnswerChoice(question=question, text_uz=text, is_correct=text == 'A')
+            for question in questions for text in ('A', 'B')
+        ])
+        self.bump_bank()
+        return questions
+
+    def bump_bank(self):
+        """bulk_create signal yubormaydi: nusxa keyingi so‘rovda qayta qurilsin"""
+        cache.delete(BANK_VERSION_KEY)
+
+    def correct_choice(self, question):
+        return next(choice for choice in get_bank().by_id[question.pk].choices if choice.is_correct)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class QuestionBankTests(BankFixtureMixin, TestCase):
+    def test_snapshot_reused_without_queries(self):
+        bank = get_bank()
+        with self.assertNumQueries(0):
+            self.assertIs(get_bank(), bank)
+        self.assertEqual([question.id for question in bank.questions], [self.question.pk])
+        self.assertEqual([choice.id for choice in bank.by_id[self.question.pk].choices],
+                         [choice.pk for choice in self.choices])
+
+    def test_save_bumps_version_once(self):
+        version = get_bank_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.text_uz = 'Yangi savol'
+            self.question.save()
+        self.assertEqual(get_bank_version(), version + 1)
+        self.assertEqual(get_bank().by_id[self.question.pk].texts[0], 'Yangi savol')
+
+    def test_delete_drops_question(self):
+        get_bank()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.delete()
+        self.assertNotIn(self.question.pk, get_bank().by_id)
+
+    def test_page_endpoint(self):
+        response = self.client.get('/test/questions/page/1/')
+        self.assertEqual(response.status_code, 200)
+        question = response.data['questions'][0]
+        self.assertEqual((question['id'], question['text']), (self.question.pk, 'Savol'))
+        self.assertEqual([choice['text'] for choice in question['choices']], ['A', 'B', 'C'])
+        self.assertEqual(self.client.get('/test/questions/page/2/').data['questions'], [])
+
+
+class RenderedResponseTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.payload = RenderedPayload(b'[{"id":1}]' * 100)
+
+    def test_compression(self):
+        response = rendered_response(self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip'), self.payload)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], self.payload.encoded['gzip'][1])
+        response = rendered_response(self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip;q=0'), self.payload)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.payload.identity)
+
+    def test_not_modified(self):
+        etag = self.payload.encoded['gzip'][1]
+        for header in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+            with self.subTest(header=header):
+                response = rendered_response(self.factory.get('/', HTTP_IF_NONE_MATCH=header), self.payload)
+                self.assertEqual(response.status_code, 304)
+        response = rendered_response(self.factory.get('/', HTTP_IF_NONE_MATCH='"other"'), self.payload)
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AllQuestionsTests(BankFixtureMixin, TestCase):
+    def test_etag_and_not_modified(self):
+        response = self.client.get('/test/all-questions/', HTTP_ACCEPT_ENCODING='identity')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([question['id'] for question in response.json()], [self.question.pk])
+        etag = response['ETag']
+        response = self.client.get('/test/all-questions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.text_uz = 'Yangi savol'
+            self.question.save()
+        response = self.client.get('/test/all-questions/', HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT_ENCODING='identity')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['text'], 'Yangi savol')
+
+
+class SamplingTests(SimpleTestCase):
+    IDS = tuple(range(1, 201))
+
+    def test_same_seed_same_exam(self):
+        first = sample_question_ids(self.IDS, 20, seed=42)
+        self.assertEqual(first, sample_question_ids(self.IDS, 20, seed=42))
+        self.assertNotEqual(first, sample_question_ids(self.IDS, 20, seed=43))
+        self.assertEqual(len(set(first)), 20)
+        self.assertTrue(set(first) <= set(self.IDS))
+
+    def test_small_bank(self):
+        self.assertEqual(sorted(sample_question_ids((3, 1, 2), 20, seed=1)), [1, 2, 3])
+        self.assertEqual(sample_question_ids((), 20, seed=1), [])
+
+
+class GradingTests(SimpleTestCase):
+    def test_grade_answers(self):
+        answer_key = {1: frozenset({10, 11}), 2: frozenset({20}), 3: frozenset({30})}
+        answers = [
+            {'question_id': 1, 'answer_id': 11},  # Ikkinchi to‘g‘ri variant ham to‘g‘ri
+            {'question_id': 2, 'answer_id': 21},
+            {'question_id': 1, 'answer_id': 12},  # Takroriy javob hisobga olinmaydi
+        ]
+        grading = grade_answers([1, 2, 3], answers, answer_key)
+        self.assertEqual([answer.is_correct for answer in grading.answers], [True, False, False])
+        self.assertEqual([answer.answer_id for answer in grading.answers], [11, 21, None])
+        self.assertEqual(grading.as_response(), {
+            'total_questions': 3, 'correct_answers': 1, 'incorrect_answers': 2, 'percentage': 33.33,
+        })
+
+    def test_empty(self):
+        self.assertEqual(grade_answers([], [], {}).as_response()['percentage'], 0)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AnswerKeyTests(BankFixtureMixin, TestCase):
+    def test_all_correct_choices_in_key(self):
+        second = AnswerChoice.objects.create(question=self.question, text_uz='D', is_correct=True)
+        self.bump_bank()
+        bank = get_bank()
+        self.assertEqual(bank.answer_key[self.question.pk], {self.choices[0].pk, second.pk})
+        grading = grade_answers([self.question.pk], [{'question_id': self.question.pk, 'answer_id': second.pk}],
+                                bank.answer_key)
+        self.assertEqual(grading.correct_count, 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AnswerValidationTests(BankFixtureMixin, TestCase):
+    def validate(self, answers):
+        serializer = SubmitPageAnswersSerializer(data={'answers': answers}, context={'page_number': 1})
+        return serializer.is_valid(), serializer.errors
+
+    def test_choices_checked_against_snapshot(self):
+        other = self.add_questions(1)[0]
+        get_bank()
+        answers = [{'question_id': self.question.pk, 'answer_id': self.choices[1].pk},
+                   {'question_id': other.pk, 'answer_id': self.correct_choice(other).id}]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.validate(answers), (True, {}))
+        self.assertFalse([query for query in queries.captured_queries if 'answerchoice' in query['sql']])
+
+    def test_choice_of_other_question(self):
+        other = self.add_questions(1)[0]
+        valid, errors = self.validate([
+            {'question_id': self.question.pk, 'answer_id': self.choices[0].pk},
+            {'question_id': self.question.pk, 'answer_id': self.correct_choice(other).id},
+        ])
+        self.assertFalse(valid)
+        self.assertEqual(list(errors['answers']), [1])
+        self.assertIn('answer_id', errors['answers'][1])
+
+    def test_unknown_question(self):
+        valid, errors = self.validate([{'question_id': 0, 'answer_id': self.choices[0].pk}])
+        self.assertFalse(valid)
+        self.assertIn('question_id', errors['answers'][0])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PaginationTests(BankFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_questions(24)
+        # Bir xil `order` li savollar ID bo‘yicha tartiblanadi
+        Question.objects.bulk_create([Question(text_uz='Teng', correct_answer_uz='A', order=5) for _ in range(2)])
+        self.bump_bank()
+
+    def test_pages(self):
+        bank = get_bank()
+        self.assertEqual(len(bank.pages), 3)
+        self.assertEqual(len(bank.page(1)), PAGE_SIZE)
+        self.assertEqual(sum(len(bank.page(number)) for number in (1, 2, 3)), 27)
+        self.assertEqual(bank.page(0), ())
+        self.assertEqual(bank.page(4), ())
+
+    def test_cursor_walks_whole_bank(self):
+        bank = get_bank()
+        seen, cursor = [], {}
+        while True:
+            response = self.client.get('/test/questions/after/', {'limit': 7, **cursor})
+            self.assertEqual(response.status_code, 200)
+            seen.extend(question['id'] for question in response.data['questions'])
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(bank.question_ids))
+        self.assertEqual(bank.questions_after(5)[0].order, 6)  # `after_id` siz: shu order to‘liq o‘tkaziladi
+
+    def test_bad_cursor(self):
+        self.assertEqual(self.client.get('/test/questions/after/', {'after_order': 'x'}).status_code, 400)
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'cache.sqlite3')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.path))
+        self.cache = SQLiteCache(self.path, {})
+
+    def test_set_get_add(self):
+        self.cache.set('a', {'x': 1})
+        self.assertEqual(self.cache.get('a'), {'x': 1})
+        self.assertFalse(self.cache.add('a', 2))
+        self.assertTrue(self.cache.add('b', 2))
+        self.assertEqual(self.cache.get('b'), 2)
+        self.assertIsNone(self.cache.get('missing'))
+
+    def test_incr(self):
+        self.cache.set('n', 5)
+        self.assertEqual(self.cache.incr('n'), 6)
+        self.assertEqual(self.cache.incr('n', 4), 10)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_expiry_and_touch(self):
+        self.cache.set('old', 1, timeout=-1)
+        self.assertIsNone(self.cache.get('old'))
+        self.assertFalse(self.cache.touch('old', None))
+        self.cache.set('kept', 1, timeout=10)
+        self.assertTrue(self.cache.touch('kept', None))
+        self.assertEqual(self.cache.get('kept'), 1)
+
+    def test_shared_between_instances(self):
+        # Boshqa worker (boshqa obyekt, bitta fayl) yozganini ko‘radi
+        other = SQLiteCache(self.path, {})
+        other.set('k', 'v')
+        self.assertEqual(self.cache.get('k'), 'v')
+        self.assertTrue(self.cache.delete('k'))
+        self.assertIsNone(other.get('k'))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TwoTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_local_policy_serves_from_memory(self):
+        cache.set('local_key', 1)
+        caches['shared'].set('local_key', 2)  # Boshqa worker yozdi
+        self.assertEqual(cache.get('local_key'), 1)
+        cache.clear_local()
+        self.assertEqual(cache.get('local_key'), 2)
+
+    def test_other_keys_read_from_shared(self):
+        cache.set('plain', 1)
+        caches['shared'].set('plain', 2)
+        self.assertEqual(cache.get('plain'), 2)
+
+    def test_incr_drops_local_copy(self):
+        cache.set('local_n', 1)
+        self.assertEqual(cache.incr('local_n'), 2)
+        self.assertEqual(cache.get('local_n'), 2)
+
+    def test_mutable_values_are_copied(self):
+        value = {'a': [1]}
+        cache.set('local_obj', value)
+        cache.get('local_obj')['a'].append(2)
+        self.assertEqual(cache.get('local_obj'), value)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ExamSessionTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_create_and_get(self):
+        session = create_session(1, [5, 3, 9], seed=7)
+        self.assertEqual(get_session(1).session_id, session.session_id)  # Joriy sessiya
+        loaded = get_session(1, session.session_id)
+        self.assertEqual((loaded.question_ids, loaded.seed), ((5, 3, 9), 7))
+
+        newer = create_session(1, [1], seed=8)
+        self.assertEqual(get_session(1).session_id, newer.session_id)
+        self.assertEqual(get_session(1, session.session_id).question_ids, (5, 3, 9))  # Eskisi ham ishlaydi
+
+    def test_other_user_and_bad_ids(self):
+        session = create_session(1, [5], seed=7)
+        self.assertIsNone(get_session(2, session.session_id))
+        self.assertIsNone(get_session(2))
+        self.assertIsNone(get_session(1, '../../etc'))
+        self.assertIsNone(get_session(1, 123))
+
+    def test_expired(self):
+        session = create_session(1, [5], seed=7)
+        with mock.patch('test_app.exam_sessions.time') as fake_time:
+            fake_time.time.return_value = session.created_at + SESSION_TTL + 1
+            self.assertIsNone(get_session(1, session.session_id))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RandomQuestionsTests(BankFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_questions(30)
+
+    def post(self, data):
+        return self.client.post('/test/random-questions/', data, format='json')
+
+    def test_seed_reproduces_exam(self):
+        first = self.post({'seed': 12345})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['X-Exam-Seed'], '12345')
+        ids = [question['id'] for question in first.data]
+        self.assertEqual(len(set(ids)), 20)
+        self.assertEqual([question['id'] for question in self.post({'seed': 12345}).data], ids)
+
+    def test_session_continues(self):
+        first = self.post({'force_new': True})
+        session_id = first['X-Exam-Session']
+        again = self.post({'session_id': session_id})
+        self.assertEqual(again['X-Exam-Session'], session_id)
+        self.assertEqual(again.data, first.data)
+        self.assertEqual(self.post({}).data, first.data)  # Joriy sessiya
+        self.assertEqual(self.post({'session_id': 'yoq'}).status_code, 400)
+
+
+class BufferedWritesMixin:
+    """Write-behind buferlari fon thread-isiz: testlar ularni o‘zi `flush()` qiladi (test tranzaksiyasi ichida)"""
+
+    def setUp(self):
+        for target in ('WriteBehindBuffer._ensure_thread', 'close_old_connections'):
+            patcher = mock.patch(f'test_app.writebehind.{target}')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.discard_buffers)
+        super().setUp()
+
+    def discard_buffers(self):
+        for buffer in writebehind._buffers:
+            buffer._take()
+
+
+class WriteBehindBufferTests(BufferedWritesMixin, SimpleTestCase):
+    def make_buffer(self, flush_func, **options):
+        buffer = WriteBehindBuffer('test', flush_func, **options)
+        self.addCleanup(writebehind._buffers.remove, buffer)
+        return buffer
+
+    def test_batches(self):
+        batches = []
+        buffer = self.make_buffer(batches.append, max_size=2)
+        buffer.add(1, 2, 3)
+        buffer.add(4, 5)
+        self.assertEqual(batches, [])
+        buffer.flush()
+        self.assertEqual(batches, [[1, 2], [3, 4], [5]])
+
+    @mock.patch('test_app.writebehind.RETRY_DELAYS', (0, 0))
+    def test_failed_batch_is_retried_later(self):
+        calls, written = [], []
+
+        def flush_func(items):
+            calls.append(items)
+            if len(calls) <= 3:  # Birinchi flush-dagi uchala urinish
+                raise RuntimeError("baza ishlamayapti")
+            written.extend(items)
+
+        buffer = self.make_buffer(flush_func)
+        buffer.add(1, 2)
+        with self.assertLogs('test_app.writebehind', 'ERROR'):
+            buffer.flush()
+        self.assertEqual(written, [])
+        buffer.add(3)
+        buffer.flush()
+        self.assertEqual(written, [1, 2, 3])
+
+    @mock.patch('test_app.writebehind.RETRY_DELAYS', ())
+    def test_dropped_after_max_requeues(self):
+        buffer = self.make_buffer(mock.Mock(side_effect=RuntimeError))
+        buffer.add(1)
+        with self.assertLogs('test_app.writebehind', 'ERROR') as logs:
+            for _ in range(MAX_REQUEUES):
+                buffer.flush()
+        self.assertIn('tashlab yuborildi', logs.output[-1])
+        self.assertEqual(buffer._take(), [])
+
+    def test_full_buffer_flushes_synchronously(self):
+        batches = []
+        buffer = self.make_buffer(batches.append, max_size=10, max_pending=3)
+        buffer.add(1, 2)
+        self.assertEqual(batches, [])
+        with self.assertLogs('test_app.writebehind', 'WARNING'):
+            buffer.add(3)
+        self.assertEqual(batches, [[1, 2, 3]])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AttemptHistoryTests(BufferedWritesMixin, BankFixtureMixin, TestCase):
+    def test_submit_writes_attempt_after_flush(self):
+        response = self.client.post('/test/submit-paged-answers/1/', {'answers': [
+            {'question_id': self.question.pk, 'answer_id': self.choices[0].pk},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['correct_answers'], 1)
+        self.assertFalse(Attempt.objects.exists())  # So‘rov ichida bazaga yozilmaydi
+
+        attempt_buffer.flush()
+        attempt = Attempt.objects.get()
+        self.assertEqual((attempt.user_id, attempt.mode, attempt.page_number), (self.user.pk, Attempt.MODE_PAGE, 1))
+        self.assertEqual((attempt.total_questions, attempt.correct_answers), (1, 1))
+        self.assertEqual(list(AttemptAnswer.objects.values_list('question_id', 'choice_id', 'is_correct')),
+                         [(self.question.pk, self.choices[0].pk, True)])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AsyncViewsTests(BufferedWritesMixin, BankFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    async def post(self, url, data):
+        return await self.async_client.post(url, data, content_type='application/json', headers=self.headers)
+
+    async def test_random_and_submit(self):
+        response = await self.post('/test/async/random-questions/', {'seed': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([question['id'] for question in response.json()], [self.question.pk])
+
+        response = await self.post('/test/async/submit-random-answers/', {
+            'session_id': response['X-Exam-Session'],
+            'answers': [{'question_id': self.question.pk, 'answer_id': self.choices[1].pk}],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['incorrect_answers'], 1)
+
+    def test_submit_matches_sync_view(self):
+        data = {'answers': [{'question_id': self.question.pk, 'answer_id': self.choices[0].pk}]}
+        sync_response = self.client.post('/test/submit-paged-answers/1/', data, format='json')
+        async_response = self.client.post('/test/async/submit-paged-answers/1/', data, format='json',
+                                          headers=self.headers)
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.json(), sync_response.data)
+        attempt_buffer.flush()
+        self.assertEqual(Attempt.objects.filter(user=self.user).count(), 2)
+
+    async def test_bad_requests(self):
+        for body in ('[1, 2]', '"matn"', '{'):
+            with self.subTest(body=body):
+                response = await self.async_client.post('/test/async/submit-paged-answers/1/', body,
+                                                        content_type='application/json', headers=self.headers)
+                self.assertEqual(response.status_code, 400)
+        response = await self.async_client.get('/test/async/submit-paged-answers/1/', headers=self.headers)
+        self.assertEqual(response.status_code, 405)
+
+    async def test_authentication_required(self):
+        response = await self.async_client.get('/test/async/questions/page/1/')
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/test/async/questions/page/1/',
+                                               headers={'Authorization': 'Bearer yomon'})
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/test/async/categories/999/questions/', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BlueprintTests(BankFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_category = Category.objects.create(title_uz='Chorrahalar')
+        self.other_questions = self.add_questions(5, category=self.other_category)
+        self.blueprint = ExamBlueprint.objects.create(title_uz='Qisqa imtihon', total_time=10)
+        BlueprintSection.objects.bulk_create([
+            BlueprintSection(blueprint=self.blueprint, category=self.category, count=1),
+            BlueprintSection(blueprint=self.blueprint, category=self.other_category, count=3),
+        ])
+        self.bump_bank()
+
+    def post(self, data):
+        return self.client.post('/test/random-questions/', data, format='json')
+
+    def test_sections_sampled_in_order(self):
+        response = self.post({'blueprint_id': self.blueprint.pk, 'seed': 3})
+        self.assertEqual(response.status_code, 200)
+        ids = [question['id'] for question in response.data]
+        self.assertEqual(ids[0], self.question.pk)
+        self.assertEqual(len(set(ids[1:])), 3)
+        self.assertTrue(set(ids[1:]) <= {question.pk for question in self.other_questions})
+        self.assertEqual([question['id'] for question in self.post({'blueprint_id': self.blueprint.pk,
+                                                                    'seed': 3}).data], ids)
+
+        session = get_session(self.user.pk, response['X-Exam-Session'])
+        self.assertEqual(session.deadline - session.created_at, 10 * 60)
+
+    def test_list_and_unknown(self):
+        response = self.client.get('/test/blueprints/')
+        self.assertEqual(response.data[0]['question_count'], 4)
+        self.assertEqual(response.data[0]['sections'], [
+            {'category_id': self.category.pk, 'count': 1}, {'category_id': self.other_category.pk, 'count': 3},
+        ])
+        self.assertEqual(self.post({'blueprint_id': self.blueprint.pk + 1}).status_code, 404)
+        self.assertEqual(self.post({'blueprint_id': 'bir'}).status_code, 400)
+
+    def test_inactive_hidden(self):
+        self.blueprint.is_active = False
+        self.blueprint.save()
+        self.bump_bank()
+        self.assertEqual(self.client.get('/test/blueprints/').data, [])
+
+    def test_zero_time(self):
+        self.blueprint.total_time = 0
+        with self.assertRaises(ValidationError):
+            self.blueprint.full_clean()
+        self.assertEqual(get_bank().blueprints[self.blueprint.pk].session_ttl, 10 * 60)
+        ExamBlueprint.objects.filter(pk=self.blueprint.pk).update(total_time=0)  # Validatordan oldingi yozuv
+        self.bump_bank()
+        self.assertEqual(get_bank().blueprints[self.blueprint.pk].session_ttl, 60)
+
+
+def png_bytes(width, height, color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class TempMediaMixin:
+    """Rasm fayllari vaqtinchalik MEDIA_ROOT-ga yoziladi"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+
+    def save_image(self, question, content, name='rasm.png'):
+        with self.captureOnCommitCallbacks(execute=True):
+            question.image.save(name, ContentFile(content))
+        question.refresh_from_db()
+        return question
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ImageVariantsTests(TempMediaMixin, BankFixtureMixin, TestCase):
+    def test_variants_built_on_upload(self):
+        self.save_image(self.question, png_bytes(800, 400))
+        variants = self.question.image_variants
+        self.assertEqual(variants['source'], self.question.image.name)
+        self.assertEqual(set(variants) - {'source'}, set(VARIANT_FORMATS))
+        self.assertEqual(list(variants['webp']), ['320', '640', '800'])  # Kattalashtirilmaydi
+        with default_storage.open(variants['jpeg']['320']) as variant:
+            with Image.open(variant) as image:
+                self.assertEqual((image.format, image.size), ('JPEG', (320, 160)))
+
+        question = self.client.get('/test/questions/page/1/').data['questions'][0]
+        self.assertTrue(question['image_srcset']['webp']['640'].startswith('http://testserver/'))
+
+    def test_same_content_same_names(self):
+        content = png_bytes(300, 300)
+        self.save_image(self.question, content)
+        other = self.save_image(self.add_questions(1)[0], content, name='boshqa.png')
+        self.assertEqual(other.image_variants['webp'], self.question.image_variants['webp'])
+        self.assertEqual(build_variants(other.image)['jpeg'], self.question.image_variants['jpeg'])
+        self.assertEqual(list(other.image_variants['jpeg']), ['300'])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ImageBlobTests(TempMediaMixin, BankFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = png_bytes(400, 200)
+        self.other = self.add_questions(1)[0]
+
+    def storage(self):
+        return Question._meta.get_field('image').storage
+
+    def ref_counts(self):
+        return dict(ImageBlob.objects.values_list('name', 'ref_count'))
+
+    def test_same_content_stored_once(self):
+        self.save_image(self.question, self.content, name='birinchi.PNG')
+        self.save_image(self.other, self.content, name='ikkinchi.png')
+        name = self.question.image.name
+        self.assertEqual(self.other.image.name, name)
+        self.assertRegex(name, r'^questions/[0-9a-f]{24}\.png$')
+        self.assertEqual(self.ref_counts(), {name: 2})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.save()  # Rasm o‘zgarmadi
+        self.assertEqual(self.ref_counts(), {name: 2})
+
+    def test_unused_file_deleted_after_commit(self):
+        self.save_image(self.question, self.content)
+        self.save_image(self.other, self.content)
+        name = self.question.image.name
+        variant = self.question.image_variants['webp']['400']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.delete()
+        self.assertTrue(self.storage().exists(name))
+
+        self.save_image(self.question, png_bytes(400, 200, color=(0, 0, 255)))
+        self.assertFalse(self.storage().exists(name))
+        self.assertFalse(default_storage.exists(variant))
+        self.assertEqual(self.ref_counts(), {self.question.image.name: 1})
+
+    def test_reuploaded_file_not_deleted(self):
+        self.save_image(self.question, self.content)
+        name = self.question.image.name
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.question.image = None
+            self.question.save()
+        self.save_image(self.other, self.content)  # O‘chirish kutilayotganda xuddi shu rasm yuklandi
+        for callback in callbacks:
+            callback()
+        self.assertTrue(self.storage().exists(name))
+        self.assertEqual(self.ref_counts(), {name: 1})
+
+    def test_legacy_name_keeps_shared_variants(self):
+        self.save_image(self.question, self.content)
+        variant = self.question.image_variants['jpeg']['400']
+        legacy = FileSystemStorage.save(self.storage(), 'questions/eski.png', ContentFile(self.content))
+        Question.objects.filter(pk=self.other.pk).update(image=legacy)
+        recount_blobs()
+        self.assertEqual(self.ref_counts()[legacy], 1)
+
+        Question.objects.filter(pk=self.other.pk).update(image='')
+        recount_blobs()
+        self.assertEqual(delete_unused_blobs(), 1)
+        self.assertFalse(self.storage().exists(legacy))
+        self.assertTrue(default_storage.exists(variant))  # Xeshli nusxa hali ishlatiladi
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ImageMetadataTests(TempMediaMixin, BankFixtureMixin, TestCase):
+    def test_metadata(self):
+        self.save_image(self.question, png_bytes(64, 32, color=(255, 0, 0)))
+        metadata = image_metadata(self.question.image)
+        self.assertEqual((metadata['image_width'], metadata['image_height']), (64, 32))
+        self.assertEqual(metadata['image_size'], self.question.image.size)
+        self.assertEqual(metadata['image_color'], '#ff0000')
+        self.assertTrue(metadata['image_placeholder'].startswith('data:image/webp;base64,'))
+        self.assertEqual(self.question.image_width, 64)  # Yuklanganda hisoblangan
+
+        question = self.client.get('/test/questions/page/1/').data['questions'][0]
+        self.assertEqual(question['image_meta']['color'], '#ff0000')
+
+    def test_backfill(self):
+        self.save_image(self.question, png_bytes(50, 50))
+        Question.objects.filter(pk=self.question.pk).update(**EMPTY_METADATA)
+        self.bump_bank()
+        self.assertIsNone(self.client.get('/test/questions/page/1/').data['questions'][0]['image_meta'])
+
+        call_command('backfill_image_metadata', workers=2, stdout=io.StringIO())
+        self.question.refresh_from_db()
+        self.assertEqual((self.question.image_width, self.question.image_height), (50, 50))
+        question = self.client.get('/test/questions/page/1/').data['questions'][0]
+        self.assertEqual(question['image_meta']['width'], 50)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ImportTests(TempMediaMixin, BankFixtureMixin, TestCase):
+    def import_records(self, records):
+        importer = QuestionImporter()
+        with self.captureOnCommitCallbacks(execute=True):
+            importer.import_batch(list(records))
+            importer.finish()
+        return importer
+
+    def record(self, **data):
+        return {
+            'id': self.question.pk, 'order': 1, 'category': {'uz': 'Belgilar'}, 'text': {'uz': 'Savol'},
+            'correct_answer': {'uz': 'A'},
+            'choices': [{'id': choice.pk, 'text': choice.text_uz, 'is_correct': choice.is_correct}
+                        for choice in self.choices],
+            **data,
+        }
+
+    def write_file(self, lines):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'savollar.jsonl')
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.writelines(line + '\n' for line in lines)
+        return path
+
+    def test_import_bumps_version_once(self):
+        record = self.record(text={'uz': 'Import qilingan'})
+        record['choices'] = record['choices'][:1]  # Ikki variant o‘chiriladi
+        version = get_bank_version()
+
+        self.import_records([normalize_record(record, 1)])
+
+        self.assertEqual(get_bank_version(), version + 1)
+        self.assertEqual(list(AnswerChoice.objects.filter(question=self.question).values_list('pk', flat=True)),
+                         [self.choices[0].pk])
+        self.assertEqual(Question.objects.get(pk=self.question.pk).text_uz, 'Import qilingan')
+
+    def test_command(self):
+        images_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, images_dir)
+        with open(os.path.join(images_dir, 'belgi.png'), 'wb') as image:
+            image.write(png_bytes(20, 20))
+        path = self.write_file([
+            json.dumps(self.record(text={'uz': 'Yangilangan', 'ru': 'Обновлён'})),
+            json.dumps({'category': 'Yangi', 'text': 'Yangi savol', 'image': 'belgi.png',
+                        'choices': [{'text': 'Ha', 'is_correct': True}, {'text': "Yo‘q"}]}),
+        ])
+        stdout = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch('test_app.management.commands.import_questions.time.monotonic', return_value=5.0):
+            call_command('import_questions', path, batch_size=1, images_dir=images_dir, stdout=stdout)
+        self.assertIn('Yangi: 1, yangilangan: 1', stdout.getvalue())
+
+        self.assertEqual(Question.objects.get(pk=self.question.pk).text_ru, 'Обновлён')
+        created = Question.objects.exclude(pk=self.question.pk).get()
+        self.assertEqual(created.category, Category.objects.get(title_uz='Yangi'))
+        self.assertEqual(created.image_width, 20)
+        self.assertEqual(list(created.choices.values_list('text_uz', 'is_correct')), [('Ha', True), ("Yo‘q", False)])
+
+    def test_bad_record(self):
+        path = self.write_file([json.dumps(self.record(text={'uz': 'Saqlanadi'})), '{"text": ""}'])
+        with self.captureOnCommitCallbacks(execute=True), self.assertRaisesMessage(CommandError, '2-qator'):
+            call_command('import_questions', path, batch_size=1, stdout=io.StringIO())
+        self.assertEqual(Question.objects.get(pk=self.question.pk).text_uz, 'Saqlanadi')  # Oldingi bo‘lak
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ExportTests(BankFixtureMixin, TestCase):
+    def test_roundtrip(self):
+        for lines, fmt in ((ndjson_lines, 'jsonl'), (csv_lines, 'csv')):
+            with self.subTest(format=fmt):
+                before = list(export_records())
+                text = ''.join(lines(export_records()))
+                importer = QuestionImporter()
+                with self.captureOnCommitCallbacks(execute=True):
+                    importer.import_batch(list(read_records(io.StringIO(text), fmt)))
+                    importer.finish()
+                self.assertEqual((importer.stats['created'], importer.stats['updated']), (0, 1))
+                self.assertEqual(list(export_records()), before)
+
+    def test_endpoint(self):
+        self.assertEqual(self.client.get('/test/export/').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get('/test/export/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment; filename="questions-', response['Content-Disposition'])
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([record['id'] for record in records], [self.question.pk])
+        self.assertEqual(records[0]['choices'][0]['is_correct'], True)
+
+        response = self.client.get('/test/export/', {'type': 'csv'})
+        self.assertEqual(response['Content-Type'].split(';')[0], 'text/csv')
+        self.assertEqual(len(b''.join(response.streaming_content).decode().splitlines()), 2)  # Sarlavha + savol
+        self.assertEqual(self.client.get('/test/export/', {'type': 'xml'}).status_code, 400)
+
+
+class BundleResponseTests(TempMediaMixin, SimpleTestCase):
+    DATA = bytes(range(100))
+
+    def setUp(self):
+        super().setUp()
+        self.name = default_storage.save(bundle_name('uz', 7), ContentFile(self.DATA))
+        self.etag = '"bundle-uz-7"'
+        self.factory = RequestFactory()
+
+    def get(self, **headers):
+        response = bundle_response(self.factory.get('/', **headers), 'uz', 7, self.name)
+        self.addCleanup(response.close)
+        return response
+
+    def test_full(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.DATA)
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_ranges(self):
+        for header, start, end in (('bytes=10-19', 10, 19), ('bytes=90-', 90, 99), ('bytes=-5', 95, 99),
+                                   ('bytes=95-500', 95, 99)):
+            with self.subTest(header=header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f"bytes {start}-{end}/100")
+                self.assertEqual(b''.join(response.streaming_content), self.DATA[start:end + 1])
+
+    def test_unsatisfiable_range(self):
+        for header in ('bytes=100-', 'bytes=20-10', 'bytes=-0'):
+            with self.subTest(header=header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_if_range_and_if_none_match(self):
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=self.etag).status_code, 206)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"bundle-uz-6"').status_code, 200)
+        for header in (self.etag, f'W/{self.etag}', f'"bundle-uz-6", {self.etag}', '*'):
+            with self.subTest(header=header):
+                self.assertEqual(self.get(HTTP_IF_NONE_MATCH=header).status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='"bundle-uz-6"').status_code, 200)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BundleTests(TempMediaMixin, BankFixtureMixin, TestCase):
+    def test_build(self):
+        name = build_bundle('ru')
+        self.assertEqual(name, bundle_name('ru', get_bank().version))
+        with default_storage.open(name) as stream, zipfile.ZipFile(stream) as archive:
+            manifest = json.loads(archive.read('manifest.json'))
+            questions = json.loads(archive.read('questions.json'))
+        self.assertEqual((manifest['language'], manifest['question_count']), ('ru', 1))
+        self.assertEqual(set(manifest['files']), {'questions.json', 'categories.json'})
+        self.assertEqual(questions[0]['text'], 'Вопрос')
+        self.assertEqual(build_bundle('ru'), name)  # Qayta qurilmaydi
+
+    def test_endpoint_serves_previous_version(self):
+        with mock.patch('test_app.bundles.schedule_build') as schedule_build:
+            response = self.client.get('/test/bundle/uz/')
+            self.assertEqual(response.status_code, 503)
+            schedule_build.assert_called_once_with('uz')
+
+            old_version = get_bank().version
+            old_name = build_bundle('uz')
+            with self.captureOnCommitCallbacks(execute=True):
+                self.question.save()
+            response = self.client.get('/test/bundle/uz/')  # Yangi versiya fonda quriladi
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['ETag'], f'"bundle-uz-{old_version}"')
+            response.close()
+
+        build_bundle('uz')
+        self.assertEqual(delete_old_bundles('uz', keep=1), 1)
+        self.assertFalse(default_storage.exists(old_name))
+        self.assertEqual(self.client.get('/test/bundle/xx/').status_code, 404)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ChangeLogTests(BankFixtureMixin, TestCase):
+    def changes(self, since):
+        return self.client.get('/test/changes/', {'since': since}).data
+
+    def test_endpoint(self):
+        other = self.add_questions(1)[0]
+        other_id = other.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            other.save()
+        start = self.changes(0)
+        self.assertTrue(start['full_resync'])
+        self.assertEqual(self.changes(start['version'])['questions'][0]['id'], other_id)  # Kursor ortidagilari
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.text_uz = 'Yangi matn'
+            self.question.save()
+            other.delete()
+        data = self.changes(start['version'])
+        self.assertFalse(data['full_resync'])
+        self.assertEqual([question['text'] for question in data['questions']], ['Yangi matn'])
+        self.assertEqual(data['deleted'], {'categories': [], 'questions': [other_id]})
+        self.assertEqual(self.changes(data['version'])['questions'][0]['id'], self.question.pk)  # Qayta o‘qiladi
+
+        ChangeLog.objects.filter(pk__lt=data['version']).delete()  # Jurnal siqildi (oxirgisi qoladi)
+        self.assertTrue(self.changes(start['version'])['full_resync'])
+
+    def test_late_commits_behind_cursor(self):
+        rows = ChangeLog.objects.bulk_create([
+            ChangeLog(model=ChangeLog.MODEL_QUESTION, object_id=self.question.pk, action=ChangeLog.ACTION_UPSERT)
+            for _ in range(2)
+        ])
+        cursor = rows[1].pk
+        self.bump_bank()
+        upserted, deleted, version, has_more = get_changes(get_bank(), cursor)
+        self.assertEqual(version, cursor)
+        self.assertIn(self.question.pk, upserted[ChangeLog.MODEL_QUESTION])
+        self.assertFalse(has_more)
+
+    def test_import_logs_each_question_once(self):
+        record = normalize_record({'id': self.question.pk, 'text': 'Import', 'choices': [
+            {'id': self.choices[0].pk, 'text': 'A', 'is_correct': True},
+        ]}, 1)
+        importer = QuestionImporter()
+        with self.captureOnCommitCallbacks(execute=True):
+            importer.import_batch([record])
+            importer.finish()
+        # Ikki variant o‘chirildi, lekin savol jurnalga bir marta yoziladi
+        self.assertEqual(list(ChangeLog.objects.values_list('model', 'object_id')),
+                         [(ChangeLog.MODEL_QUESTION, self.question.pk)])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class VersionTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_versions(self):
+        version = get_version('local_version')
+        self.assertEqual(get_version('local_version'), version)
+        self.assertEqual(bump_version('local_version'), version + 1)
+        self.assertEqual(get_version('local_version'), version + 1)
+        cache.delete('local_version')
+        self.assertNotEqual(get_version('local_version'), version + 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CategoriesSingletonTests(BankFixtureMixin, TestCase):
+    def test_cached_with_etag(self):
+        response = self.client.get('/test/categories/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(category['id'], category['question_count']) for category in response.json()],
+                         [(self.category.pk, 1)])
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/test/categories/').content, response.content)
+
+        for header in (etag, f'W/{etag}', f'"boshqa", {etag}'):
+            with self.subTest(header=header):
+                self.assertEqual(self.client.get('/test/categories/', HTTP_IF_NONE_MATCH=header).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.create(category=self.category, text_uz='Yana savol', order=5)
+        response = self.client.get('/test/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['question_count'], 2)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_per_language(self):
+        uz = self.client.get('/test/categories/', HTTP_ACCEPT_LANGUAGE='uz')
+        ru = self.client.get('/test/categories/', HTTP_ACCEPT_LANGUAGE='ru')
+        self.assertEqual((uz.json()[0]['title'], ru.json()[0]['title']), ('Belgilar', 'Знаки'))
+        self.assertNotEqual(uz['ETag'], ru['ETag'])
+        self.assertIn('Accept-Language', ru['Vary'])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AnswerStatsTests(BufferedWritesMixin, BankFixtureMixin, TestCase):
+    def stats(self, question):
+        return QuestionStats.objects.values_list('attempt_count', 'correct_count', 'difficulty').get(question=question)
+
+    def test_flush_accumulates(self):
+        right, wrong = self.choices[0].pk, self.choices[1].pk
+        flush_answer_stats([(self.question.pk, right, True), (self.question.pk, wrong, False),
+                            (self.question.pk, wrong, False), (self.question.pk + 100, None, False)])
+        self.assertEqual(self.stats(self.question), (3, 1, 0.6))  # (2 + 1) / (3 + 2)
+
+        flush_answer_stats([(self.question.pk, right, True), (self.question.pk, right, True)])
+        attempts, correct, difficulty = self.stats(self.question)
+        self.assertEqual((attempts, correct), (5, 3))
+        self.assertAlmostEqual(difficulty, 3 / 7)
+        self.assertEqual(dict(ChoiceStats.objects.values_list('choice_id', 'pick_count')), {right: 3, wrong: 2})
+
+    def test_unanswered_not_counted(self):
+        other = self.add_questions(1, order=2)[0]
+        response = self.client.post('/test/submit-paged-answers/1/', {'answers': [
+            {'question_id': self.question.pk, 'answer_id': self.choices[1].pk},
+        ]}, format='json')
+        self.assertEqual(response.data['incorrect_answers'], 2)
+        stats_buffer.flush()
+        self.assertEqual(self.stats(self.question)[:2], (1, 0))
+        self.assertFalse(QuestionStats.objects.filter(question=other).exists())
+
+    def test_ranking(self):
+        easy = self.add_questions(1)[0]
+        flush_answer_stats([(self.question.pk, self.choices[1].pk, False), (easy.pk, None, True)])
+        self.assertEqual(self.client.get('/test/stats/difficulty/').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+
+        hardest = self.client.get('/test/stats/difficulty/').data['questions']
+        self.assertEqual([row['question_id'] for row in hardest], [self.question.pk, easy.pk])
+        self.assertEqual([choice['picks'] for choice in hardest[0]['choices']], [0, 1, 0])
+        easiest = self.client.get('/test/stats/difficulty/', {'order': 'easiest', 'limit': 1}).data['questions']
+        self.assertEqual([row['question_id'] for row in easiest], [easy.pk])
+        self.assertEqual(self.client.get('/test/stats/difficulty/', {'order': 'random'}).status_code, 400)
+
+
+class AdaptiveTableTests(SimpleTestCase):
+    def frequencies(self, table, draws=40000):
+        rng = random.Random(1)
+        counts = Counter(table.draw(rng) for _ in range(draws))
+        return {question_id: count / draws for question_id, count in counts.items()}
+
+    def assertFrequencies(self, table, weights):
+        total = sum(weights.values())
+        frequencies = self.frequencies(table)
+        for question_id, weight in weights.items():
+            self.assertAlmostEqual(frequencies.get(question_id, 0), weight / total, delta=0.01)
+
+    def test_draw_follows_weights(self):
+        self.assertFrequencies(AdaptiveTable(AliasTable([1, 2, 3, 4], [1, 1, 2, 4])), {1: 1, 2: 1, 3: 2, 4: 4})
+
+    def test_updated_overrides_without_rebuild(self):
+        base = AliasTable(list(range(1, 11)), [1.0] * 10)
+        table = AdaptiveTable(base).updated({3: 4.0, 99: 1.0})  # Nusxada yo‘q savol e’tiborga olinmaydi
+        self.assertIs(table.base, base)
+        self.assertEqual(table.overrides, {3: 4.0})
+        self.assertFrequencies(table, {**dict.fromkeys(range(1, 11), 1.0), 3: 4.0})
+
+        rebuilt = table.updated(dict.fromkeys(range(1, 7), 0.5))  # Almashtirilganlar og‘irligi yarmidan ko‘p
+        self.assertIsNot(rebuilt.base, base)
+        self.assertEqual(rebuilt.overrides, {})
+        self.assertFrequencies(rebuilt, {**dict.fromkeys(range(1, 7), 0.5), 7: 1, 8: 1, 9: 1, 10: 1})
+
+    def test_sample_unique_and_reproducible(self):
+        table = AdaptiveTable(AliasTable(list(range(100)), [0.01] * 99 + [100.0]))
+        sample = table.sample(20, seed=5)
+        self.assertEqual(len(set(sample)), 20)
+        self.assertIn(99, sample)
+        self.assertEqual(table.sample(20, seed=5), sample)
+        self.assertEqual(sorted(table.sample(200, seed=1)), list(range(100)))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AdaptiveUserTableTests(BufferedWritesMixin, BankFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        adaptive._tables.clear()
+        self.addCleanup(adaptive._tables.clear)
+        self.other = self.add_questions(1)[0]
+        self.version_key = ADAPTIVE_VERSION_KEY.format(self.user.pk)
+
+    def weight(self, table, question_id):
+        return table.overrides.get(question_id, table.base.weights[table.base.index[question_id]])
+
+    def submit(self, answer_id):
+        self.client.post('/test/submit-paged-answers/1/', {'answers': [
+            {'question_id': self.question.pk, 'answer_id': answer_id},
+        ]}, format='json')
+        attempt_buffer.flush()
+
+    def test_deltas_applied_without_queries(self):
+        self.submit(self.choices[1].pk)
+        table = get_user_table(get_bank(), self.user.pk)
+        self.assertEqual(self.weight(table, self.question.pk), 2 / 3)
+        self.assertEqual(self.weight(table, self.other.pk), 0.5)  # Javob berilmagan
+
+        self.submit(self.choices[0].pk)
+        with self.assertNumQueries(0):
+            table = get_user_table(get_bank(), self.user.pk)
+        self.assertEqual(self.weight(table, self.question.pk), 2 / 4)
+        self.assertEqual(adaptive._tables[self.user.pk][2], {self.question.pk: (2, 1)})
+
+    def test_version_read_after_query(self):
+        def error_counts(user_id):
+            # So‘rov bajarilayotganda partiya yozildi: uning javobi so‘rov natijasida bor
+            version = cache.incr(self.version_key)
+            cache.set(ADAPTIVE_DELTA_KEY.format(user_id, version), {self.question.pk: (1, 0)})
+            return [(self.question.pk, 1, 0)]
+
+        with mock.patch('test_app.adaptive._error_counts', error_counts):
+            get_user_table(get_bank(), self.user.pk)
+        with self.assertNumQueries(0):
+            table = get_user_table(get_bank(), self.user.pk)
+        self.assertEqual(adaptive._tables[self.user.pk][2], {self.question.pk: (1, 0)})  # Ikki marta qo‘shilmadi
+        self.assertEqual(self.weight(table, self.question.pk), 2 / 3)
+
+    def test_endpoint(self):
+        response = self.client.post('/test/random-questions/', {'adaptive': True, 'seed': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(question['id'] for question in response.data), [self.question.pk, self.other.pk])
+        self.assertEqual(self.client.post('/test/random-questions/', {'adaptive': 'balki'}, format='json').status_code,
+                         400)
+        blueprint = ExamBlueprint.objects.create(title_uz='Shablon')
+        self.bump_bank()
+        response = self.client.post('/test/random-questions/', {'adaptive': True, 'blueprint_id': blueprint.pk},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ScheduleTests(SimpleTestCase):
+    def test_sm2(self):
+        item = ReviewItem()
+        now = timezone.now()
+        for expected in (1, 6, 15):  # 15 = round(6 * 2.5)
+            schedule(item, True, now)
+            self.assertEqual(item.interval, expected)
+        self.assertEqual((item.repetitions, item.ease, item.due_at), (3, 2.5, now + timedelta(days=15)))
+
+        schedule(item, False, now)
+        self.assertEqual((item.repetitions, item.interval), (0, 1))
+        self.assertAlmostEqual(item.ease, 1.96)
+        for _ in range(3):
+            schedule(item, False, now)
+        self.assertEqual(item.ease, MIN_EASE)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ReviewQueueTests(BufferedWritesMixin, BankFixtureMixin, TestCase):
+    def test_flush_applies_in_order(self):
+        now = timezone.now()
+        flush_reviews([(self.user.pk, self.question.pk, True, now), (self.user.pk, self.question.pk, True, now),
+                       (self.user.pk, self.question.pk + 100, True, now)])
+        flush_reviews([(self.user.pk, self.question.pk, True, now)])
+        review = ReviewItem.objects.get()
+        self.assertEqual((review.repetitions, review.interval), (3, 15))
+
+        self.assertEqual(due_question_ids(self.user.pk, 10, now=now + timedelta(days=14)), [])
+        self.assertEqual(due_question_ids(self.user.pk, 10, now=now + timedelta(days=15)), [self.question.pk])
+
+    def test_endpoint(self):
+        other = self.add_questions(1)[0]
+        self.client.post('/test/submit-paged-answers/1/', {'answers': [
+            {'question_id': self.question.pk, 'answer_id': self.choices[1].pk},
+            {'question_id': other.pk, 'answer_id': self.correct_choice(other).id},
+        ]}, format='json')
+        review_buffer.flush()
+        ReviewItem.objects.filter(question=self.question).update(due_at=timezone.now() - timedelta(days=2))
+        ReviewItem.objects.filter(question=other).update(due_at=timezone.now() - timedelta(days=1))
+
+        response = self.client.get('/test/review/')
+        self.assertEqual([question['id'] for question in response.data], [self.question.pk, other.pk])
+        self.assertEqual(len(self.client.get('/test/review/', {'limit': 1}).data), 1)
+        self.assertEqual(self.client.get('/test/review/', {'limit': 'ko‘p'}).status_code, 400)
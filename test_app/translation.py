@@ -1,5 +1,5 @@
 from modeltranslation.translator import register, TranslationOptions
-from .models import Category, Question, AnswerChoice
+from .models import Category, Question, AnswerChoice, ExamBlueprint
 
 
 @register(Category)
@@ -15,3 +15,8 @@ class QuestionTranslationOptions(TranslationOptions):
 @register(AnswerChoice)
 class AnswerChoiceTranslationOptions(TranslationOptions):
     fields = ('text',)
+
+
+@register(ExamBlueprint)
+class ExamBlueprintTranslationOptions(TranslationOptions):
+    fields = ('title',)
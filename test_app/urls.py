@@ -1,22 +1,42 @@
 from django.urls import path
+from . import async_views
 from .views import get_questions, get_random_questions, \
     get_questions_by_category, get_categories, get_question_pages, get_questions_by_page, submit_random_answers, \
-    submit_paged_answers
+    submit_paged_answers, get_questions_after, get_blueprints, export_questions, get_bundle, get_changes_since, \
+    get_question_difficulty, get_review_questions
 
 # submit_answers
 
 urlpatterns = [
 
     path('random-questions/', get_random_questions, name="test-get"),
+    path('blueprints/', get_blueprints, name='blueprints-list'),
     path('questions/pages/', get_question_pages, name='get_question_pages'),
     path('questions/page/<int:page_number>/', get_questions_by_page, name='get_questions_by_page'),
+    path('questions/after/', get_questions_after, name='get_questions_after'),
     path('all-questions/', get_questions, name="all-questions"),
     path('categories/', get_categories, name='categories-list'),
     path('categories/<int:category_id>/questions/', get_questions_by_category, name="categories-questions"),
+    path('export/', export_questions, name='export_questions'),
+    path('bundle/<str:lang>/', get_bundle, name='bundle'),
+    path('changes/', get_changes_since, name='changes'),
+    path('stats/difficulty/', get_question_difficulty, name='question_difficulty'),
+    path('review/', get_review_questions, name='review'),
 
     path('submit-random-answers/', submit_random_answers, name='submit_random_answers'),
 
     path('submit-paged-answers/<int:page_number>/', submit_paged_answers, name='submit_paged_answers'),
 
     # path('submit-answers/', submit_answers, name="submit_answers"),
+
+    # Async (ASGI) variantlari
+    path('async/random-questions/', async_views.get_random_questions, name="async-test-get"),
+    path('async/questions/page/<int:page_number>/', async_views.get_questions_by_page,
+         name='async_get_questions_by_page'),
+    path('async/all-questions/', async_views.get_questions, name="async-all-questions"),
+    path('async/categories/<int:category_id>/questions/', async_views.get_questions_by_category,
+         name="async-categories-questions"),
+    path('async/submit-random-answers/', async_views.submit_random_answers, name='async_submit_random_answers'),
+    path('async/submit-paged-answers/<int:page_number>/', async_views.submit_paged_answers,
+         name='async_submit_paged_answers'),
 ]
@@ -1,47 +1,113 @@
-from django.core.cache import cache
-from django.shortcuts import get_object_or_404
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from django.http import Http404, StreamingHttpResponse
+from django.utils.translation import get_language
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework import status
-from .models import Question, AnswerChoice, Category
-from .serializers import SubmitAnswersSerializer, QuestionSerializer, CategorySerializer, SubmitPageAnswersSerializer, \
-    SubmitRandomAnswersSerializer
-from django.db.models import Count
-from django.db.models import Prefetch
-from django.views.decorators.vary import vary_on_cookie
-from django.views.decorators.cache import cache_page
+from user.throttling import SubmitThrottle
+from .adaptive import get_user_table, sample_adaptive
+from .bank import LANGUAGE_CODES, PAGE_SIZE, get_bank, get_bank_version, language_index
+from .bank_io import EXPORT_FORMATS, export_records
+from .bundles import bundle_response, ready_bundle
+from .categories import categories
+from .changelog import MAX_CHANGES, compacted_through, get_changes
+from .exam_sessions import SESSION_TTL, create_session, get_session
+from .rendering import get_rendered_questions, rendered_response
+from .reviews import due_question_ids
+from .sampling import new_seed, sample_exam
+from .serializers import parse_flag, serialize_bank_questions
+from .stats import difficulty_ranking
+from .submissions import submit_page, submit_random
+
+MIN_ORDER = -2 ** 31  # IntegerField eng kichik qiymati: kursorsiz so‘rov boshidan boshlanadi
+MAX_CURSOR_LIMIT = 50
+MAX_RANKING_LIMIT = 500
+MAX_REVIEW_LIMIT = 50
+BUNDLE_RETRY_AFTER = 30  # Soniya: to‘plam hali qurilmagan bo‘lsa
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def get_random_questions(request):
-    """Tasodifiy 20 ta savolni qaytarish, agar `force_new` bo‘lsa yangi yaratish"""
+    """
+    Tasodifiy 20 ta savolni qaytarish, agar `force_new` yoki `seed` bo‘lsa yangi sessiya yaratish.
+    `session_id` berilsa o‘sha sessiya davom ettiriladi. Sessiya ID va seed sarlavhalarda qaytariladi.
+    `blueprint_id` berilsa savollar imtihon shabloni bo‘yicha (har bir kategoriyadan belgilangan sonda) olinadi.
+    `adaptive: true` bo‘lsa foydalanuvchi ko‘p xato qilgan savollar ko‘proq chiqadi (adaptive.py).
+    """
     force_new = request.data.get("force_new", False)
-    cache_key = f"random_questions_{request.user.id}"
-    cache_question_ids_key = f"random_question_ids_{request.user.id}"
+    seed = request.data.get("seed")
+    session_id = request.data.get("session_id")
+    blueprint_id = request.data.get("blueprint_id")
+    adaptive = parse_flag(request.data.get("adaptive", False))
+    if adaptive is None:
+        return Response({"error": "adaptive true yoki false bo‘lishi kerak!"}, status=400)
+
+    try:
+        seed = int(seed) if seed is not None else None
+        blueprint_id = int(blueprint_id) if blueprint_id is not None else None
+    except (TypeError, ValueError):
+        return Response({"error": "seed va blueprint_id butun son bo‘lishi kerak!"}, status=400)
+
+    bank = get_bank()
+    blueprint = None
+    if blueprint_id is not None:
+        blueprint = bank.blueprints.get(blueprint_id)
+        if blueprint is None:
+            return Response({"error": "Imtihon shabloni topilmadi!"}, status=404)
+        if adaptive:
+            return Response({"error": "adaptive va blueprint_id birga ishlatilmaydi!"}, status=400)
+
+    new_exam = force_new or seed is not None or blueprint is not None or adaptive
+    session = None if new_exam else get_session(request.user.id, session_id)
+
+    if session is None:
+        if session_id is not None and not new_exam:
+            return Response({"error": "Test sessiyasi topilmadi. Iltimos, yangi test boshlang!"}, status=400)
+
+        # Tasodifiy savollarni olish: bazaga so‘rovsiz, nusxadagi ID-lardan
+        if seed is None:
+            seed = new_seed()
+        if adaptive:
+            # Foydalanuvchining xatolik darajalari bo‘yicha og‘irlikli tanlash (alias jadval worker ichida)
+            question_ids = sample_adaptive(get_user_table(bank, request.user.id), seed)
+        else:
+            question_ids = sample_exam(bank, seed, blueprint)
+        ttl = blueprint.session_ttl if blueprint is not None else SESSION_TTL
+        session = create_session(request.user.id, question_ids, seed, ttl)
 
-    if force_new or not cache.get(cache_key):
-        selected_questions = list(Question.objects.order_by('?')[:20])  # Tasodifiy 20 ta olish
-        question_ids = [q.id for q in selected_questions]  # Faqat ID-larni olish
+    # Savollarning o‘zi baza nusxasidan olinadi
+    selected_questions = bank.get_questions(session.question_ids)
+    response = Response(serialize_bank_questions(selected_questions, request))
+    response['X-Exam-Session'] = session.session_id
+    response['X-Exam-Seed'] = str(session.seed)  # Imtihonni qayta hosil qilish uchun
+    return response
 
-        # Cache-ga savollarni va ularning ID-larini saqlash
-        cache.set(cache_key, selected_questions, timeout=1800)  # 30 daqiqa
-        cache.set(cache_question_ids_key, question_ids, timeout=1800)  # 30 daqiqa
-    else:
-        selected_questions = cache.get(cache_key)
 
-    serializer = QuestionSerializer(selected_questions, many=True, context={'request': request})
-    return Response(serializer.data)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_blueprints(request):
+    """Faol imtihon shablonlari: bo‘limlar (kategoriya va savollar soni) va umumiy vaqt"""
+    bank = get_bank()
+    lang_index = language_index(get_language())
+    return Response([
+        {
+            "id": blueprint.id,
+            "title": blueprint.title(lang_index),
+            "total_time": blueprint.total_time,
+            "question_count": blueprint.question_count,
+            "sections": [
+                {"category_id": category_id, "count": count} for category_id, count in blueprint.sections
+            ]
+        }
+        for blueprint in bank.blueprints.values()
+    ])
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_question_pages(request):
     """Savollarni sahifalarga ajratib, faqat sahifa raqamlarini chiqarish"""
-    total_questions = Question.objects.aggregate(count=Count('id'))['count']
-    page_size = 10  # Har bir sahifada 10 savol bo‘lishi
-    total_pages = -(-total_questions // page_size)  # Yuqoriga yaxlitlash (ceil)
+    total_pages = len(get_bank().pages)  # Sahifalar indeksi: har bir sahifada PAGE_SIZE ta savol
 
     return Response({
         "total_pages": total_pages,
@@ -53,169 +119,185 @@ def get_question_pages(request):
 @permission_classes([IsAuthenticated])
 def get_questions_by_page(request, page_number):
     """Tanlangan sahifadagi savollarni chiqarish 10 tadan"""
-    page_size = 10
+    # Sahifalar indeksidan olish, savollar allaqachon order bo‘yicha tartiblangan
+    questions = get_bank().page(page_number)
+
+    return Response({
+        "current_page": page_number,
+        "questions": serialize_bank_questions(questions, request)
+    })
 
-    # Savollarni order bo‘yicha tartiblash
-    questions = Question.objects.only('id', 'text', 'image', 'correct_answer', 'order') \
-        .order_by('order')  # order bo‘yicha tartiblash
 
-    # Sahifalashni qo‘shish
-    questions = questions[page_size * (page_number - 1):page_size * page_number]
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_questions_after(request):
+    """
+    Kursor bo‘yicha sahifalash (scroll uchun): `after_order` va ixtiyoriy `after_id` dan keyingi savollar.
+    Javobdagi `next_cursor` keyingi so‘rov uchun parametrlar.
+    """
+    try:
+        after_order = int(request.query_params.get("after_order", MIN_ORDER))
+        after_id = request.query_params.get("after_id")
+        after_id = int(after_id) if after_id is not None else None
+        limit = min(max(int(request.query_params.get("limit", PAGE_SIZE)), 1), MAX_CURSOR_LIMIT)
+    except ValueError:
+        return Response({"error": "after_order, after_id va limit butun son bo‘lishi kerak!"}, status=400)
+
+    bank = get_bank()
+    questions = bank.questions_after(after_order, after_id, limit)
+
+    next_cursor = None
+    if questions and questions[-1] is not bank.questions[-1]:
+        next_cursor = {"after_order": questions[-1].order, "after_id": questions[-1].id}
 
-    serializer = QuestionSerializer(questions, many=True, context={'request': request})
     return Response({
-        "current_page": page_number,
-        "questions": serializer.data
+        "questions": serialize_bank_questions(questions, request),
+        "next_cursor": next_cursor
     })
 
 
-@vary_on_cookie
-@cache_page(60 * 5)
 @api_view(['GET'])
 # @permission_classes([IsAuthenticated])
 def get_questions(request):
-    questions = Question.objects.only(
-        'id', 'image', 'order',
-        'text_uz', 'text_en', 'text_ru',
-        'correct_answer_uz', 'correct_answer_en', 'correct_answer_ru'
-    ).prefetch_related(
-        Prefetch('choices', queryset=AnswerChoice.objects.only(
-            'id', 'question', 'text_uz', 'text_en', 'text_ru'
-        ))
-    ).order_by('order')
+    """Barcha savollar: oldindan tayyorlangan va siqilgan JSON, ETag bo‘lsa 304 qaytariladi"""
+    bank = get_bank()
+    response = rendered_response(request, get_rendered_questions(request, bank))
+    response['X-Sync-Version'] = str(bank.sync_version)  # Keyingi `/test/changes/?since=` uchun
+    return response
 
-    serializer = QuestionSerializer(questions, many=True, context={'request': request})
-    return Response(serializer.data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_changes_since(request):
+    """
+    Delta sync: `since` versiyasidan keyin o‘zgargan kategoriya va savollar hamda o‘chirilganlarning ID-lari.
+    Jurnal `since` dan keyin siqilgan bo‘lsa (yoki `since` berilmasa) `full_resync: true` qaytariladi.
+    """
+    try:
+        since = int(request.query_params.get("since", 0))
+        limit = min(max(int(request.query_params.get("limit", MAX_CHANGES)), 1), MAX_CHANGES)
+    except ValueError:
+        return Response({"error": "since va limit butun son bo‘lishi kerak!"}, status=400)
+
+    bank = get_bank()
+    if since <= 0 or since < compacted_through():
+        return Response({"full_resync": True, "version": bank.sync_version})
+
+    upserted, deleted, version, has_more = get_changes(bank, since, limit)
+    lang_index = language_index(get_language())
+    return Response({
+        "full_resync": False,
+        "version": version,
+        "has_more": has_more,
+        "categories": [
+            {"id": category_id, "title": bank.categories[category_id].title(lang_index)}
+            for category_id in upserted['category']
+        ],
+        "questions": serialize_bank_questions(bank.get_questions(upserted['question']), request),
+        "deleted": {"categories": deleted['category'], "questions": deleted['question']},
+    })
+
+
+@api_view(['GET', 'HEAD'])
+# @permission_classes([IsAuthenticated])
+def get_bundle(request, lang):
+    """Til uchun oflayn to‘plam (zip): eng yangi tayyor versiya, Range bilan davom ettirib yuklash mumkin"""
+    if lang not in LANGUAGE_CODES:
+        raise Http404
+    bundle = ready_bundle(lang, get_bank())  # So‘rov ichida qurilmaydi: yangi versiya fonda tayyorlanadi
+    if bundle is None:
+        response = Response({"error": "To‘plam tayyorlanmoqda, birozdan keyin qayta urinib ko‘ring!"}, status=503)
+        response['Retry-After'] = str(BUNDLE_RETRY_AFTER)
+        return response
+    version, name = bundle
+    return bundle_response(request, lang, version, name)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_questions_by_category(request, category_id):
     """Berilgan kategoriya ID bo‘yicha savollarni optimallashtirilgan holda olish"""
-    category = get_object_or_404(Category.objects.only('id', 'title'), id=category_id)
+    bank = get_bank()
+    category = bank.categories.get(category_id)
+    if category is None:
+        raise Http404
 
-    questions = Question.objects.filter(category=category) \
-        .only('id', 'text', 'image', 'correct_answer', 'order') \
-        .prefetch_related('choices') \
-        .order_by('order')  # Tartib bo‘yicha oshish
-
-    serializer = QuestionSerializer(questions, many=True, context={'request': request})
+    questions = bank.category_questions[category_id]  # Tartib bo‘yicha oshish
     return Response({
-        "category": category.title,
-        "questions": serializer.data
+        "category": category.title(language_index(get_language())),
+        "questions": serialize_bank_questions(questions, request)
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_categories(request):
-    """Barcha kategoriyalarni optimallashtirilgan holda olish"""
-    categories = Category.objects.only('id', 'title')  # Faqat kerakli maydonlarni olish
-    serializer = CategorySerializer(categories, many=True)
-    return Response(serializer.data)
+    """Barcha kategoriyalar va savollar soni: tayyor JSON cache-dan, ETag bilan"""
+    return categories.response(request, categories.get())
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([SubmitThrottle])
 def submit_random_answers(request):
-    """Tasodifiy savollar uchun foydalanuvchi javoblarini tekshirish"""
-    cache_key = f"random_question_ids_{request.user.id}"
-    question_ids = cache.get(cache_key)  # Cache-dagi tasodifiy savollar IDlari
-
-    if not question_ids:
-        return Response({"error": "Test sessiyasi topilmadi. Iltimos, yangi test boshlang!"}, status=400)
+    """Tasodifiy savollar uchun foydalanuvchi javoblarini tekshirish (`session_id` berilmasa joriy sessiya)"""
+    session = get_session(request.user.id, request.data.get("session_id"))
+    data, status_code = submit_random(request.user.id, request.data, session, get_bank())
+    return Response(data, status=status_code)
 
-    serializer = SubmitRandomAnswersSerializer(data=request.data, context={'request': request})
 
-    if not serializer.is_valid():
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-    answers = serializer.validated_data.get("answers", [])
-    print("sahifadagi savollar", question_ids)
-
-    # Foydalanuvchi faqat test sessiyasidagi savollarga javob berganligini tekshiramiz
-    answered_question_ids = {answer["question_id"] for answer in answers}
-    print("yuborilgan savollar", answered_question_ids)
-
-    if not answered_question_ids.issubset(set(question_ids)):
-        return Response({"error": "Noto‘g‘ri savol ID jo‘natildi!"}, status=400)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([SubmitThrottle])
+def submit_paged_answers(request, page_number):
+    """Sahifalar bo‘yicha foydalanuvchi javoblarini tekshirish"""
+    data, status_code = submit_page(request.user.id, request.data, page_number, get_bank())
+    return Response(data, status=status_code)
 
-    # Barcha javob variantlari IDlari
-    answer_ids = [answer["answer_id"] for answer in answers if answer["answer_id"] is not None]
-    correct_answers = set(
-        AnswerChoice.objects.filter(id__in=answer_ids, is_correct=True).values_list("id", flat=True)
-    )
 
-    # To‘g‘ri va noto‘g‘ri javoblarni sanash
-    correct_count = sum(1 for answer in answers if answer["answer_id"] in correct_answers)
-    total_questions = len(question_ids)
-    incorrect_count = total_questions - correct_count
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_questions(request):
+    """Butun bazani NDJSON (standart) yoki CSV (`?type=csv`) ko‘rinishida oqim bilan yuklab olish (faqat admin)"""
+    fmt = request.query_params.get("type", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        return Response({"error": "type ndjson yoki csv bo‘lishi kerak!"}, status=400)
 
-    percentage = round((correct_count / total_questions) * 100, 2) if total_questions > 0 else 0
+    lines, content_type, extension = EXPORT_FORMATS[fmt]
+    body = (line.encode('utf-8') for line in lines(export_records()))
+    response = StreamingHttpResponse(body, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="questions-{get_bank_version()}.{extension}"'
+    return response
 
-    # Test tugatilgandan so‘ng cache-ni o‘chiramiz
-    # cache.delete(cache_key)
 
-    return Response({
-        "total_questions": total_questions,
-        "correct_answers": correct_count,
-        "incorrect_answers": incorrect_count,
-        "percentage": percentage
-    })
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_question_difficulty(request):
+    """
+    Eng qiyin (`order=hardest`) yoki eng oson (`order=easiest`) savollar: urinishlar, to‘g‘ri javoblar
+    va har bir variant necha marta tanlangani. Hisoblagichlar indeksidan o‘qiladi, hisoblanmaydi.
+    """
+    order = request.query_params.get("order", "hardest")
+    if order not in ("hardest", "easiest"):
+        return Response({"error": "order faqat hardest yoki easiest bo‘lishi mumkin!"}, status=400)
+    try:
+        limit = min(max(int(request.query_params.get("limit", 50)), 1), MAX_RANKING_LIMIT)
+        min_attempts = max(int(request.query_params.get("min_attempts", 0)), 0)
+    except ValueError:
+        return Response({"error": "limit va min_attempts butun son bo‘lishi kerak!"}, status=400)
+
+    ranking = difficulty_ranking(get_bank(), language_index(get_language()), limit, order == "hardest", min_attempts)
+    return Response({"order": order, "questions": ranking})
 
 
-@api_view(['POST'])
+@api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def submit_paged_answers(request, page_number):
-    """Sahifalar bo‘yicha foydalanuvchi javoblarini tekshirish"""
-    serializer = SubmitPageAnswersSerializer(data=request.data, context={'page_number': page_number})
-
-    if not serializer.is_valid():
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-    answers = serializer.validated_data.get("answers", [])
-
-    # Sahifaga mos savollarni olish
-    page_size = 10
-    questions = Question.objects.only('id', 'text', 'image', 'correct_answer').order_by('order')[
-                page_size * (page_number - 1):page_size * page_number
-                ]
-
-    # Sahifadagi savollar IDlarini olish
-    question_ids = {question.id for question in questions}
-
-    # Yuborilgan savollarning IDlarini olish
-    answered_question_ids = {answer["question_id"] for answer in answers}
-    # Yuborilgan savollar faqat ushbu sahifaga tegishli bo‘lishi kerak
-    if not answered_question_ids.issubset(question_ids):
-        return Response({"error": "Berilgan savollar ushbu sahifada mavjud emas!"}, status=400)
-
-    # To‘g‘ri va noto‘g‘ri javoblarni sanash
-    correct_count = 0
-    incorrect_count = 0
-
-    # Har bir savolga javobni tekshirish
-    for question_id in question_ids:
-        # Savolga tegishli javobni topamiz
-        answer = next((a for a in answers if a["question_id"] == question_id), None)
-
-        if answer:
-            # Javob berilgan bo'lsa, uni tekshirish
-            correct_answer = AnswerChoice.objects.filter(question_id=question_id, is_correct=True).first()
-            if correct_answer and answer["answer_id"] == correct_answer.id:
-                correct_count += 1
-            else:
-                incorrect_count += 1
-        else:
-            # Agar javob berilmagan bo'lsa, uni noto'g'ri deb hisoblash
-            incorrect_count += 1
-
-    total_questions = len(question_ids)  # Sahifadagi savollar soni
-    percentage = round((correct_count / total_questions) * 100, 2) if total_questions > 0 else 0
-
-    return Response({
-        "total_questions": total_questions,  # Hozirgi sahifadagi savollar soni
-        "correct_answers": correct_count,  # To‘g‘ri javoblar soni
-        "incorrect_answers": incorrect_count,  # Noto‘g‘ri javoblar soni
-        "percentage": percentage  # To‘g‘rilik foizi
-    })
+def get_review_questions(request):
+    """Takrorlash vaqti kelgan savollar (spaced repetition), eng kechikkanidan boshlab; `limit` - nechta"""
+    try:
+        limit = min(max(int(request.query_params.get("limit", 20)), 1), MAX_REVIEW_LIMIT)
+    except ValueError:
+        return Response({"error": "limit butun son bo‘lishi kerak!"}, status=400)
+
+    question_ids = due_question_ids(request.user.id, limit)
+    return Response(serialize_bank_questions(get_bank().get_questions(question_ids), request))
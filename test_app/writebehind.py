@@ -0,0 +1,121 @@
+"""
+Write-behind bufer: yozuvlar so‘rov davomida faqat xotiraga qo‘shiladi, bazaga esa fon thread-i
+ularni guruhlab (hajm yoki vaqt chegarasi bo‘yicha) yozadi.
+
+Yozuvlar yo‘qolmasligi uchun:
+- bufer `max_pending` ga yetsa yozuvni qo‘shayotgan so‘rov o‘zi partiyani yozadi (backpressure);
+- yozib bo‘lmagan partiya bir necha marta qayta uriniladi, keyin bufer boshiga qaytariladi va keyingi
+  flush-da yana yoziladi (`MAX_REQUEUES` martadan keyin tashlanadi va log qilinadi);
+- worker to‘xtaganda `flush_all()` chaqiriladi: gunicorn `worker_exit` hook-i (gunicorn.conf.py),
+  ASGI lifespan shutdown (Road_test/asgi.py) va zaxira sifatida `atexit`.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAYS = (0.1, 0.5)  # Partiya shu kutishlar bilan qayta uriniladi (masalan deadlock-dan keyin)
+MAX_REQUEUES = 5  # Shuncha flush davomida yozilmagan partiya tashlanadi
+
+_buffers = []
+
+
+class WriteBehindBuffer:
+    """
+    `flush_func(items)` - yig‘ilgan yozuvlarni bitta partiyada bazaga yozadigan funksiya.
+    `max_size` ta yozuv yig‘ilsa darhol, aks holda har `max_delay` soniyada yoziladi.
+    `max_pending` ta yozuv to‘planib qolsa (fon thread-i ulgurmasa) `add` o‘zi sinxron yozadi.
+    """
+
+    def __init__(self, name, flush_func, max_size=200, max_delay=2.0, max_pending=20000):
+        self.name = name
+        self.flush_func = flush_func
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self._items = []
+        self._failed = []  # [(partiya, necha marta qaytarilgan)]
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._flush_lock = threading.Lock()
+        _buffers.append(self)
+
+    def add(self, *items):
+        with self._condition:
+            self._ensure_thread()
+            self._items.extend(items)
+            pending = len(self._items)
+            if pending >= self.max_size:
+                self._condition.notify()
+        if pending >= self.max_pending:
+            logger.warning("%s: bufer to‘ldi (%d ta yozuv), sinxron yoziladi", self.name, pending)
+            self.flush()
+
+    def _ensure_thread(self):
+        # Fork-dan keyin (gunicorn workerlari) thread har bir process-da qaytadan ishga tushiriladi
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.name}", daemon=True)
+            self._thread.start()
+
+    def _take(self):
+        with self._condition:
+            items, self._items = self._items, []
+            failed, self._failed = self._failed, []
+        return failed + [(items[start:start + self.max_size], 0) for start in range(0, len(items), self.max_size)]
+
+    def _requeue(self, batch, requeues):
+        if requeues >= MAX_REQUEUES:
+            logger.error("%s: %d ta yozuv %d urinishdan keyin tashlab yuborildi", self.name, len(batch), requeues)
+            return
+        with self._condition:
+            self._failed.append((batch, requeues))
+
+    def _write(self, batch):
+        for delay in (*RETRY_DELAYS, None):
+            try:
+                self.flush_func(batch)
+                return True
+            except Exception:
+                logger.exception("%s: %d ta yozuvni saqlab bo‘lmadi", self.name, len(batch))
+                close_old_connections()
+                if delay is None:
+                    return False
+                time.sleep(delay)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if len(self._items) < self.max_size:
+                    self._condition.wait(self.max_delay)
+            self.flush()
+
+    def flush(self):
+        """Bufferdagi barcha yozuvlarni hoziroq yozish; yozilmaganlari keyingi flush-ga qoladi"""
+        with self._flush_lock:
+            batches = self._take()
+            if not batches:
+                return
+            close_old_connections()
+            for batch, requeues in batches:
+                if not self._write(batch):
+                    self._requeue(batch, requeues + 1)
+            close_old_connections()
+
+
+def flush_all():
+    """Barcha buferlarni yozish (worker to‘xtashidan oldin)"""
+    for buffer in _buffers:
+        try:
+            buffer.flush()
+        except Exception:
+            logger.exception("%s: buferni yozib bo‘lmadi", buffer.name)
+
+
+atexit.register(flush_all)
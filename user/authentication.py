@@ -0,0 +1,112 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+
+
+AUTH_USER_KEY = "auth_user_{}"
+AUTH_USER_TTL = 300  # Umumiy cache-da 5 daqiqa; worker ichidagi nusxa muddati CACHES POLICIES da
+AUTH_USER_FIELDS = ('id', 'phone_number', 'is_active', 'is_staff', 'is_superuser')  # Cache-ga yoziladigan maydonlar
+
+
+def auth_user_key(user_id):
+    return AUTH_USER_KEY.format(user_id)
+
+
+def invalidate_auth_user(user_id):
+    """
+    Foydalanuvchi o‘zgarganda (masalan admin `is_active` ni o‘chirsa) cache-dagi nusxani o‘chirish.
+    Tranzaksiya tugagach o‘chiriladi: aks holda parallel so‘rov commit-gacha bo‘lgan eski yozuvni qayta keshlaydi.
+    """
+    key = auth_user_key(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT autentifikatsiya, foydalanuvchi esa har so‘rovda bazadan emas, cache-dan olinadi
+    (worker ichida qisqa muddat, umumiy cache-da AUTH_USER_TTL). Cache-da butun model emas, faqat
+    AUTH_USER_FIELDS saqlanadi. `user/signals.py` foydalanuvchi
+    saqlanganda yoki o‘chirilganda yozuvni o‘chiradi.
+    """
+
+    def _user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def _user_query(self, user_id):
+        """Faqat kerakli maydonlar va parol xeshi (u cache-ga yozilmaydi)"""
+        return self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values_list(
+            *AUTH_USER_FIELDS, 'password'
+        )
+
+    def _cache_value(self, row):
+        """Cache-ga yoziladigan qiymat: maydonlar va (kerak bo‘lsa) parol xeshining md5-i, parolning o‘zi emas"""
+        *values, password = row
+        return tuple(values), get_md5_hash_password(password) if api_settings.CHECK_REVOKE_TOKEN else None
+
+    def _check_user(self, cached, validated_token):
+        """`JWTAuthentication.get_user` dagi tekshiruvlar; foydalanuvchi cache-dagi maydonlardan tiklanadi"""
+        if cached is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        values, password_hash = cached
+        # Qolgan maydonlar (parol ham) deferred: kerak bo‘lsa bazadan o‘qiladi, save() ularni yozmaydi.
+        # from_db qiymatlarni modeldagi maydonlar tartibida kutadi
+        fields = dict(zip(AUTH_USER_FIELDS, values))
+        names = [field.attname for field in self.user_model._meta.concrete_fields if field.attname in fields]
+        user = self.user_model.from_db(DEFAULT_DB_ALIAS, names, [fields[name] for name in names])
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+    def get_user(self, validated_token):
+        user_id = self._user_id(validated_token)
+        key = auth_user_key(user_id)
+        cached = cache.get(key)
+        if cached is None:
+            row = self._user_query(user_id).first()
+            if row is not None:
+                cached = self._cache_value(row)
+                cache.set(key, cached, timeout=AUTH_USER_TTL)
+        return self._check_user(cached, validated_token)
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """
+    Async view-lar uchun JWT autentifikatsiya.
+    Tokenni tekshirish faqat CPU ishi, foydalanuvchi esa async cache yoki async ORM bilan olinadi.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self._user_id(validated_token)
+        key = auth_user_key(user_id)
+        cached = await cache.aget(key)
+        if cached is None:
+            row = await self._user_query(user_id).afirst()
+            if row is not None:
+                cached = self._cache_value(row)
+                await cache.aset(key, cached, timeout=AUTH_USER_TTL)
+        return self._check_user(cached, validated_token)
@@ -0,0 +1,128 @@
+"""
+Refresh token blacklist-i oldidagi xotiradagi Bloom filtr.
+
+Har bir refresh so‘rovi tokenni `BlacklistedToken` jadvalidan tekshiradi; jadval millionlab yozuvga
+o‘sganda bu sekinlashadi. Filtr "albatta yo‘q" deb aytsa baza so‘ralmaydi, "bo‘lishi mumkin" desagina
+baza tekshiriladi (noto‘g‘ri ijobiy natija ~0.1%). Worker filtrni bir marta to‘liq quradi, keyin faqat
+yangi yozuvlarni (`id > oxirgi` va hali commit bo‘lmagan bo‘shliqlar) qo‘shadi. Qachon qo‘shish kerakligini umumiy cache-dagi versiya aytadi:
+token blacklistga tushib, tranzaksiya tugagach versiya oshiriladi (`user/signals.py`).
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.db import transaction
+from django.db.models import Q
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from Road_test.cache import bump_version, get_version
+
+BLACKLIST_VERSION_KEY = "token_blacklist_version"
+FALSE_POSITIVE_RATE = 0.001
+MIN_CAPACITY = 10000
+LOAD_CHUNK_SIZE = 5000
+PENDING_WINDOW = 1000  # Bo‘shliqlar faqat eng yangi shuncha ID ichida kuzatiladi (parallel tranzaksiyalar)
+PENDING_TTL = 120  # Soniya: shundan keyin ham paydo bo‘lmagan ID bekor qilingan tranzaksiyaniki
+
+
+class BloomFilter:
+    """Oddiy Bloom filtr: `capacity` ta elementgacha noto‘g‘ri ijobiy ehtimoli `error_rate` dan oshmaydi"""
+
+    def __init__(self, capacity, error_rate=FALSE_POSITIVE_RATE):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Bitta blake2b xeshidan k ta pozitsiya (Kirsch-Mitzenmacher usuli)
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def get_blacklist_version():
+    return get_version(BLACKLIST_VERSION_KEY)
+
+
+def bump_blacklist_version():
+    bump_version(BLACKLIST_VERSION_KEY)
+
+
+def invalidate_blacklist():
+    """Tranzaksiya tugagach versiyani oshirish: boshqa workerlar yozuvni bazada ko‘ra olishi kerak"""
+    transaction.on_commit(bump_blacklist_version)
+
+
+class BlacklistFilter:
+    """
+    ID-lar commit tartibida emas, ajratilish tartibida paydo bo‘ladi: kichik ID-li yozuv kattasidan keyin
+    commit bo‘lishi mumkin. Shuning uchun o‘qilgan oraliqdagi tushib qolgan ID-lar (`_pending`) eslab qolinadi
+    va keyingi sinxronlashlarda qayta so‘raladi; PENDING_TTL dan keyin ular bekor qilingan deb hisoblanadi.
+    """
+
+    def __init__(self):
+        self._bloom = None
+        self._last_id = 0
+        self._pending = {}  # {tushib qolgan ID: birinchi ko‘rilgan vaqt}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _load(self, bloom, after_id, pending):
+        """`after_id` dan keyingi va kutilayotgan yozuvlarni filtrga qo‘shish; (oxirgi ID, kutilayotganlar)"""
+        rows = (BlacklistedToken.objects.filter(Q(id__gt=after_id) | Q(id__in=list(pending)))
+                .order_by('id').values_list('id', 'token__jti'))
+        pending = dict(pending)
+        last_id = after_id
+        seen = set()
+        for row_id, jti in rows.iterator(chunk_size=LOAD_CHUNK_SIZE):
+            bloom.add(jti)
+            if row_id > after_id:
+                seen.add(row_id)
+                last_id = row_id
+            pending.pop(row_id, None)
+
+        # Yangi o‘qilgan oraliqdagi bo‘shliqlar (oxirgi PENDING_WINDOW ta ID ichida; eskilari tozalangan yozuvlar)
+        now = time.monotonic()
+        for row_id in range(max(after_id, last_id - PENDING_WINDOW) + 1, last_id):
+            if row_id not in seen:
+                pending[row_id] = now
+        pending = {row_id: since for row_id, since in pending.items() if now - since < PENDING_TTL}
+        return last_id, pending
+
+    def sync(self):
+        version = get_blacklist_version()
+        if version == self._version:
+            return self._bloom
+
+        with self._lock:
+            if version == self._version:
+                return self._bloom
+            # Versiya bazadan o‘qishdan oldin olingan: shu orada qo‘shilgan token keyingi versiyada olinadi
+            bloom, last_id, pending = self._bloom, self._last_id, self._pending
+            if bloom is None or bloom.count >= bloom.capacity:
+                # To‘lib qolgan filtr ikki barobar katta qilib qaytadan quriladi (o‘chirilgan yozuvlar ham ketadi)
+                bloom = BloomFilter(max(MIN_CAPACITY, 2 * BlacklistedToken.objects.count()))
+                last_id, pending = self._load(bloom, 0, {})
+            else:
+                last_id, pending = self._load(bloom, last_id, pending)
+            self._bloom, self._last_id, self._pending, self._version = bloom, last_id, pending, version
+            return bloom
+
+    def might_contain(self, jti):
+        """False - token albatta blacklistda emas; True - bazada tekshirish kerak"""
+        return jti in self.sync()
+
+
+blacklist_filter = BlacklistFilter()
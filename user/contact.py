@@ -0,0 +1,11 @@
+from Road_test.singletons import CachedSingleton
+from .models import Contact
+from .serializers import ContactSerializer
+
+
+def _build_contact():
+    contact = Contact.objects.first()  # Faqat bitta obyekt
+    return ContactSerializer(contact).data if contact else None
+
+
+contact = CachedSingleton('contact', _build_contact)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    help = ("Muddati o‘tgan refresh tokenlarni (va ularning blacklist yozuvlarini) partiyalab o‘chirish. "
+            "Muddati o‘tgan token baribir qabul qilinmaydi, shuning uchun blacklistda saqlash shart emas. "
+            "Cron orqali muntazam ishga tushiriladi.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help="Bitta DELETE dagi tokenlar soni")
+
+    def handle(self, *args, batch_size=5000, **options):
+        now = timezone.now()
+        expired = OutstandingToken.objects.filter(expires_at__lt=now).order_by('id').values_list('id', flat=True)
+
+        # Har bir partiya alohida tranzaksiya: jadval uzoq vaqt qulflanmaydi
+        deleted = 0
+        while True:
+            ids = list(expired[:batch_size])
+            if not ids:
+                break
+            OutstandingToken.objects.filter(id__in=ids).delete()  # BlacklistedToken CASCADE bilan
+            deleted += len(ids)
+            self.stdout.write(f"O‘chirildi: {deleted}")
+
+        self.stdout.write(self.style.SUCCESS(f"Tayyor: {deleted} ta muddati o‘tgan token o‘chirildi"))
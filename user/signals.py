@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, post_delete
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .authentication import invalidate_auth_user
+from .blacklist import invalidate_blacklist
+from .contact import contact
+from .models import Contact, User
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Foydalanuvchi o‘zgarsa (is_active, parol, ...) autentifikatsiya cache-ini tozalash"""
+    invalidate_auth_user(instance.pk)
+
+
+def refresh_blacklist_filter(sender, instance, created, **kwargs):
+    """Yangi token blacklistga tushsa workerlardagi filtrlar yangi yozuvlarni qo‘shib oladi"""
+    if created:
+        invalidate_blacklist()
+
+
+post_save.connect(invalidate_cached_user, sender=User, dispatch_uid="auth_user_save")
+post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid="auth_user_delete")
+post_save.connect(refresh_blacklist_filter, sender=BlacklistedToken, dispatch_uid="token_blacklist_save")
+contact.connect(Contact)
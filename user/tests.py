@@ -1,3 +1,202 @@
-from django.test import TestCase
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import throttling
+from .authentication import AsyncJWTAuthentication, CachedJWTAuthentication, auth_user_key
+from .blacklist import BlacklistFilter, get_blacklist_version
+from .models import Contact, User
+from .tokens import RefreshToken
+
+# Testlar umumiy cache faylini (yoki Redis-ni) tozalab yubormasligi uchun alohida SQLite fayl
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'Road_test.cache.TwoTierCache',
+        'LOCATION': 'road_test_user_tests',
+        'OPTIONS': {'SHARED_ALIAS': 'shared', 'POLICIES': {'auth_user_': 5}},
+    },
+    'shared': {
+        'BACKEND': 'Road_test.cache.SQLiteCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'road_test_user_tests_cache.sqlite3'),
+    },
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(phone_number='998901110000', password='parol123', is_active=True)
+        self.request = RequestFactory().get('/', headers={'Authorization': f'Bearer {AccessToken.for_user(self.user)}'})
+
+    def test_user_cached_without_password(self):
+        user, _ = CachedJWTAuthentication().authenticate(self.request)
+        self.assertEqual((user.pk, user.phone_number, user.is_active), (self.user.pk, '998901110000', True))
+        cached = cache.get(auth_user_key(self.user.pk))
+        self.assertNotIn(self.user.password, repr(cached))
+
+        with self.assertNumQueries(0):
+            user, _ = CachedJWTAuthentication().authenticate(self.request)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.get_deferred_fields() & {'password'}, {'password'})
+
+    def test_inactive_user_rejected(self):
+        CachedJWTAuthentication().authenticate(self.request)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            CachedJWTAuthentication().authenticate(self.request)
+
+    async def test_async(self):
+        user, _ = await AsyncJWTAuthentication().aauthenticate(self.request)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertIsNotNone(await cache.aget(auth_user_key(self.user.pk)))
+        key = auth_user_key(self.user.pk)
+        await self.user.adelete()
+        await cache.adelete(key)  # on_commit test tranzaksiyasida ishlamaydi
+        with self.assertRaises(AuthenticationFailed):
+            await AsyncJWTAuthentication().aauthenticate(self.request)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BlacklistFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(phone_number='998901234567', password='parol123', is_active=True)
+
+    def new_token(self):
+        token = RefreshToken.for_user(self.user)
+        return token, OutstandingToken.objects.get(jti=token['jti'])
+
+    def blacklist(self, outstanding):
+        with self.captureOnCommitCallbacks(execute=True):
+            return BlacklistedToken.objects.create(token=outstanding)
+
+    def test_sync_after_blacklist(self):
+        token, outstanding = self.new_token()
+        blacklist_filter = BlacklistFilter()
+        self.assertFalse(blacklist_filter.might_contain(token['jti']))
+
+        version = get_blacklist_version()
+        self.blacklist(outstanding)
+        self.assertEqual(get_blacklist_version(), version + 1)
+        self.assertTrue(blacklist_filter.might_contain(token['jti']))
+
+    def test_sync_is_incremental(self):
+        blacklist_filter = BlacklistFilter()
+        first, first_outstanding = self.new_token()
+        self.blacklist(first_outstanding)
+        blacklist_filter.sync()
+
+        second, second_outstanding = self.new_token()
+        self.blacklist(second_outstanding)
+        with self.assertNumQueries(1):
+            bloom = blacklist_filter.sync()
+        self.assertIn(first['jti'], bloom)
+        self.assertIn(second['jti'], bloom)
+
+    def test_late_commit_behind_last_id(self):
+        # Kichik ID-li yozuv kattasidan keyin commit bo‘lsa ham filtrga tushadi
+        blacklist_filter = BlacklistFilter()
+        late, late_outstanding = self.new_token()
+        _, other_outstanding = self.new_token()
+        late_row = self.blacklist(late_outstanding)
+        self.blacklist(other_outstanding)
+        late_id = late_row.pk
+        late_row.delete()  # Hali commit bo‘lmagan tranzaksiya
+        self.assertFalse(blacklist_filter.might_contain(late['jti']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BlacklistedToken.objects.create(pk=late_id, token=late_outstanding)
+        self.assertTrue(blacklist_filter.might_contain(late['jti']))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TokenRefreshTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(phone_number='998907654321', password='parol123', is_active=True)
+        self.client = APIClient()
+        # Process filtri oldingi testlarning (qaytarib olingan) ID-larini eslab qolmasligi uchun
+        patcher = mock.patch('user.tokens.blacklist_filter', BlacklistFilter())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def refresh(self, token):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/account/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_rotated_token_rejected(self):
+        refresh = RefreshToken.for_user(self.user)
+        response = self.refresh(refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], str(refresh))
+        self.assertEqual(self.refresh(refresh).status_code, 401)  # BLACKLIST_AFTER_ROTATION
+
+    def test_refresh_rejected_after_logout(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/account/logout/', {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(refresh).status_code, 401)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        throttling._buckets.clear()
+        self.addCleanup(throttling._buckets.clear)
+        User.objects.create_user(phone_number='998905550000', is_active=True)
+        self.client = APIClient()
+
+    def test_login_limited_per_phone(self):
+        for _ in range(5):  # login_phone: 5/min
+            response = self.client.post('/account/login/', {'phone_number': '998905550001'})
+            self.assertEqual(response.status_code, 400)
+        response = self.client.post('/account/login/', {'phone_number': '+998 90 555 00 01'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        response = self.client.post('/account/login/', {'phone_number': '998905550000'})
+        self.assertEqual(response.status_code, 200)  # Boshqa raqam cheklanmagan
+
+    def test_forwarded_for_ignored_without_proxy(self):
+        # NUM_PROXIES=0: mijoz yozgan X-Forwarded-For bilan IP chegarasini aylanib o‘tib bo‘lmaydi
+        statuses = [
+            self.client.post('/account/register/', {'phone_number': f'99890000000{index}'},
+                             HTTP_X_FORWARDED_FOR=f'10.0.0.{index}').status_code
+            for index in range(11)  # register_ip: 10/hour
+        ]
+        self.assertNotIn(429, statuses[:10])
+        self.assertEqual(statuses[10], 429)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ContactTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_contact(self):
+        self.assertEqual(self.client.get('/account/contact/').status_code, 404)
+        with self.captureOnCommitCallbacks(execute=True):
+            contact = Contact.objects.create(tg_link='https://t.me/road_test', card_number='8600')
+        response = self.client.get('/account/contact/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'tg_link': 'https://t.me/road_test', 'card_number': '8600'})
+        self.assertEqual(self.client.get('/account/contact/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            contact.card_number = '9860'
+            contact.save()
+        response = self.client.get('/account/contact/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.json()['card_number'], '9860')
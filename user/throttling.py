@@ -0,0 +1,161 @@
+"""
+Token-bucket throttling: IP, telefon raqami yoki foydalanuvchi bo‘yicha.
+
+Ikki bosqich:
+1. Worker ichidagi token-bucket (lokal LRU). Bo‘sh bo‘lsa so‘rov darhol rad etiladi - na cache, na baza.
+2. Umumiy cache-dagi oyna hisoblagichi (`incr`): barcha workerlar bo‘yicha umumiy chegara.
+   Chegaradan oshgan kalit oyna tugagunicha lokal bloklanadi, keyingi so‘rovlar 1-bosqichda qaytadi.
+
+DRF throttle-lari view ishlashidan (serializer va baza so‘rovlaridan) oldin tekshiriladi.
+Chegaralar `REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']` da, scope bo‘yicha.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from rest_framework.throttling import SimpleRateThrottle
+
+LOCAL_MAX_BUCKETS = 10000
+
+# {cache kaliti: [tokenlar, oxirgi to‘ldirilgan vaqt, shu vaqtgacha bloklangan]}
+_buckets = OrderedDict()
+_buckets_lock = threading.Lock()
+
+
+def _take_local_token(key, capacity, duration, now):
+    """Lokal bucket-dan bitta token olish; olinmasa kutish vaqtini (soniya) qaytaradi, olinsa None"""
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = _buckets[key] = [float(capacity), now, 0.0]
+            if len(_buckets) > LOCAL_MAX_BUCKETS:
+                _buckets.popitem(last=False)
+        else:
+            _buckets.move_to_end(key)
+
+        tokens, updated, blocked_until = bucket
+        if blocked_until > now:
+            return blocked_until - now
+
+        tokens = min(float(capacity), tokens + (now - updated) * capacity / duration)
+        if tokens < 1:
+            bucket[0], bucket[1] = tokens, now
+            return (1 - tokens) * duration / capacity
+
+        bucket[0], bucket[1] = tokens - 1, now
+        return None
+
+
+def _block_local(key, until):
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is not None:
+            bucket[2] = until
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """`SimpleRateThrottle` kabi scope va rate bilan, lekin lokal token-bucket + umumiy hisoblagich"""
+    monotonic = time.monotonic
+
+    def _local_check(self, request, view):
+        """None - cheklov yo‘q; False - lokal bucket rad etdi; True - umumiy hisoblagichni tekshirish kerak"""
+        if self.rate is None:
+            return None
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return None
+
+        self.now = self.monotonic()
+        self.wait_time = _take_local_token(self.key, self.num_requests, self.duration, self.now)
+        return self.wait_time is None
+
+    def _window(self):
+        # Oyna raqami kalitda: eski oynalar o‘z muddati bilan cache-dan o‘chadi
+        self.timestamp = self.timer()
+        self.window = int(self.timestamp // self.duration)
+        return f"{self.key}_{self.window}"
+
+    def _check_count(self, count):
+        if count > self.num_requests:
+            self.wait_time = (self.window + 1) * self.duration - self.timestamp
+            _block_local(self.key, self.now + self.wait_time)
+            return False
+        return True
+
+    def allow_request(self, request, view):
+        check = self._local_check(request, view)
+        if not check:
+            return check is None
+
+        window_key = self._window()
+        try:
+            count = self.cache.incr(window_key)
+        except ValueError:
+            count = 1 if self.cache.add(window_key, 1, timeout=self.duration + 1) else self.cache.incr(window_key)
+        return self._check_count(count)
+
+    async def aallow_request(self, request, view):
+        """Async view-lar uchun: umumiy hisoblagich cache-ning async API-si bilan"""
+        check = self._local_check(request, view)
+        if not check:
+            return check is None
+
+        window_key = self._window()
+        try:
+            count = await self.cache.aincr(window_key)
+        except ValueError:
+            added = await self.cache.aadd(window_key, 1, timeout=self.duration + 1)
+            count = 1 if added else await self.cache.aincr(window_key)
+        return self._check_count(count)
+
+    def wait(self):
+        return self.wait_time
+
+
+class IPRateThrottle(TokenBucketThrottle):
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class PhoneRateThrottle(TokenBucketThrottle):
+    """So‘rov body-sidagi `phone_number` bo‘yicha (faqat raqamlar); raqam bo‘lmasa cheklanmaydi"""
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        if not isinstance(data, dict):  # JSON ro‘yxat yoki boshqa tur: view o‘zi 400 qaytaradi
+            return None
+        phone_number = re.sub(r'\D', '', str(data.get('phone_number') or ''))[:20]
+        if not phone_number:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': phone_number}
+
+
+class UserRateThrottle(TokenBucketThrottle):
+    """Autentifikatsiyadan o‘tgan foydalanuvchi bo‘yicha, aks holda IP bo‘yicha"""
+
+    def get_cache_key(self, request, view):
+        user = getattr(request, 'user', None)
+        ident = user.pk if user is not None and user.is_authenticated else self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class LoginIPThrottle(IPRateThrottle):
+    scope = 'login_ip'
+
+
+class LoginPhoneThrottle(PhoneRateThrottle):
+    scope = 'login_phone'
+
+
+class RegisterIPThrottle(IPRateThrottle):
+    scope = 'register_ip'
+
+
+class RegisterPhoneThrottle(PhoneRateThrottle):
+    scope = 'register_phone'
+
+
+class SubmitThrottle(UserRateThrottle):
+    scope = 'submit'
@@ -1,19 +1,20 @@
 from django.contrib.auth import get_user_model
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework import status
+from .throttling import LoginIPThrottle, LoginPhoneThrottle, RegisterIPThrottle, RegisterPhoneThrottle
+from .tokens import RefreshToken
 from .serializers import UserSerializer, RegisterSerializer, LoginSerializer
 from rest_framework.views import APIView
-from .models import Contact
-from .serializers import ContactSerializer
+from .contact import contact
 
 User = get_user_model()
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterIPThrottle, RegisterPhoneThrottle])
 def register(request):
     serializer = RegisterSerializer(data=request.data)
     if serializer.is_valid():
@@ -24,6 +25,7 @@ def register(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginPhoneThrottle])
 def login(request):
     serializer = LoginSerializer(data=request.data)
     if serializer.is_valid():
@@ -59,8 +61,7 @@ def logout(request):
 
 class ContactAPIView(APIView):
     def get(self, request):
-        contact = Contact.objects.first()  # Faqat bitta obyektni qaytaradi
-        if contact:
-            serializer = ContactSerializer(contact)
-            return Response(serializer.data)
+        payload = contact.get()  # Tayyor JSON cache-dan; kontakt o‘zgarsa signal yangilaydi
+        if payload:
+            return contact.response(request, payload)
         return Response({"message": "Contact not found"}, status=404)